@@ -0,0 +1,347 @@
+"""
+Benchmarks for the steam_mod_launcher package on synthetic data.
+
+Builds a fake Steam install in a temp folder (libraries with thousands of
+appmanifests, a shortcuts.vdf with nested tags, a Vortex download folder
+with hundreds of zips, a large BepInEx profile) and times the discovery,
+VDF, deploy and profile sync paths against it, plus the cold start of the
+command line. Nothing outside the temp folder is touched: HOME, APPDATA and
+the Steam root all point into it.
+
+    python benchmarks/bench_sml.py                  # run, compare with baseline
+    python benchmarks/bench_sml.py --save-baseline  # run and store as baseline
+    python benchmarks/bench_sml.py --scale 0.1 --only vdf
+
+Exits 1 when a benchmark got slower than the baseline by more than
+--threshold (relative, on the fastest run, which is the least noisy).
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import struct
+import random
+import zipfile
+import argparse
+import tempfile
+import statistics
+import subprocess
+import importlib
+import types
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(HERE)
+ENTRY_SCRIPT = os.path.join(REPO_ROOT, "Setup-SteamModLauncher.py")
+# everything but gui, so the benchmarks run without a display
+APP_MODULES = ["common", "tracing", "discovery", "steam_config", "mods", "thunderstore",
+               "launchers", "verify", "watch"]
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+GAME_ID = "benchgame"
+
+
+# -----------------------------
+# --- Fixtures              ---
+# -----------------------------
+def write_library(root, lib_paths, manifests_per_lib):
+    os.makedirs(os.path.join(root, "steamapps"), exist_ok=True)
+    entries = "".join(f'\t"{i}"\n\t{{\n\t\t"path"\t\t"{p}"\n\t}}\n' for i, p in enumerate(lib_paths))
+    with open(os.path.join(root, "steamapps", "libraryfolders.vdf"), "w", encoding="utf-8") as f:
+        f.write(f'"libraryfolders"\n{{\n{entries}}}\n')
+    appid = 100000
+    for lib in lib_paths:
+        apps = os.path.join(lib, "steamapps")
+        os.makedirs(os.path.join(apps, "common"), exist_ok=True)
+        for _ in range(manifests_per_lib):
+            appid += 10
+            with open(os.path.join(apps, f"appmanifest_{appid}.acf"), "w", encoding="utf-8") as f:
+                f.write(f'"AppState"\n{{\n\t"appid"\t\t"{appid}"\n\t"name"\t\t"Synthetic Game {appid}"\n'
+                        f'\t"installdir"\t\t"Game{appid}"\n\t"buildid"\t\t"{appid * 7}"\n}}\n')
+
+def write_game_dirs(common, count):
+    """
+    Game folders shaped like Unity, Unreal and unknown games.
+    """
+    dirs = []
+    for i in range(count):
+        d = os.path.join(common, f"EngineGame{i}")
+        kind = i % 3
+        if kind == 0:
+            os.makedirs(os.path.join(d, f"EngineGame{i}_Data", "Managed"), exist_ok=True)
+            open(os.path.join(d, "UnityPlayer.dll"), "wb").close()
+        elif kind == 1:
+            os.makedirs(os.path.join(d, "Engine", "Binaries", "Win64"), exist_ok=True)
+            os.makedirs(os.path.join(d, f"EngineGame{i}", "Content", "Paks"), exist_ok=True)
+        else:
+            for sub in range(5):
+                os.makedirs(os.path.join(d, "data", f"part{sub}"), exist_ok=True)
+                open(os.path.join(d, "data", f"part{sub}", "blob.bin"), "wb").close()
+        dirs.append(d)
+    return dirs
+
+def write_exe_tree(game_dir, files):
+    rng = random.Random(2)
+    for i in range(files):
+        sub = os.path.join(game_dir, f"dir{i % 40}", f"sub{i % 7}")
+        os.makedirs(sub, exist_ok=True)
+        ext = ".exe" if i % 250 == 0 else rng.choice([".dll", ".pak", ".json", ".txt"])
+        with open(os.path.join(sub, f"file{i}{ext}"), "wb") as f:
+            f.write(b"\0" * rng.randint(0, 2048))
+    with open(os.path.join(game_dir, "BenchTreeGame.exe"), "wb") as f:
+        f.write(b"\0" * 4096)
+
+def _vdf_entry(idx, entry, tags):
+    buf = b"\x00" + str(idx).encode() + b"\x00"
+    for k, v in entry.items():
+        if isinstance(v, int):
+            buf += b"\x02" + k.encode() + b"\x00" + struct.pack("<I", v)
+        else:
+            buf += b"\x01" + k.encode() + b"\x00" + v.encode() + b"\x00"
+    buf += b"\x00tags\x00"
+    for t, tag in enumerate(tags):
+        buf += b"\x01" + str(t).encode() + b"\x00" + tag.encode() + b"\x00"
+    return buf + b"\x08\x08"
+
+def write_shortcuts_fixture(path, count):
+    """
+    shortcuts.vdf as Steam writes it, including the nested "tags" object.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    buf = b"\x00shortcuts\x00"
+    for i in range(count):
+        entry = {"appid": 0x80000000 + i, "AppName": f"Shortcut {i}", "Exe": f'"C:\\Games\\S{i}\\ModLaunch.cmd"',
+                 "StartDir": f'"C:\\Games\\S{i}"', "icon": "", "LaunchOptions": "", "IsHidden": 0,
+                 "AllowOverlay": 1, "LastPlayTime": 1700000000 + i}
+        buf += _vdf_entry(i, entry, ["favorite", "Modded"][: i % 3])
+    with open(path, "wb") as f:
+        f.write(buf + b"\x08\x08")
+
+def write_vortex_downloads(base, count):
+    """
+    Thunderstore-style BepInEx plugin zips, 1 KB to ~2 MB, mostly
+    compressible like real assemblies.
+    """
+    os.makedirs(base, exist_ok=True)
+    rng = random.Random(3)
+    with zipfile.ZipFile(os.path.join(base, "BepInEx-BepInExPack-5.4.2100.zip"), "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("manifest.json", json.dumps({"name": "BepInExPack", "version_number": "5.4.2100",
+                                                "dependencies": []}))
+        z.writestr("BepInExPack/winhttp.dll", os.urandom(20000))
+        z.writestr("BepInExPack/doorstop_config.ini", "[General]\nenabled=true\n")
+        for n in range(30):
+            z.writestr(f"BepInExPack/BepInEx/core/Core{n}.dll", os.urandom(4000) * 10)
+    for i in range(count):
+        size = int(rng.choice([1, 8, 64, 256, 2048]) * 1024 * rng.uniform(0.5, 1.0))
+        with zipfile.ZipFile(os.path.join(base, f"Author{i}-Plugin{i}-1.0.{i}.zip"), "w", zipfile.ZIP_DEFLATED) as z:
+            z.writestr("manifest.json", json.dumps({"name": f"Plugin{i}", "version_number": f"1.0.{i}",
+                                                    "dependencies": ["BepInEx-BepInExPack-5.4.2100"]}))
+            z.writestr("icon.png", b"png")
+            z.writestr(f"Plugin{i}.dll", (os.urandom(1024) * (size // 1024 + 1))[:size])
+            z.writestr(f"config/plugin{i}.cfg", f"[General]\nvalue = {i}\n")
+
+def write_profile_tree(profile, files):
+    rng = random.Random(4)
+    for i in range(files):
+        folder = rng.choice(["plugins", "config", "patchers", "core"])
+        sub = os.path.join(profile, "BepInEx", folder, f"Mod{i % 150}")
+        os.makedirs(sub, exist_ok=True)
+        with open(os.path.join(sub, f"file{i}.dll"), "wb") as f:
+            f.write(os.urandom(rng.randint(256, 64 * 1024)))
+    for name in ("winhttp.dll", "doorstop_config.ini"):
+        with open(os.path.join(profile, name), "wb") as f:
+            f.write(b"x" * 1000)
+
+
+# -----------------------------
+# --- Harness               ---
+# -----------------------------
+def load_app(fixture_root):
+    """
+    Import the launcher with its home, mod manager folders and Steam root
+    redirected into the fixture (paths are read at import time).
+    """
+    home = os.path.join(fixture_root, "home")
+    os.makedirs(home, exist_ok=True)
+    os.environ.update({
+        "HOME": home, "USERPROFILE": home,
+        "APPDATA": os.path.join(home, "AppData", "Roaming"),
+        "LOCALAPPDATA": os.path.join(home, "AppData", "Local"),
+        "XDG_CONFIG_HOME": os.path.join(home, ".config"),
+        "XDG_DATA_HOME": os.path.join(home, ".local", "share"),
+        "SML_STEAM_ROOT": os.path.join(fixture_root, "Steam"),
+    })
+    os.environ.pop("SML_TRACE", None)
+    os.environ.pop("SML_PROFILE", None)
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    app = {}
+    for name in APP_MODULES:
+        app.update(vars(importlib.import_module(f"steam_mod_launcher.{name}")))
+    return types.SimpleNamespace(**app)
+
+def build_fixtures(root, scale):
+    n = lambda x: max(1, int(x * scale))
+    steam = os.path.join(root, "Steam")
+    libs = [steam] + [os.path.join(root, f"Library{i}") for i in range(2)]
+    write_library(steam, libs, n(1000))
+    common = os.path.join(steam, "steamapps", "common")
+    engine_dirs = write_game_dirs(common, n(300))
+    exe_dir = os.path.join(common, "BenchTreeGame")
+    write_exe_tree(exe_dir, n(5000))
+    shortcuts = os.path.join(steam, "userdata", "12345", "config", "shortcuts.vdf")
+    write_shortcuts_fixture(shortcuts, n(3000))
+    home = os.path.join(root, "home")
+    write_vortex_downloads(os.path.join(home, "AppData", "Roaming", "Vortex", "downloads", GAME_ID), n(200))
+    deploy_dir = os.path.join(common, "BenchDeployGame")
+    os.makedirs(deploy_dir, exist_ok=True)
+    open(os.path.join(deploy_dir, "UnityPlayer.dll"), "wb").close()
+    profile = os.path.join(root, "profile")
+    write_profile_tree(profile, n(4000))
+    return {"libs": libs, "engine_dirs": engine_dirs, "exe_dir": exe_dir, "shortcuts": shortcuts,
+            "deploy_dir": deploy_dir, "profile": profile, "sync_dest": os.path.join(root, "sync_dest"),
+            "vdf_out": os.path.join(root, "shortcuts_out.vdf")}
+
+def make_benchmarks(app, fx):
+    """
+    name -> (setup, run). setup is untimed and runs before every repeat.
+    """
+    def quiet(func):
+        # the app prints per file/mod; keep the timings about the work
+        def run():
+            stdout = sys.stdout
+            sys.stdout = open(os.devnull, "w", encoding="utf-8")
+            try:
+                return func()
+            finally:
+                sys.stdout.close()
+                sys.stdout = stdout
+        return run
+
+    steamapps = [os.path.join(lib, "steamapps") for lib in fx["libs"]]
+    parsed = {}
+
+    def clean_deploy():
+        app.refresh_discovery()
+        if os.path.exists(os.path.join(fx["deploy_dir"], app.DEPLOY_MANIFEST)):
+            quiet(lambda: app.remove_mod_leftovers(fx["deploy_dir"]))()
+
+    def deployed():
+        app.refresh_discovery()
+        if not os.path.exists(os.path.join(fx["deploy_dir"], app.DEPLOY_MANIFEST)):
+            quiet(lambda: app.deploy_vortex_mods(GAME_ID, fx["deploy_dir"]))()
+
+    def synced():
+        if not os.path.isdir(fx["sync_dest"]):
+            app.mirror_profile(fx["profile"], fx["sync_dest"])
+
+    def parse():
+        parsed["shortcuts"] = app.parse_shortcuts(fx["shortcuts"])
+
+    def cli(*args):
+        # a fresh interpreter each time: what a launch shim pays before the game starts
+        return lambda: subprocess.run([sys.executable, ENTRY_SCRIPT, *args], stdout=subprocess.DEVNULL,
+                                      stderr=subprocess.DEVNULL)
+
+    return {
+        "discovery.find_games": (app.refresh_discovery, lambda: app.find_games(steamapps)),
+        "discovery.detect_engine": (app.refresh_discovery,
+                                    lambda: [app.detect_engine(d) for d in fx["engine_dirs"]]),
+        "discovery.find_game_exe": (app.refresh_discovery, lambda: app.find_game_exe(fx["exe_dir"])),
+        "vdf.parse_shortcuts": (None, parse),
+        "vdf.write_shortcuts": (lambda: parsed or parse(),
+                                lambda: app.write_shortcuts(fx["vdf_out"], parsed["shortcuts"])),
+        "deploy.vortex_cold": (clean_deploy, quiet(lambda: app.deploy_vortex_mods(GAME_ID, fx["deploy_dir"]))),
+        "deploy.vortex_noop": (deployed,
+                               quiet(lambda: app.deploy_vortex_mods(GAME_ID, fx["deploy_dir"]))),
+        "sync.profile_cold": (lambda: shutil.rmtree(fx["sync_dest"], ignore_errors=True),
+                              lambda: app.mirror_profile(fx["profile"], fx["sync_dest"])),
+        "sync.profile_noop": (synced,
+                              lambda: app.mirror_profile(fx["profile"], fx["sync_dest"])),
+        "startup.cli_help": (None, cli("--help")),
+        "startup.cli_verify": (deployed, cli("--verify", fx["deploy_dir"], "--quiet")),
+    }, parsed
+
+def run_benchmarks(benchmarks, repeat, only=None):
+    results = {}
+    for name, (setup, run) in benchmarks.items():
+        if only and not any(o in name for o in only):
+            continue
+        times = []
+        for _ in range(repeat):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        results[name] = {"min": min(times), "median": statistics.median(times), "runs": len(times)}
+        print(f"[BENCH] {name:28} min {min(times) * 1000:9.1f} ms   median {results[name]['median'] * 1000:9.1f} ms")
+    return results
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"\n{'benchmark':28} {'baseline':>12} {'now':>12} {'change':>8}")
+    for name, res in results.items():
+        old = baseline.get(name)
+        if not old:
+            print(f"{name:28} {'-':>12} {res['min'] * 1000:10.1f}ms {'new':>8}")
+            continue
+        change = res["min"] / old["min"] - 1 if old["min"] else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  ✗ slower"
+        print(f"{name:28} {old['min'] * 1000:10.1f}ms {res['min'] * 1000:10.1f}ms {change:+7.0%}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="fixture size factor (default 1.0)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark (default 5)")
+    parser.add_argument("--only", action="append", metavar="TEXT", help="run benchmarks whose name contains TEXT")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown of the fastest run that counts as a regression (default 0.25)")
+    parser.add_argument("--keep", action="store_true", help="keep the fixture folder")
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="sml_bench_")
+    try:
+        start = time.perf_counter()
+        fx = build_fixtures(root, args.scale)
+        print(f"[BENCH] Fixtures built in {time.perf_counter() - start:.1f}s under {root}")
+        app = load_app(root)
+        benchmarks, parsed = make_benchmarks(app, fx)
+        results = run_benchmarks(benchmarks, args.repeat, args.only)
+
+        expected = max(1, int(3000 * args.scale))
+        if "shortcuts" in parsed and len(parsed["shortcuts"]) != expected:
+            print(f"[BENCH] parse_shortcuts returned {len(parsed['shortcuts'])} of {expected} shortcuts")
+
+        meta = {"scale": args.scale, "python": sys.version.split()[0], "platform": sys.platform}
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("meta", {}).get("scale") == args.scale:
+                baseline = data.get("results", {})
+            else:
+                print("[BENCH] Baseline was taken at another --scale, not comparing")
+        regressions = compare(results, baseline, args.threshold) if baseline else []
+
+        if args.save_baseline:
+            with open(args.baseline, "w", encoding="utf-8") as f:
+                json.dump({"meta": meta, "results": results}, f, indent=2)
+            print(f"[BENCH] Baseline saved to {args.baseline}")
+        if regressions:
+            print(f"[BENCH] Slower than baseline: {', '.join(regressions)}")
+            return 1
+        return 0
+    finally:
+        if args.keep:
+            print(f"[BENCH] Fixture kept at {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""
+Steam Mod Launcher: Vortex and Thunderstore mod deployment for Steam games.
+
+Setup-SteamModLauncher.py starts it; cli.cli() is the entry point. Modules
+import each other directly, and tkinter is only loaded by gui.
+"""
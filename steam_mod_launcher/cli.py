@@ -0,0 +1,196 @@
+"""
+Command line entry point; starts the GUI without arguments.
+
+Each option imports only the modules it needs; a launch shim's --verify never
+loads tkinter or the GUI.
+"""
+import os
+import sys
+
+from .common import last_state, load_state, save_state
+from .tracing import (PROFILE_ENV, profiling_active, profiling_requested, start_profiling,
+                      stop_profiling)
+from .discovery import find_game_exe, find_games, get_library_folders, get_steam_root
+
+# -----------------------------
+# --- Command line          ---
+# -----------------------------
+def resolve_game_dir(name_or_dir):
+    """
+    Accept either a directory or an installed game's name / install folder.
+    """
+    if os.path.isdir(name_or_dir):
+        return name_or_dir
+    for game in find_games(get_library_folders(get_steam_root())):
+        if name_or_dir.lower() in (game["Name"].lower(), game["InstallDir"].lower()):
+            return os.path.join(os.path.dirname(game["Manifest"]), "common", game["InstallDir"])
+    return None
+
+def cli(argv=None):
+    """
+    Headless entry points. Without arguments the GUI starts.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="Steam Mod Launcher")
+    parser.add_argument("--verify", metavar="GAME_OR_DIR",
+                        help="check deployed mod files, exit 1 if anything is missing or changed")
+    parser.add_argument("--ts-profile", metavar="DIR",
+                        help="with --verify/--plan: compare against this Thunderstore profile")
+    parser.add_argument("--quiet", action="store_true", help="only print problems")
+    parser.add_argument("--presync-daemon", action="store_true",
+                        help="keep Thunderstore launchers pre-synced in the background")
+    parser.add_argument("--interval", type=float, default=2.0,
+                        help="with --presync-daemon: seconds between checks")
+    parser.add_argument("--presync-check", metavar="DIR",
+                        help="exit 0 if the pre-sync daemon keeps DIR in step with --ts-profile")
+    parser.add_argument("--write-launch-options", nargs="*", metavar="GAME",
+                        help="set the ModLaunch.cmd launch option in Steam for these games "
+                             "(default: every launcher in the state file)")
+    parser.add_argument("--clear-launch-options", nargs="+", metavar="GAME",
+                        help="remove our launch option from Steam for these games")
+    parser.add_argument("--import-r2z", metavar="FILE_OR_CODE",
+                        help="deploy an exported r2modman profile (.r2z) or profile code; needs --game")
+    parser.add_argument("--game", metavar="GAME_OR_DIR", help="with --import-r2z: target game")
+    parser.add_argument("--package-dir", action="append", default=[], metavar="DIR",
+                        help="with --import-r2z: extra folder of package zips")
+    parser.add_argument("--name", help="with --import-r2z: profile name (default: from the export)")
+    parser.add_argument("--restore-vanilla", metavar="GAME_OR_DIR",
+                        help="remove deployed mods and put backed-up original files back")
+    parser.add_argument("--force", action="store_true",
+                        help="with --restore-vanilla: also restore over files a Steam update changed")
+    parser.add_argument("--plan", metavar="GAME_OR_DIR",
+                        help="show what a deploy would change, exit 1 if it does not fit on disk")
+    parser.add_argument("--mods", nargs="*", metavar="MOD",
+                        help="with --plan: Vortex mods to deploy (default: the enabled ones)")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"profile this run (or GUI startup) into files next to the state file; "
+                             f"same as {PROFILE_ENV}=1")
+    args = parser.parse_args(argv)
+
+    if (args.profile or profiling_requested()) and not profiling_active():
+        operation = next((name for name in ("verify", "plan", "import_r2z", "restore_vanilla",
+                                            "write_launch_options", "clear_launch_options")
+                          if getattr(args, name) is not None), None)
+        if args.presync_daemon:
+            operation = "presync_daemon"
+        start_profiling(operation or "startup")
+        try:
+            return cli([a for a in (sys.argv[1:] if argv is None else argv) if a != "--profile"])
+        finally:
+            stop_profiling()
+
+    if args.plan:
+        from .mods import format_plan, plan_vortex_deploy
+        from .thunderstore import plan_profile_sync
+        game_dir = resolve_game_dir(args.plan)
+        if not game_dir:
+            print(f"[PLAN] Unknown game or folder: {args.plan}")
+            return 2
+        if args.ts_profile:
+            plan = plan_profile_sync(args.ts_profile, game_dir)
+        else:
+            game = next((g for g in find_games(get_library_folders(get_steam_root()))
+                         if os.path.normcase(os.path.abspath(game_dir)) == os.path.normcase(os.path.abspath(
+                             os.path.join(os.path.dirname(g["Manifest"]), "common", g["InstallDir"])))), None)
+            gameid = game["InstallDir"] if game else os.path.basename(os.path.normpath(game_dir))
+            mods = args.mods
+            if mods is None:
+                mods = last_state.get(game["Name"], {}).get("enabled_mods", []) if game else []
+            plan = plan_vortex_deploy(gameid, game_dir, mods)
+        print(format_plan(plan, limit=0 if args.quiet else 10))
+        return 0 if plan["fits"] else 1
+
+    if args.restore_vanilla:
+        from .mods import remove_mod_leftovers
+        game_dir = resolve_game_dir(args.restore_vanilla)
+        if not game_dir:
+            print(f"[VANILLA] Unknown game or folder: {args.restore_vanilla}")
+            return 2
+        report = remove_mod_leftovers(game_dir, force=args.force)
+        for rel in report["corrupt"]:
+            print(f"[VANILLA] Backup damaged, not restored: {rel}")
+        for rel in report["skipped"]:
+            print(f"[VANILLA] Changed by a game update, not restored: {rel}")
+        return 1 if report["corrupt"] or report["stale_build"] else 0
+
+    if args.import_r2z:
+        import zipfile
+        from .mods import ModExtractError
+        from .thunderstore import (format_import_report, get_active_profile, import_profile_source,
+                                   mark_active_profile)
+        from .launchers import create_simple_shim
+        game_dir = resolve_game_dir(args.game) if args.game else None
+        if not game_dir:
+            print(f"[IMPORT] Unknown game or folder: {args.game}")
+            return 2
+        game = next((g for g in find_games(get_library_folders(get_steam_root()))
+                     if os.path.normcase(os.path.abspath(game_dir)) == os.path.normcase(os.path.abspath(
+                         os.path.join(os.path.dirname(g["Manifest"]), "common", g["InstallDir"])))), None)
+        gameid = game["InstallDir"] if game else os.path.basename(os.path.normpath(game_dir))
+        state = last_state.get(game["Name"], {}) if game else {}
+        if state.get("launcher") not in (None, "Thunderstore"):
+            print(f"[IMPORT] {game['Name']} uses a {state['launcher']} launcher, restore vanilla first.")
+            return 2
+        try:
+            if not get_active_profile(game_dir) and state.get("profile"):
+                mark_active_profile(game_dir, state["profile"])
+            result = import_profile_source(args.import_r2z, game_dir, gameid, args.package_dir, args.name)
+        except (ModExtractError, OSError, ValueError, zipfile.BadZipFile) as e:
+            print(f"[IMPORT] Failed: {e}")
+            return 1
+        exe_path = find_game_exe(game_dir)
+        if game and exe_path:
+            create_simple_shim(game_dir, exe_path)
+            last_state[game["Name"]] = {"launcher": "Thunderstore", "profile": result["name"], "imported": True}
+            save_state(last_state)
+        print(format_import_report(result))
+        return 1 if result["missing"] else 0
+
+    if args.write_launch_options is not None or args.clear_launch_options:
+        from .steam_config import launch_options_from_state, steam_running, write_launch_options
+        if steam_running():
+            print("[LAUNCHOPT] Steam is running and would overwrite the change, close it first.")
+            return 2
+        games = find_games(get_library_folders(get_steam_root()))
+        if args.clear_launch_options:
+            wanted = {n.lower() for n in args.clear_launch_options}
+            options = {g["AppId"]: None for g in games
+                       if {g["Name"].lower(), g["InstallDir"].lower(), g["AppId"]} & wanted}
+        else:
+            options = launch_options_from_state(load_state(), games)
+            if args.write_launch_options:
+                wanted = {n.lower() for n in args.write_launch_options}
+                options = {appid: opt for appid, opt in options.items()
+                           if any({g["Name"].lower(), g["InstallDir"].lower(), g["AppId"]} & wanted
+                                  for g in games if g["AppId"] == appid)}
+        changed = write_launch_options(options)
+        print(f"[LAUNCHOPT] {len(options)} game(s), {changed} entries changed")
+        return 0
+
+    if args.presync_check:
+        from .thunderstore import presync_marker_valid
+        return 0 if args.ts_profile and presync_marker_valid(args.presync_check, args.ts_profile) else 1
+
+    if args.presync_daemon:
+        from .watch import presync_daemon
+        presync_daemon(args.interval)
+        return 0
+
+    if args.verify:
+        from .verify import format_verify_report, verify_deployment
+        game_dir = resolve_game_dir(args.verify)
+        if not game_dir:
+            print(f"[VERIFY] Unknown game or folder: {args.verify}")
+            return 2
+        report = verify_deployment(game_dir, args.ts_profile)
+        ok = not (report["missing"] or report["modified"] or report["extra"])
+        if not ok or not args.quiet:
+            print(format_verify_report(report))
+        return 0 if ok else 1
+
+    from .gui import main
+    main()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(cli())
@@ -0,0 +1,47 @@
+"""
+State file and small helpers shared by every part of the launcher.
+"""
+import os
+import json
+import threading
+
+STATE_FILE = os.path.join(os.path.expanduser("~"), "steam_mod_launcher_state.json")
+IS_WINDOWS = os.name == "nt"
+# held while last_state is written out or changed from a worker thread
+state_lock = threading.RLock()
+
+def load_state():
+    if os.path.exists(STATE_FILE):
+        try:
+            with open(STATE_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    return {}
+
+def save_state(state):
+    try:
+        with state_lock, open(STATE_FILE, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+    except Exception as e:
+        print(f"[WARN] Could not save state: {e}")
+
+def write_json_atomic(path, data):
+    """
+    Write JSON next to the target and rename it over, so a crash never
+    leaves a half-written file behind.
+    """
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+# global cache of last state
+last_state = load_state()
+
+def format_size(n):
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
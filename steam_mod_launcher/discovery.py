@@ -0,0 +1,664 @@
+"""
+Finding Steam, its libraries, installed games and mod manager folders.
+"""
+import os
+import re
+import json
+import subprocess
+import threading
+import time
+import functools
+
+from .common import IS_WINDOWS, write_json_atomic
+from .tracing import trace_count, trace_span, traced
+
+# -----------------------------
+# --- Discovery cache       ---
+# -----------------------------
+# Discovery results (registry lookups, library folders, download listings)
+# are memoized for the session. A cached entry is dropped when:
+#   - refresh_discovery() is called (the Refresh button),
+#   - the mtime of one of its watched paths changed (including every
+#     folder it listed through walk_watched), or
+#   - its TTL (seconds) expired.
+# The Apply worker and the Tk thread share the cache; _discovery_lock guards
+# the dict only, scans run outside it (two threads may both scan a miss).
+# A scan that overlapped a refresh_discovery() isn't stored.
+_discovery_cache = {}
+_discovery_lock = threading.RLock()
+_discovery_generation = 0
+_walked = threading.local()  # .dirs: folders listed by the running scan
+
+def _freeze(value):
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def _path_mtimes(paths):
+    mtimes = []
+    for p in paths:
+        try:
+            mtimes.append(os.stat(p).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+def walk_watched(top):
+    """
+    os.walk for discovery functions: every folder it lists is watched by
+    the calling discovery_cached entry, so a file added or replaced deep
+    inside the tree invalidates it too.
+    """
+    for root, dirs, files in os.walk(top):
+        seen = getattr(_walked, "dirs", None)
+        if seen is not None:
+            seen.append((root, _path_mtimes([root])[0]))
+        yield root, dirs, files
+
+def discovery_cached(ttl=None, watch=None):
+    """
+    Memoize a discovery function per argument tuple.
+    watch(*args) returns the paths whose mtime invalidates the entry; the
+    folders the function walked with walk_watched are added to them.
+    Lists are returned as copies so callers can't corrupt the cache.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            key = (func.__name__,) + _freeze(args)
+            paths = list(watch(*args)) if watch else []
+            with _discovery_lock:
+                entry = _discovery_cache.get(key)
+                generation = _discovery_generation
+            if entry is not None:
+                value, stamp, watched, mtimes = entry
+                expired = ttl is not None and time.monotonic() - stamp > ttl
+                if not expired and mtimes == _path_mtimes(watched):
+                    trace_count(f"{func.__name__}.cached")
+                    return list(value) if isinstance(value, list) else value
+            # snapshot mtimes before the scan so changes during it are caught
+            # next time; walked folders are stat'ed as they are listed
+            mtimes = _path_mtimes(paths)
+            stamp = time.monotonic()
+            outer, _walked.dirs = getattr(_walked, "dirs", None), []
+            try:
+                with trace_span(func.__name__, "discovery"):
+                    value = func(*args)
+                walked = _walked.dirs
+            finally:
+                _walked.dirs = outer
+            with _discovery_lock:
+                if generation == _discovery_generation:
+                    _discovery_cache[key] = (value, stamp, paths + [p for p, _ in walked],
+                                             mtimes + tuple(m for _, m in walked))
+            return list(value) if isinstance(value, list) else value
+        wrapper.invalidate = lambda: refresh_discovery(func.__name__)
+        return wrapper
+    return decorator
+
+def refresh_discovery(name=None):
+    """
+    Drop cached discovery results: all of them, or only those of one function.
+    """
+    global _discovery_generation
+    with _discovery_lock:
+        _discovery_generation += 1
+        for key in list(_discovery_cache):
+            if name is None or key[0] == name:
+                del _discovery_cache[key]
+
+
+def search_file(filename, max_depth=4):
+    """
+    Recursively search all drives for a file/folder name.
+    Returns list of matching paths.
+    """
+    import string
+    results = []
+
+    def walk_dir(path, depth):
+        if depth > max_depth:
+            return
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if filename.lower() in entry.name.lower():
+                        print(f"[FOUND] {entry.path}")   # 👈 debug print
+                        results.append(entry.path)
+                    if entry.is_dir(follow_symlinks=False):
+                        walk_dir(entry.path, depth + 1)
+        except (PermissionError, FileNotFoundError):
+            return
+
+    # find all drives (no drive letters off Windows, so scan the home folder)
+    if IS_WINDOWS:
+        drives = [f"{d}:\\"
+                  for d in string.ascii_uppercase
+                  if os.path.exists(f"{d}:\\")]
+    else:
+        drives = [os.path.expanduser("~")]
+    for drive in drives:
+        print(f"[SCAN] Scanning drive: {drive}")  # 👈 debug print
+        walk_dir(drive, 0)
+
+    return results
+
+
+# -----------------------------
+# --- Auto Detect Engine Type Of Game   ---
+# -----------------------------            
+@discovery_cached(watch=lambda game_dir: [game_dir])
+def detect_engine(game_dir):
+    """
+    Detect whether the game is Unity, Unreal, or Unknown.
+    """
+    # Unity games almost always have UnityPlayer.dll
+    if os.path.exists(os.path.join(game_dir, "UnityPlayer.dll")):
+        return "Unity"
+
+    # Unreal Engine games have Engine/Binaries/Win64 or paks folder
+    for root, dirs, files in walk_watched(game_dir):
+        if "UE4Editor.exe" in files or "UnrealEditor.exe" in files:
+            return "Unreal"
+        if "Paks" in dirs:
+            return "Unreal"
+    return "Unknown"
+
+
+# -----------------------------
+# --- Steam root locators   ---
+# -----------------------------
+# Each locator returns candidate Steam roots in preference order. They are
+# tried in the order of STEAM_ROOT_LOCATORS; the first existing folder wins.
+_steam_root_override = None
+
+def set_steam_root_override(path):
+    """
+    Force the Steam root (e.g. a portable install or a benchmark fixture).
+    Pass None to go back to auto-detection.
+    """
+    global _steam_root_override
+    _steam_root_override = path
+    refresh_discovery()
+
+def locate_override():
+    """
+    Explicit override: set_steam_root_override() or the SML_STEAM_ROOT env var.
+    """
+    return [p for p in (_steam_root_override, os.getenv("SML_STEAM_ROOT")) if p]
+
+def locate_windows_registry():
+    if not IS_WINDOWS:
+        return []
+    import winreg  # Windows-only, keep it out of module import
+
+    paths = []
+    try:
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\\WOW6432Node\\Valve\\Steam") as k:
+            paths.append(winreg.QueryValueEx(k, "InstallPath")[0])
+    except Exception:
+        pass
+    try:
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"SOFTWARE\\Valve\\Steam") as k:
+            paths.append(winreg.QueryValueEx(k, "SteamPath")[0])
+    except Exception:
+        pass
+    return paths
+
+def locate_windows_defaults():
+    if not IS_WINDOWS:
+        return []
+    return [r"C:\\Program Files (x86)\\Steam", r"C:\\Program Files\\Steam"]
+
+def locate_linux():
+    """
+    Native (~/.steam/steam, ~/.local/share/Steam) and Flatpak Steam installs.
+    """
+    if IS_WINDOWS:
+        return []
+    home = os.path.expanduser("~")
+    data_home = os.getenv("XDG_DATA_HOME") or os.path.join(home, ".local", "share")
+    flatpak = os.path.join(home, ".var", "app", "com.valvesoftware.Steam")
+    return [
+        os.path.join(home, ".steam", "steam"),
+        os.path.join(home, ".steam", "root"),
+        os.path.join(data_home, "Steam"),
+        os.path.join(flatpak, ".local", "share", "Steam"),
+        os.path.join(flatpak, ".steam", "steam"),
+    ]
+
+STEAM_ROOT_LOCATORS = [
+    locate_override,
+    locate_windows_registry,
+    locate_windows_defaults,
+    locate_linux,
+]
+
+@discovery_cached()
+def get_steam_root():
+    """
+    Resolve the Steam root once per session using STEAM_ROOT_LOCATORS.
+    """
+    for locator in STEAM_ROOT_LOCATORS:
+        try:
+            candidates = locator()
+        except Exception as e:
+            print(f"[WARN] Steam locator {locator.__name__} failed: {e}")
+            continue
+        for p in candidates:
+            if p and os.path.isdir(p):
+                # ~/.steam/steam is usually a symlink; resolve it so library
+                # paths from libraryfolders.vdf compare equal
+                return p if IS_WINDOWS else os.path.realpath(p)
+    raise FileNotFoundError("Steam root not found.")
+
+def get_proton_prefix(game):
+    """
+    Return the Proton prefix (steamapps/compatdata/<appid>/pfx) that holds
+    the game's Windows-side files on Linux, or None if there is none.
+    """
+    lib = os.path.dirname(game["Manifest"])
+    pfx = os.path.join(lib, "compatdata", str(game["AppId"]), "pfx")
+    return pfx if os.path.isdir(pfx) else None
+
+def get_proton_user_dir(game, *parts):
+    """
+    Path inside the Proton prefix's steamuser profile,
+    e.g. get_proton_user_dir(game, "AppData", "LocalLow").
+    """
+    pfx = get_proton_prefix(game)
+    if not pfx:
+        return None
+    return os.path.join(pfx, "drive_c", "users", "steamuser", *parts)
+
+@discovery_cached(ttl=300)
+def get_appdata_dirs():
+    """
+    Folders where mod managers keep their data (APPDATA-style).
+    On Linux this covers ~/.config and any Proton prefix a Windows-only
+    manager such as Vortex was installed into.
+    """
+    dirs = [
+        os.getenv("APPDATA"),
+        os.getenv("LOCALAPPDATA"),
+        os.path.join(os.getenv("USERPROFILE", ""), "AppData", "Roaming"),
+        os.path.join(os.getenv("USERPROFILE", ""), "AppData", "Local"),
+    ]
+    if not IS_WINDOWS:
+        home = os.path.expanduser("~")
+        dirs.append(os.getenv("XDG_CONFIG_HOME") or os.path.join(home, ".config"))
+        dirs.append(os.getenv("XDG_DATA_HOME") or os.path.join(home, ".local", "share"))
+        try:
+            libs = get_library_folders(get_steam_root())
+        except Exception:
+            libs = []
+        for lib in libs:
+            compat = os.path.join(lib, "compatdata")
+            if not os.path.isdir(compat):
+                continue
+            for appid in os.listdir(compat):
+                roaming = os.path.join(compat, appid, "pfx", "drive_c", "users",
+                                       "steamuser", "AppData", "Roaming")
+                if os.path.isdir(roaming):
+                    dirs.append(roaming)
+    seen = []
+    for d in dirs:
+        if d and os.path.isdir(d) and d not in seen:
+            seen.append(d)
+    return seen
+
+def open_path(path):
+    """
+    Open a file or folder with the platform's default handler.
+    """
+    if IS_WINDOWS:
+        os.startfile(path)
+    else:
+        subprocess.Popen(["xdg-open", path])
+
+
+# -----------------------------
+# --- Steam + Mod helpers   ---
+# -----------------------------
+@discovery_cached(watch=lambda steam_root: [
+    os.path.join(steam_root, "steamapps", "libraryfolders.vdf")])
+def get_library_folders(steam_root):
+    vdf_path = os.path.join(steam_root, "steamapps", "libraryfolders.vdf")
+    libs = []
+    # on Linux the same library is often reachable through ~/.steam symlinks
+    canon = (lambda p: p) if IS_WINDOWS else os.path.realpath
+    with open(vdf_path, encoding="utf-8") as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+        for _, v in data.get("libraryfolders", {}).items():
+            path = v.get("path")
+            if path:
+                apps = os.path.join(path, "steamapps")
+                if os.path.exists(apps):
+                    libs.append(canon(apps))
+    except Exception:
+        paths = re.findall(r'"path"\s*"([^"]+)"', text)
+        for p in paths:
+            apps = os.path.join(p, "steamapps")
+            if os.path.exists(apps):
+                libs.append(canon(apps))
+    default_apps = os.path.join(steam_root, "steamapps")
+    if os.path.exists(default_apps):
+        libs.append(canon(default_apps))
+    return list(set(libs))
+
+@traced("manifest")
+def parse_appmanifest(path):
+    with open(path, encoding="utf-8") as f:
+        txt = f.read()
+    return {
+        "AppId": re.search(r'"appid"\s*"([^"]+)"', txt).group(1),
+        "Name": re.search(r'"name"\s*"([^"]+)"', txt).group(1),
+        "InstallDir": re.search(r'"installdir"\s*"([^"]+)"', txt).group(1),
+        "Manifest": path,
+    }
+
+@discovery_cached(watch=lambda libs: list(libs))
+def find_games(libs):
+    seen = {}
+    for lib in libs:
+        for fname in os.listdir(lib):
+            if fname.startswith("appmanifest_") and fname.endswith(".acf"):
+                try:
+                    game = parse_appmanifest(os.path.join(lib, fname))
+                    seen[game["AppId"]] = game
+                except Exception:
+                    pass
+    register_games(seen.values())
+    return sorted(seen.values(), key=lambda g: g["Name"].lower())
+
+@discovery_cached(watch=lambda game_dir: [game_dir])
+def find_game_exe(game_dir):
+    exes = []
+    for root, _, files in walk_watched(game_dir):
+        for f in files:
+            if f.lower().endswith(".exe"):
+                exes.append(os.path.join(root, f))
+    if not exes:
+        return None
+    folder_name = os.path.basename(game_dir).lower()
+    for exe in exes:
+        if folder_name in os.path.basename(exe).lower():
+            return exe
+    exes.sort(key=lambda x: os.path.getsize(x), reverse=True)
+    return exes[0]
+
+# --- game search ---
+# Typeahead for the game pickers. Every game is indexed under the words of
+# its name and install folder, its run-together name and its appid. Each
+# trie node counts the games below it, so a prefix lookup is one walk of
+# len(prefix) steps however large the library is. Words without a prefix
+# hit are retried one typo away (wrong, missing or extra letter).
+class GameSearchIndex:
+    """
+    Built once from find_games(); update() applies installs/uninstalls.
+    """
+
+    def __init__(self, games=()):
+        self.games = {}
+        self.names = {}  # appid -> words of the name joined by one space
+        self.trie = {}  # char -> child node; node[""] = {appid: count}
+        self.update(games)
+
+    @staticmethod
+    def _split(text):
+        return [t for t in re.split(r"[\W_]+", text.casefold()) if t]
+
+    def _tokens(self, game):
+        tokens = set(self._split(f"{game['Name']} {game['InstallDir']}"))
+        tokens.add("".join(self._split(game["Name"])))
+        tokens.add(str(game["AppId"]))
+        return tokens
+
+    def add(self, game):
+        appid = game["AppId"]
+        if appid in self.games:
+            self.remove(appid)
+        self.games[appid] = game
+        self.names[appid] = " ".join(self._split(game["Name"]))
+        for tok in self._tokens(game):
+            node = self.trie
+            for ch in tok:
+                node = node.setdefault(ch, {})
+                counts = node.setdefault("", {})
+                counts[appid] = counts.get(appid, 0) + 1
+
+    def remove(self, appid):
+        game = self.games.pop(appid, None)
+        if game is None:
+            return
+        del self.names[appid]
+        for tok in self._tokens(game):
+            path = [self.trie]
+            for ch in tok:
+                path.append(path[-1][ch])
+            for parent, ch, node in reversed(list(zip(path, tok, path[1:]))):
+                counts = node[""]
+                counts[appid] -= 1
+                if not counts[appid]:
+                    del counts[appid]
+                if not counts:
+                    del parent[ch]
+
+    def update(self, games):
+        """
+        Sync with a fresh game list, touching only what changed.
+        """
+        fresh = {g["AppId"]: g for g in games}
+        for appid in [a for a in self.games if a not in fresh]:
+            self.remove(appid)
+        for appid, game in fresh.items():
+            old = self.games.get(appid)
+            if old is None or (old["Name"], old["InstallDir"]) != (game["Name"], game["InstallDir"]):
+                self.add(game)
+
+    def _prefixed(self, prefix):
+        node = self.trie
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return set()
+        return set(node[""]) if prefix else set(self.games)
+
+    def _fuzzy(self, term):
+        hits = set()
+        stack = [(self.trie, 0, 1)]
+        while stack:
+            node, i, budget = stack.pop()
+            if i == len(term):
+                if node is not self.trie:
+                    hits.update(node[""])
+                continue
+            child = node.get(term[i])
+            if child is not None:
+                stack.append((child, i + 1, budget))
+            if budget:
+                stack.append((node, i + 1, 0))  # extra letter typed
+                for ch, sub in node.items():
+                    if ch:
+                        stack.append((sub, i, 0))  # letter left out
+                        if ch != term[i]:
+                            stack.append((sub, i + 1, 0))  # wrong letter
+        return hits
+
+    def query(self, text):
+        """
+        Appids matching every word of text, best first: names starting with
+        the text, then exact word matches, then typo matches, by name.
+        """
+        words = self._split(text)
+        names = self.names
+        if not words:
+            return sorted(names, key=names.__getitem__)
+        keys, fuzzy = None, set()
+        for word in words:
+            hits = self._prefixed(word)
+            if not hits and len(word) >= 3:
+                hits = self._fuzzy(word)
+                fuzzy |= hits
+            keys = hits if keys is None else keys & hits
+            if not keys:
+                return []
+        lead = " ".join(words)
+        return sorted(keys, key=lambda a: (a in fuzzy, not names[a].startswith(lead), names[a]))
+
+# -----------------------------
+# --- Mod manager folders   ---
+# -----------------------------
+def get_vortex_download_base():
+    """
+    Vortex keeps downloads in %APPDATA%\\Vortex\\downloads. On Linux Vortex
+    runs inside a Wine/Proton prefix, so look through every APPDATA-style dir.
+    """
+    dirs = get_appdata_dirs()
+    for d in dirs:
+        base = os.path.join(d, "Vortex", "downloads")
+        if os.path.isdir(base):
+            return base
+    return os.path.join(dirs[0] if dirs else os.path.expanduser("~"), "Vortex", "downloads")
+
+@discovery_cached(ttl=300)
+def get_thunderstore_bases():
+    bases = []
+
+    # Default known locations (APPDATA on Windows, ~/.config + Proton prefixes on Linux)
+    for c in get_appdata_dirs():
+        r2 = os.path.join(c, "r2modmanPlus-local")
+        tmm = os.path.join(c, "Thunderstore Mod Manager", "DataFolder")
+        if os.path.exists(r2):
+            print(f"[TS BASE FOUND] {r2}")   # 👈 debug
+            bases.append(r2)
+        if os.path.exists(tmm):
+            print(f"[TS BASE FOUND] {tmm}")  # 👈 debug
+            bases.append(tmm)
+
+    if not bases:
+        print("[SCAN] No Thunderstore in defaults, scanning drives...")
+        found_r2 = search_file("r2modmanPlus-local", max_depth=5)
+        found_tmm = search_file("Thunderstore Mod Manager", max_depth=5)
+        for f in found_r2 + found_tmm:
+            print(f"[TS BASE FOUND] {f}")
+            bases.append(f)
+
+    return list(set(bases))
+
+
+# -----------------------------
+# --- Game identifiers      ---
+# -----------------------------
+# Vortex names a game's download folder after its own game id ("skyrimse")
+# and r2modman/TMM name the community folder after Thunderstore's
+# ("RiskOfRain2"); neither follows from Steam's InstallDir. Known games come
+# from the table below. Others are matched once against the folders that
+# exist, and the answer is kept in GAMEID_FILE until those folders change
+# (their parent's mtime), so a lookup is a dict hit plus one stat per base.
+GAMEID_FILE = os.path.join(os.path.expanduser("~"), "steam_mod_launcher_gameids.json")
+GAMEID_VERSION = 1
+# appid: (Vortex game id, Thunderstore community folder), None = not known
+KNOWN_GAME_IDS = {
+    "1966720": ("lethalcompany", "LethalCompany"),
+    "892970": ("valheim", "Valheim"),
+    "632360": ("riskofrain2", "RiskOfRain2"),
+    "2881650": ("contentwarning", "ContentWarning"),
+    "3241660": ("repo", "REPO"),
+    "1366540": ("dysonsphereprogram", "DysonSphereProgram"),
+    "1092790": ("inscryption", "Inscryption"),
+    "493520": (None, "GTFO"),
+    "450540": (None, "H3VR"),
+    "1062090": ("timberborn", "Timberborn"),
+    "489830": ("skyrimse", None),
+    "377160": ("fallout4", None),
+    "413150": ("stardewvalley", None),
+    "1091500": ("cyberpunk2077", None),
+    "1086940": ("baldursgate3", None),
+    "264710": ("subnautica", None),
+    "292030": ("witcher3", None),
+}
+
+_installdir_appids = {}  # casefolded InstallDir -> appid, filled by find_games
+_gameid_cache = None  # {"vortex"/"thunderstore": {key: [folder or None, base mtimes]}}
+
+def _gameid_key(name):
+    return re.sub(r"[\W_]+", "", name.casefold())
+
+def register_games(games):
+    for game in games:
+        _installdir_appids[game["InstallDir"].casefold()] = game["AppId"]
+
+def _load_gameid_cache():
+    global _gameid_cache
+    if _gameid_cache is None:  # callers hold _discovery_lock
+        _gameid_cache = {}
+        try:
+            with open(GAMEID_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == GAMEID_VERSION:
+                _gameid_cache = data.get("ids", {})
+        except (OSError, ValueError):
+            pass
+    return _gameid_cache
+
+def _match_game_folder(install_dir, folders):
+    """
+    The folder meant for install_dir: same letters and digits, else one
+    containing the name, else one letter off. Digits must agree so that
+    'Fallout 3' never lands on 'fallout4'.
+    """
+    want = _gameid_key(install_dir)
+    digits = re.sub(r"\D", "", want)
+    keyed = {_gameid_key(f): f for f in folders}
+    if want in keyed:
+        return keyed[want]
+    same_digits = [k for k in keyed if re.sub(r"\D", "", k) == digits]
+    containing = sorted((k for k in same_digits if want in k), key=len)
+    if containing:
+        return keyed[containing[0]]
+    # typos only: a letter off, not an edition suffix like 'vr'
+    import difflib
+    close = difflib.get_close_matches(want, [k for k in same_digits if abs(len(k) - len(want)) <= 1],
+                                      n=1, cutoff=0.85)
+    return keyed[close[0]] if close else None
+
+def _resolve_game_folder(kind, install_dir, bases):
+    appid = _installdir_appids.get(install_dir.casefold())
+    known = KNOWN_GAME_IDS.get(appid, (None, None))[kind == "thunderstore"]
+    if known:
+        return known
+    key = appid or _gameid_key(install_dir)
+    stamp = list(_path_mtimes(bases))
+    with _discovery_lock:
+        hit = _load_gameid_cache().setdefault(kind, {}).get(key)
+    if hit and hit[1] == stamp:
+        return hit[0]
+    folders = set()
+    for base in bases:
+        try:
+            folders.update(n for n in os.listdir(base) if os.path.isdir(os.path.join(base, n)))
+        except OSError:
+            pass
+    folder = _match_game_folder(install_dir, folders)
+    with _discovery_lock:
+        _gameid_cache[kind][key] = [folder, stamp]
+        try:
+            write_json_atomic(GAMEID_FILE, {"version": GAMEID_VERSION, "ids": _gameid_cache})
+        except OSError as e:
+            print(f"[WARN] Could not save game id index: {e}")
+    return folder
+
+def vortex_gameid(install_dir):
+    """
+    Vortex download folder name for a Steam InstallDir, or None.
+    """
+    return _resolve_game_folder("vortex", install_dir, [get_vortex_download_base()])
+
+def thunderstore_community(install_dir):
+    """
+    r2modman/TMM game folder name for a Steam InstallDir, or None.
+    """
+    return _resolve_game_folder("thunderstore", install_dir, get_thunderstore_bases())
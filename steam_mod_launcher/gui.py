@@ -0,0 +1,1579 @@
+"""
+The tkinter window.
+"""
+import os
+import shutil
+import time
+import threading
+import queue
+import zipfile
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+import tkinter.simpledialog as simpledialog
+
+from .common import format_size, last_state, save_state
+from .tracing import (clear_trace, export_trace, stop_profiling, _trace_counters, trace_span,
+                      trace_summary)
+from .discovery import (detect_engine, find_game_exe, find_games, GameSearchIndex,
+                        get_library_folders, get_steam_root, get_thunderstore_bases,
+                        get_vortex_download_base, open_path, parse_appmanifest, refresh_discovery,
+                        register_games)
+from .steam_config import (add_nonsteam_shortcut, launch_options_from_state, launch_options_pending,
+                           remove_nonsteam_shortcut, start_steam, steam_running, stop_steam,
+                           write_launch_options)
+from .mods import (deploy_vortex_mods, ExtractCancelled, find_mod_conflicts, format_plan,
+                   get_mod_priority, get_vortex_downloads, index_mods, ModExtractError,
+                   ModSearchIndex, normalize_gameid, plan_vortex_deploy, remove_mod_leftovers,
+                   resolve_mod_dependencies, set_mod_priority, summarize_conflicts)
+from .thunderstore import (format_import_report, get_active_profile, get_thunderstore_profiles_any,
+                           import_profile_source, list_staged_profiles, mark_active_profile,
+                           switch_profile, VANILLA_PROFILE)
+from .launchers import (create_custom_shim_with_sync, create_shim_with_sync, create_simple_shim,
+                        custom_launch_ok, describe_custom_launch, get_custom_launches,
+                        register_custom_launch, unregister_custom_launch)
+from .verify import format_verify_report, verify_deployment
+from .watch import ChangeTracker
+
+# -----------------------------
+# --- GUI ---------------------
+# -----------------------------
+def main():
+    try:
+        with trace_span("startup_discovery", "gui"):
+            steam_root = get_steam_root()
+            libs = get_library_folders(steam_root)
+            games = find_games(libs)
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to find Steam libraries: {e}")
+        return
+    if not games:
+        messagebox.showerror("Error", "No Steam games found.")
+        return
+
+    root = tk.Tk()
+    root.title("Steam Mod Launcher Setup")
+    notebook = ttk.Notebook(root)
+    notebook.pack(expand=True, fill="both")
+
+    # Secondary tabs are added empty and built the first time they are
+    # selected, so startup only pays for the Steam Games tab.
+    lazy_tabs = {}  # {tab widget path: builder}
+
+    def on_tab_changed(event):
+        build = lazy_tabs.pop(notebook.select(), None)
+        if build:
+            build()
+
+    notebook.bind("<<NotebookTabChanged>>", on_tab_changed)
+
+    # Typeahead for the game pickers: the box above each one narrows its
+    # list on every keystroke and selects the best match once typing pauses
+    # (selecting reloads that game's state, too slow to do per key).
+    game_index = GameSearchIndex(games)
+    game_filters = []
+
+    def add_game_search(picker, var, fixed=()):
+        search_frame = tk.Frame(picker.master)
+        search_frame.pack(pady=(5, 0), before=picker)
+        tk.Label(search_frame, text="🔎").pack(side="left")
+        search_var = tk.StringVar()
+        tk.Entry(search_frame, textvariable=search_var, width=37).pack(side="left")
+        job = {"id": None}
+
+        def refilter(*args):
+            names = [game_index.games[a]["Name"] for a in game_index.query(search_var.get())]
+            picker["values"] = list(fixed) + names
+            if job["id"]:
+                root.after_cancel(job["id"])
+                job["id"] = None
+            if names and search_var.get().strip() and var.get() not in names:
+                job["id"] = root.after(300, lambda: var.set(names[0]))
+
+        search_var.trace_add("write", refilter)
+        game_filters.append(refilter)
+
+    # ========================
+    # Tab 1: Steam Games
+    # ========================
+    steam_tab = tk.Frame(notebook)
+    notebook.add(steam_tab, text="Steam Games")
+
+    tk.Label(steam_tab, text="Select a game:").pack(pady=5)
+    game_var = tk.StringVar()
+    combo = ttk.Combobox(steam_tab, textvariable=game_var, state="readonly",
+                         values=[g["Name"] for g in games], width=40)
+    combo.pack(pady=5)
+    combo.current(0)
+    add_game_search(combo, game_var)
+
+    status_frame = tk.Frame(steam_tab)
+    version_label = tk.Label(status_frame, text="Current version: Vanilla")
+    version_label.pack(side="left", padx=5)
+    status_canvas = tk.Canvas(status_frame, width=12, height=12, highlightthickness=0)
+    status_circle = status_canvas.create_oval(2, 2, 10, 10, fill="red")
+    status_canvas.pack(side="left")
+    status_frame.pack(pady=5)
+
+    launcher_label = tk.Label(steam_tab, text="Select Launcher:")
+    launcher_label.pack(pady=(10, 2))
+
+    mode_var = tk.StringVar(value="User Defined")
+    mode_combo = ttk.Combobox(
+        steam_tab,
+        textvariable=mode_var,
+        state="readonly",
+        values=["User Defined", "Thunderstore", "Vortex"],
+        width=20
+    )
+    mode_combo.pack(pady=5)
+
+
+
+    profile_frame = tk.Frame(steam_tab)
+    profile_var = tk.StringVar()
+    profile_combo = ttk.Combobox(profile_frame, textvariable=profile_var, state="readonly", width=40)
+    tk.Label(profile_frame, text="Thunderstore profile:").pack(side="left", padx=5)
+    profile_combo.pack(side="left", padx=5)
+    verify_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(profile_frame, text="Verify mod files before launch",
+                   variable=verify_var).pack(side="left", padx=5)
+    # only shown once a Thunderstore launcher exists
+    switch_btn = tk.Button(profile_frame, text="Switch")
+    import_btn = tk.Button(profile_frame, text="Import…")
+    import_btn.pack(side="left", padx=5)
+
+    user_frame = tk.Frame(steam_tab)
+    cmd_var = tk.StringVar()
+    cmd_entry = tk.Entry(user_frame, textvariable=cmd_var, width=50)
+    browse_btn = tk.Button(user_frame, text="Browse…",
+                           command=lambda: cmd_var.set(
+                               f"\"{filedialog.askopenfilename(title='Select modded EXE/BAT/CMD/LNK', filetypes=[('Executables','*.exe *.bat *.cmd *.lnk'),('All files','*.*')])}\""
+                           ))
+    cmd_entry.pack(side="left", padx=5)
+    browse_btn.pack(side="left", padx=5)
+
+    create_btn = tk.Button(steam_tab, text="Create Launcher")
+    revert_unlock_btn = tk.Button(steam_tab, text="Revert to Vanilla & Unlock")
+    revert_btn = tk.Button(steam_tab, text="Restore Vanilla")
+    copy_btn = tk.Button(steam_tab, text="Copy Launch Option")
+        # Inline status label for Vortex mods
+    mods_status_label = tk.Label(steam_tab, text="")
+
+    engine_var = tk.StringVar(value="Engine: Unknown")
+    engine_label = tk.Label(root, textvariable=engine_var, fg="blue")
+    engine_label.pack(side="bottom", pady=2)
+
+    def update_engine_label():
+        sel_name = game_var.get()
+        game = next((g for g in games if g["Name"] == sel_name), None)
+        if game:
+            game_dir = os.path.join(os.path.dirname(game["Manifest"]), "common", game["InstallDir"])
+            engine = detect_engine(game_dir)
+            engine_var.set(f"Game Engine: {engine}")
+        else:
+            engine_var.set("Game Engine: Unknown")
+
+    # hook it into game change
+    game_var.trace("w", lambda *a: (update_status(), update_engine_label()))
+
+
+    def revert_unlock(game, game_dir):
+        """
+        Restore vanilla and unlock launcher when using Vortex.
+        """
+        # Remove Mod Selection tab if visible
+        for i in range(notebook.index("end")):
+            if notebook.tab(i, "text") == "Mod Selection":
+                notebook.forget(mods_tab)
+                break
+        
+        warn_restore(remove_mod_leftovers(game_dir))
+        mods_context.clear()  # a new launcher starts with nothing checked
+
+        # 🔑 Clear saved state so update_status won't think it's still modded
+        sel_name = game["Name"]
+        if sel_name in last_state:
+            del last_state[sel_name]
+            save_state(last_state)
+
+        # ✅ Reset UI to Vanilla
+        version_label.config(text="Current version: Vanilla")
+        status_canvas.itemconfig(status_circle, fill="red")
+
+        # Unlock launcher dropdowns
+        mode_combo.config(state="readonly")
+        profile_combo.config(state="readonly")
+        cmd_entry.config(state="normal")
+        browse_btn.config(state="normal")
+
+        # Hide revert button
+        revert_unlock_btn.pack_forget()
+        revert_btn.pack_forget()
+        copy_btn.pack_forget()
+
+        # Remove Mod Selection tab if still visible
+        for i in range(notebook.index("end")):
+            if notebook.tab(i, "text") == "Mod Selection":
+                notebook.forget(mods_tab)
+                break
+
+        # Finally update UI status cleanly
+        update_status()
+
+        # Show success message
+        show_status(f"✅ {sel_name} restored to Vanilla. Launcher unlocked.")
+
+
+
+
+    def detect_existing_launcher(game):
+        """
+        Detect if the game is modded, and if so, which launcher/profile is active.
+        Returns (launcher, profile_name) or (None, None) if vanilla.
+        """
+        game_dir = os.path.join(os.path.dirname(game["Manifest"]), "common", game["InstallDir"])
+        shim_path = os.path.join(game_dir, "ModLaunch.cmd")
+
+        if not os.path.exists(shim_path):
+            return None, None
+
+        try:
+            with open(shim_path, "r", encoding="utf-8") as f:
+                contents = f.read().lower()
+        except Exception:
+            return None, None
+
+        # Thunderstore shim contains "set PROFILE="
+        if "set profile=" in contents:
+            for line in contents.splitlines():
+                if line.strip().lower().startswith("set profile="):
+                    profile_path = line.split("=", 1)[1].strip()
+                    profile_name = os.path.basename(profile_path)
+                    return "Thunderstore", profile_name
+
+        # Vortex shim contains "set GAMEDIR="
+        if "modded" in contents and "set gamedir=" in contents:
+            return "Vortex", None
+
+        return None, None
+
+
+    def update_status():
+        sel_name = game_var.get()
+        game = next(g for g in games if g["Name"] == sel_name)
+        game_dir = os.path.join(os.path.dirname(game["Manifest"]), "common", game["InstallDir"])
+
+        # Reset UI
+        mode_combo.config(state="readonly")
+        profile_combo.config(state="readonly")
+        cmd_entry.config(state="normal")
+        browse_btn.config(state="normal")
+
+        create_btn.pack_forget()
+        revert_btn.pack_forget()
+        revert_unlock_btn.pack_forget()
+        copy_btn.pack_forget()
+        switch_btn.pack_forget()
+
+        # Always hide Mod Selection tab at start
+        for i in range(notebook.index("end")):
+            if notebook.tab(i, "text") == "Mod Selection":
+                notebook.forget(mods_tab)
+                break
+
+        # Load game state if it exists
+        state = last_state.get(sel_name)
+
+        if state:
+            launcher = state.get("launcher")
+            profile = state.get("profile", "")
+
+            mode_var.set(launcher)
+            mode_combo.config(state="disabled")
+            status_canvas.itemconfig(status_circle, fill="green")
+
+            if launcher == "Thunderstore":
+                version_label.config(text=f"Current version: Modded (Thunderstore, {profile})")
+                # staged profiles can be swapped in place, vanilla included
+                names = [os.path.basename(p) for p in get_thunderstore_profiles_any(game["InstallDir"])]
+                # plus profiles that only exist staged (e.g. imported .r2z)
+                names += [n for n in list_staged_profiles(game_dir) if n not in names and n != VANILLA_PROFILE]
+                profile_combo["values"] = [VANILLA_PROFILE] + names
+                profile_combo.set(profile)
+                switch_btn.config(command=lambda: on_switch_profile(sel_name, game, game_dir))
+                switch_btn.pack(side="left", padx=5)
+                revert_btn.pack(pady=10)
+                copy_btn.pack(pady=10)
+
+            elif launcher == "Vortex":
+                revert_unlock_btn.config(command=lambda: revert_unlock(game, game_dir))
+                revert_unlock_btn.pack(pady=10)
+
+                enabled_mods = state.get("enabled_mods", [])
+                count = len(enabled_mods)
+
+                version_label.config(
+                    text=f"Current version: Modded (Vortex, {count} mod{'s' if count != 1 else ''} enabled)"
+                )
+                status_canvas.itemconfig(status_circle, fill="green")
+
+                # Only add Mod Selection tab if it’s not already there
+                if "Mod Selection" not in [notebook.tab(i, "text") for i in range(notebook.index("end"))]:
+                    notebook.add(mods_tab, text="Mod Selection")
+
+                populate_mod_list(game["InstallDir"], game_dir)
+
+                # Restore checkboxes
+                for m in enabled_mods:
+                    if m in mod_vars:
+                        mod_vars[m].set(True)
+                update_conflicts()
+                update_pending(auto=False)
+
+
+
+            elif launcher == "User Defined":
+                version_label.config(text=f"Current version: Modded (User Defined)")
+                cmd_entry.delete(0, tk.END)
+                cmd_entry.insert(0, profile)
+                cmd_entry.config(state="disabled")
+                browse_btn.config(state="disabled")
+                revert_btn.pack(pady=10)
+                copy_btn.pack(pady=10)
+
+        else:
+            # Default Vanilla
+            version_label.config(text="Current version: Vanilla")
+            status_canvas.itemconfig(status_circle, fill="red")
+
+            create_btn.config(
+                text="Create Launcher",
+                state="normal",
+                command=on_ok
+            )
+            create_btn.pack(side="bottom", pady=10)
+
+            update_mode()
+
+
+
+    def on_revert():
+        sel_name = game_var.get()
+        game = next(g for g in games if g["Name"] == sel_name)
+        lib_path = os.path.dirname(game["Manifest"])
+        game_dir = os.path.join(lib_path, "common", game["InstallDir"])
+        
+        # Remove Mod Selection tab if visible
+        for i in range(notebook.index("end")):
+            if notebook.tab(i, "text") == "Mod Selection":
+                notebook.forget(mods_tab)
+                break
+        
+        # Remove all mod leftovers
+        warn_restore(remove_mod_leftovers(game_dir))
+
+        # ✅ Remove saved modded state
+        if sel_name in last_state:
+            del last_state[sel_name]
+            save_state(last_state)
+
+        # Force Vanilla UI
+        version_label.config(text="Current version: Vanilla")
+        status_canvas.itemconfig(status_circle, fill="red")
+
+        mode_combo.config(state="readonly")
+        profile_combo.config(state="readonly")
+        cmd_entry.config(state="normal")
+        browse_btn.config(state="normal")
+
+        revert_btn.pack_forget()
+        revert_unlock_btn.pack_forget()
+        copy_btn.pack_forget()
+
+        show_status(f"✅ {sel_name} restored to Vanilla. Launcher unlocked.")
+
+        # Now redraw everything fresh
+        update_status()
+
+
+
+
+
+
+
+    def update_mode(*args):
+        # Hide irrelevant frames
+        for w in (profile_frame, user_frame):
+            w.pack_forget()
+
+        # Clear any old status label
+        try:
+            mods_status_label.pack_forget()
+        except Exception:
+            pass
+
+        launcher = mode_var.get()
+
+        if launcher == "Thunderstore":
+            sel_name = game_var.get()
+            game = next((g for g in games if g["Name"] == sel_name), None)
+            if game:
+                profiles = get_thunderstore_profiles_any(game["InstallDir"])
+                if profiles:
+                    profile_combo["values"] = [os.path.basename(p) for p in profiles]
+                    profile_combo.current(0)
+                else:
+                    profile_combo["values"] = ["No profiles detected"]
+                    profile_combo.current(0)
+            profile_frame.pack(pady=5)
+            create_btn.config(text="Create Launcher", state="normal")
+
+        elif launcher == "Vortex":
+            sel_name = game_var.get()
+            game = next((g for g in games if g["Name"] == sel_name), None)
+            mods = []
+            if game:
+                mods = get_vortex_downloads(game["InstallDir"])
+
+            # Inline status label
+            mods_status_label.config(
+                text=(f"✅ {len(mods)} mods available" if mods else "❌ No mods available"),
+                fg=("green" if mods else "red")
+            )
+            mods_status_label.pack(pady=(2, 5))
+
+            if mods:
+                create_btn.config(text="Use Mod Selection", state="normal")
+            else:
+                create_btn.config(state="disabled")
+
+
+
+
+
+    def on_ok():
+        sel_name = game_var.get()
+        game = next(g for g in games if g["Name"] == sel_name)
+        lib_path = os.path.dirname(game["Manifest"])
+        game_dir = os.path.join(lib_path, "common", game["InstallDir"])
+        exe_path = find_game_exe(game_dir)
+        if not exe_path:
+            messagebox.showerror("Error", f"Could not find any .exe in {game_dir}")
+            return
+
+        # -----------------------------
+        # Thunderstore
+        # -----------------------------
+        if mode_var.get() == "Thunderstore":
+            profiles = get_thunderstore_profiles_any(game["InstallDir"])
+            if not profiles:
+                profile_combo["values"] = ["No profiles detected"]
+                profile_combo.current(0)
+                return
+
+            sel_profile = profile_var.get()
+            profile_path = next((p for p in profiles if os.path.basename(p) == sel_profile), None)
+            if not profile_path:
+                profile_combo.set("No profile selected")
+                return
+
+            try:
+                switch_profile(game_dir, sel_profile, profile_path)
+            except (ModExtractError, OSError, ValueError) as e:
+                messagebox.showerror("Error", f"Could not stage profile {sel_profile}: {e}")
+                return
+            shim_path = create_shim_with_sync(game_dir, exe_path, profile_path, verify_var.get())
+
+            # Save state
+            last_state[sel_name] = {
+                "launcher": "Thunderstore",
+                "profile": sel_profile,
+                "verify": verify_var.get()
+            }
+            save_state(last_state)
+
+            # UI (modded view with the profile switcher)
+            update_status()
+
+            # Copy launch option
+            launch_opts = f"\"{shim_path}\" %command%"
+            root.clipboard_clear()
+            root.clipboard_append(launch_opts)
+
+            show_status(f"✅ Thunderstore launcher created for profile '{sel_profile}' (copied to clipboard).")
+
+        # -----------------------------
+        # Vortex
+        # -----------------------------
+        elif mode_var.get() == "Vortex":
+            mods = get_vortex_downloads(game["InstallDir"])
+            if not mods:
+                mods_status_label.config(text="❌ No mods available", fg="red")
+                create_btn.config(state="disabled")
+                return
+            else:
+                mods_status_label.config(text=f"✅ {len(mods)} mods available", fg="green")
+
+            modded_dir = os.path.join(game_dir, "modded")
+
+            # 👇 don’t deploy mods yet, just prepare environment
+            if not os.path.exists(modded_dir):
+                os.makedirs(modded_dir, exist_ok=True)
+
+            # Update UI status
+            version_label.config(text="Current version: Modded (Vortex, 0 mods enabled)")
+            status_canvas.itemconfig(status_circle, fill="green")
+
+            mode_combo.config(state="disabled")
+            create_btn.pack_forget()
+            revert_unlock_btn.config(command=lambda: revert_unlock(game, game_dir))
+            revert_unlock_btn.pack(pady=10)
+
+            # Add Mod Selection tab only now
+            if "Mod Selection" not in [notebook.tab(i, "text") for i in range(notebook.index("end"))]:
+                notebook.add(mods_tab, text="Mod Selection")
+            populate_mod_list(game["InstallDir"], game_dir)
+            notebook.select(mods_tab)
+
+            # Save state
+            last_state[sel_name] = {"launcher": "Vortex"}
+            save_state(last_state)
+
+
+
+        # -----------------------------
+        # User Defined
+        # -----------------------------
+        elif mode_var.get() == "User Defined":
+            exe = cmd_var.get().strip().strip('"')
+            if not exe:
+                messagebox.showerror("Error", "Please select an executable.")
+                return
+
+            shim_path = create_simple_shim(game_dir, exe)
+
+            version_label.config(text="Current version: Modded (User Defined)")
+            status_canvas.itemconfig(status_circle, fill="green")
+
+            mode_combo.config(state="disabled")
+            user_frame.pack_forget()
+            create_btn.pack_forget()
+
+            revert_btn.config(command=on_revert)
+            revert_btn.pack(pady=10)
+            copy_btn.pack(pady=10)
+
+            # Save state
+            last_state[sel_name] = {
+                "launcher": "User Defined",
+                "exe": exe
+            }
+            save_state(last_state)
+
+            # Copy launch option
+            launch_opts = f"\"{shim_path}\" %command%"
+            root.clipboard_clear()
+            root.clipboard_append(launch_opts)
+            show_status("✅ User Defined launcher created (copied to clipboard).")
+
+
+
+
+
+
+
+
+    def on_revert():
+        sel_name = game_var.get()
+        game = next(g for g in games if g["Name"] == sel_name)
+        lib_path = os.path.dirname(game["Manifest"])
+        game_dir = os.path.join(lib_path, "common", game["InstallDir"])
+
+        warn_restore(remove_mod_leftovers(game_dir))
+        # drop our launch option from Steam too (a user's own options stay)
+        push_launch_options({game["AppId"]: None})
+
+        # Reset UI
+        version_label.config(text="Current version: Vanilla")
+        status_canvas.itemconfig(status_circle, fill="red")
+
+        # ✅ Unlock dropdowns again
+        mode_combo.config(state="readonly")
+        profile_combo.config(state="readonly")
+
+        # Hide revert + copy buttons
+        revert_btn.pack_forget()
+        revert_unlock_btn.pack_forget()
+        copy_btn.pack_forget()
+
+        # ✅ Clear saved state for this game
+        if sel_name in last_state:
+            del last_state[sel_name]
+            save_state(last_state)
+
+        # Update status UI
+        update_status()
+        show_status(f"✅ Restored {sel_name} to Vanilla.")
+
+
+
+
+    def on_import_profile():
+        sel_name = game_var.get()
+        game = next((g for g in games if g["Name"] == sel_name), None)
+        if not game:
+            return
+        game_dir = os.path.join(os.path.dirname(game["Manifest"]), "common", game["InstallDir"])
+        exe_path = find_game_exe(game_dir)
+        if not exe_path:
+            messagebox.showerror("Error", f"Could not find any .exe in {game_dir}")
+            return
+        source = filedialog.askopenfilename(
+            title="Select exported profile (cancel to enter a profile code)",
+            filetypes=[("r2modman export", "*.r2z"), ("All files", "*.*")])
+        if not source:
+            source = simpledialog.askstring("Import profile", "Thunderstore profile code:")
+            if not source:
+                return
+        state = last_state.get(sel_name, {})
+        if state.get("launcher") not in (None, "Thunderstore"):
+            messagebox.showerror("Error", f"{sel_name} uses a {state['launcher']} launcher, restore vanilla first.")
+            return
+        try:
+            if not get_active_profile(game_dir) and state.get("profile"):
+                mark_active_profile(game_dir, state["profile"])
+            result = import_profile_source(source, game_dir, game["InstallDir"])
+        except (ModExtractError, OSError, ValueError, zipfile.BadZipFile) as e:
+            messagebox.showerror("Error", f"Import failed: {e}")
+            return
+        create_simple_shim(game_dir, exe_path)
+        last_state[sel_name] = {"launcher": "Thunderstore", "profile": result["name"], "imported": True}
+        save_state(last_state)
+        update_status()
+        if result["missing"] or result["substituted"]:
+            messagebox.showwarning("Import profile", format_import_report(result))
+        else:
+            show_status(f"✅ Imported profile '{result['name']}' ({result['files']} files).")
+
+    import_btn.config(command=on_import_profile)
+
+    def on_switch_profile(sel_name, game, game_dir):
+        state = last_state.get(sel_name, {})
+        name = profile_var.get()
+        if not name or name == state.get("profile"):
+            return
+        profile_path = None
+        if name != VANILLA_PROFILE:
+            profiles = get_thunderstore_profiles_any(game["InstallDir"])
+            profile_path = next((p for p in profiles if os.path.basename(p) == name), None)
+            if not profile_path and name not in list_staged_profiles(game_dir):
+                messagebox.showerror("Error", f"Thunderstore profile {name} not found.")
+                return
+        exe_path = find_game_exe(game_dir)
+        if not exe_path:
+            messagebox.showerror("Error", f"Could not find any .exe in {game_dir}")
+            return
+
+        # launchers made before staging existed have no marker yet
+        try:
+            if not get_active_profile(game_dir) and state.get("profile"):
+                mark_active_profile(game_dir, state["profile"])
+            switch_profile(game_dir, name, profile_path)
+        except (ModExtractError, OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not switch profile: {e}")
+            return
+
+        # keep the Steam launch option valid: vanilla and imported profiles
+        # are complete in the game folder, so they just start the game
+        if profile_path:
+            create_shim_with_sync(game_dir, exe_path, profile_path, state.get("verify", False))
+        else:
+            create_simple_shim(game_dir, exe_path)
+        state["profile"] = name
+        state["imported"] = not profile_path and name != VANILLA_PROFILE
+        last_state[sel_name] = state
+        save_state(last_state)
+        update_status()
+        show_status(f"✅ Switched {sel_name} to {name}.")
+
+    def on_copy():
+        sel_name = game_var.get()
+        game = next(g for g in games if g["Name"] == sel_name)
+        lib_path = os.path.dirname(game["Manifest"])
+        game_dir = os.path.join(lib_path, "common", game["InstallDir"])
+        shim_path = os.path.join(game_dir, "ModLaunch.cmd")
+        if not os.path.exists(shim_path):
+            messagebox.showerror("Error", "No shim found. Create a launcher first.")
+            return
+        launch_opts = f"\"{shim_path}\" %command%"
+        root.clipboard_clear()
+        root.clipboard_append(launch_opts)
+        show_status("✅ Launch option copied to clipboard.")
+
+    create_btn.config(command=on_ok)
+    revert_btn.config(command=on_revert)
+    copy_btn.config(command=on_copy)
+    mode_var.trace("w", update_mode)
+    game_var.trace("w", lambda *a: update_status())
+    create_btn.pack(side="bottom", pady=10)
+
+    def on_game_change(*args):
+        update_status()
+        if mode_var.get() == "Vortex":
+            sel_name = game_var.get()
+            game = next((g for g in games if g["Name"] == sel_name), None)
+            if game:
+                populate_mod_list(game["InstallDir"])
+
+    game_var.trace("w", on_game_change)
+
+
+    # ========================
+    # Tab 2: Custom Games
+    # ========================
+    custom_tab = tk.Frame(notebook)
+    notebook.add(custom_tab, text="Custom Games")
+
+    def build_custom_tab():
+        # --- Custom game name ---
+        tk.Label(custom_tab, text="Custom Game Name:").pack()
+        custom_name_var = tk.StringVar()
+        tk.Entry(custom_tab, textvariable=custom_name_var, width=40).pack(pady=5)
+
+        # --- Base game selection ---
+        tk.Label(custom_tab, text="Select Base Game or Custom:").pack()
+        all_game_names = ["Custom Game"] + [g["Name"] for g in games]
+        sel_game_var = tk.StringVar(value="Custom Game")
+        sel_game_combo = ttk.Combobox(custom_tab, textvariable=sel_game_var,
+                                      state="readonly", values=all_game_names, width=40)
+        sel_game_combo.pack(pady=5)
+        add_game_search(sel_game_combo, sel_game_var, fixed=["Custom Game"])
+
+        # --- Launcher selection ---
+        tk.Label(custom_tab, text="Select Launcher:").pack(pady=(10, 2))
+        mode_var2 = tk.StringVar(value="User Defined")
+        mode_combo2 = ttk.Combobox(custom_tab, textvariable=mode_var2, state="readonly",
+                                   width=20,
+                                   values=["User Defined", "Thunderstore", "Vortex"])
+        mode_combo2.pack(pady=5)
+
+        # --- Thunderstore profile frame ---
+        ts_profile_frame2 = tk.Frame(custom_tab)
+        ts_profile_var2 = tk.StringVar()
+        ts_profile_combo2 = ttk.Combobox(ts_profile_frame2, textvariable=ts_profile_var2,
+                                         state="readonly", width=40)
+        tk.Label(ts_profile_frame2, text="Thunderstore profile:").pack(side="left", padx=5)
+        ts_profile_combo2.pack(side="left", padx=5)
+
+        # --- Vortex profile frame ---
+        vx_profile_frame2 = tk.Frame(custom_tab)
+        vx_profile_var2 = tk.StringVar()
+        vx_profile_combo2 = ttk.Combobox(vx_profile_frame2, textvariable=vx_profile_var2,
+                                         state="readonly", width=40)
+        tk.Label(vx_profile_frame2, text="Vortex profile:").pack(side="left", padx=5)
+        vx_profile_combo2.pack(side="left", padx=5)
+
+        # shared by both synced launchers
+        verify_var2 = tk.BooleanVar(value=False)
+        for frame in (ts_profile_frame2, vx_profile_frame2):
+            tk.Checkbutton(frame, text="Verify before launch",
+                           variable=verify_var2).pack(side="left", padx=5)
+
+        # --- User-defined exe frame ---
+        user_frame2 = tk.Frame(custom_tab)
+        exe_var = tk.StringVar()
+        exe_entry = tk.Entry(user_frame2, textvariable=exe_var, width=50)
+        exe_entry.pack(side="left", padx=5)
+        tk.Button(user_frame2, text="Browse…", command=lambda:
+                  exe_var.set(filedialog.askopenfilename(
+                      filetypes=[("Executables", "*.exe *.bat *.cmd *.lnk"), ("All files", "*.*")])
+                  )).pack(side="left", padx=5)
+
+        # --- Mode updater ---
+        def update_mode2(*args):
+            ts_profile_frame2.pack_forget()
+            vx_profile_frame2.pack_forget()
+            user_frame2.pack_forget()
+
+            if sel_game_var.get() == "Custom Game":
+                mode_combo2["values"] = ["User Defined"]
+                mode_var2.set("User Defined")
+                user_frame2.pack(pady=5)
+                add_to_steam_btn.config(state="normal")
+
+            else:
+                mode_combo2["values"] = ["User Defined", "Thunderstore", "Vortex"]
+
+                if mode_var2.get() == "Thunderstore":
+                    sel_game = next((g for g in games if g["Name"] == sel_game_var.get()), None)
+                    if sel_game:
+                        profiles = get_thunderstore_profiles_any(sel_game["InstallDir"])
+                        if profiles:
+                            ts_profile_combo2["values"] = [os.path.basename(p) for p in profiles]
+                            ts_profile_combo2.current(0)
+                        else:
+                            ts_profile_combo2["values"] = ["No profiles detected"]
+                            ts_profile_combo2.current(0)
+                    ts_profile_frame2.pack(pady=5)
+                    add_to_steam_btn.config(state="normal")
+
+                elif mode_var2.get() == "Vortex":
+                    sel_game = next((g for g in games if g["Name"] == sel_game_var.get()), None)
+                    if sel_game:
+                        mods = get_vortex_downloads(sel_game["InstallDir"].lower())
+                        if mods:
+                            messagebox.showinfo("Mods Found", f"✅ Found {len(mods)} mods for {sel_game['Name']}.")
+                            profile_name = simpledialog.askstring("Profile Name", "Enter a profile name for this mod set:")
+                            if profile_name:
+                                vx_profile_var2.set(profile_name)
+                                populate_mod_list(sel_game["InstallDir"].lower())
+                                notebook.select(mods_tab)
+                                # Only enable Add to Steam after mods are valid
+                                add_to_steam_btn.config(state="normal")
+                            else:
+                                add_to_steam_btn.config(state="disabled")
+                        else:
+                            messagebox.showwarning("No Mods", "No mods found for this game in Vortex downloads.")
+                            add_to_steam_btn.config(state="disabled")
+                    else:
+                        add_to_steam_btn.config(state="disabled")
+
+                else:  # User Defined
+                    user_frame2.pack(pady=5)
+                    add_to_steam_btn.config(state="normal")
+
+        # --- Add custom button logic ---
+        def on_add_custom():
+            name = custom_name_var.get().strip()
+            if not name:
+                messagebox.showerror("Error", "Please enter a custom game name.")
+                return
+
+            if sel_game_var.get() == "Custom Game":
+                # User-specified exe
+                exe = exe_var.get().strip().strip('"')
+                if not exe:
+                    messagebox.showerror("Error", "Please select an executable.")
+                    return
+                startdir = os.path.dirname(exe)
+                shim_path = create_simple_shim(startdir, exe)
+                add_nonsteam_shortcut(name, shim_path, startdir, "")
+                register_custom_launch(name, shim_path, "User Defined", owns_folder=False)
+                refresh_custom_list()
+                show_status(f"✅ Custom launcher '{name}' added. Restart Steam to see it.")
+                return
+
+            # Base game (Steam)
+            sel_game = next((g for g in games if g["Name"] == sel_game_var.get()), None)
+            lib_path = os.path.dirname(sel_game["Manifest"])
+            game_dir = os.path.join(lib_path, "common", sel_game["InstallDir"])
+            exe_path = find_game_exe(game_dir)
+
+            safe_name = name.replace(" ", "_") or str(int(time.time()))
+            custom_dir = os.path.join(lib_path, "common",
+                                      sel_game["InstallDir"] + f"_customlaunch_{safe_name}")
+            os.makedirs(custom_dir, exist_ok=True)
+            profile_path, selected_mods = None, []
+
+            if mode_var2.get() == "Thunderstore":
+                profiles = get_thunderstore_profiles_any(sel_game["InstallDir"])
+                sel_profile = ts_profile_var2.get()
+                profile_path = next((p for p in profiles if os.path.basename(p) == sel_profile), None)
+                if not profile_path:
+                    messagebox.showerror("Error", "No Thunderstore profile selected.")
+                    return
+                shim_path = create_custom_shim_with_sync(custom_dir, exe_path, profile_path, game_dir,
+                                                         verify_var2.get())
+
+            elif mode_var2.get() == "Vortex":
+                gameid = sel_game["InstallDir"].lower()
+
+                # Collect selected mods from Mod Selection tab
+                selected_mods = [m for m, v in mod_vars.items() if v.get()]
+
+                if not selected_mods:
+                    messagebox.showerror("Error", "No mods selected.")
+                    return
+
+                # Deploy chosen mods into custom_dir/modded
+                try:
+                    deploy_vortex_mods(gameid, custom_dir, selected_mods)
+                except (ModExtractError, OSError) as e:
+                    messagebox.showerror("Error", f"Deploy failed, nothing was changed: {e}")
+                    return
+
+                # Create shim pointing to modded folder
+                shim_path = create_custom_shim_with_sync(custom_dir, exe_path,
+                                                         os.path.join(custom_dir, "modded"), game_dir,
+                                                         verify_var2.get())
+
+            else:  # User Defined exe
+                exe = exe_var.get().strip().strip('"')
+                if not exe:
+                    messagebox.showerror("Error", "Please select an executable.")
+                    return
+                shim_path = create_simple_shim(custom_dir, exe)
+
+            add_nonsteam_shortcut(name, shim_path, custom_dir, "")
+            register_custom_launch(name, shim_path, mode_var2.get(), sel_game["InstallDir"], sel_game["AppId"],
+                                   profile_path, selected_mods)
+            refresh_custom_list()
+            show_status(f"✅ Custom launcher '{name}' added for {sel_game['Name']}. Restart Steam to see it.")
+
+    lazy_tabs[str(custom_tab)] = build_custom_tab
+
+
+    # ========================
+    # Tab 3: Manage Custom Launches
+    # ========================
+    manage_tab = tk.Frame(notebook)
+    notebook.add(manage_tab, text="Manage Custom Launches")
+
+    # filled once the tab is built; until then there is nothing to refresh
+    custom_list_ctl = {"fill": None}
+
+    def refresh_custom_list(verify=False):
+        if custom_list_ctl["fill"]:
+            custom_list_ctl["fill"](verify)
+
+    def build_manage_tab():
+        custom_listbox = tk.Listbox(manage_tab, width=60, height=15)
+        custom_listbox.pack(pady=10)
+
+        # rows render from the registry; an entry is checked on disk only when
+        # it is selected or used (or on Rescan)
+        custom_keys = []
+        custom_entries = {}
+
+        def fill_custom_list(verify=False):
+            custom_listbox.delete(0, tk.END)
+            custom_entries.clear()
+            custom_entries.update(get_custom_launches(libs))
+            custom_keys[:] = list(custom_entries)
+            for entry in custom_entries.values():
+                custom_listbox.insert(tk.END, describe_custom_launch(entry, not verify or custom_launch_ok(entry)))
+
+        def selected_custom():
+            sel = custom_listbox.curselection()
+            if not sel:
+                messagebox.showerror("Error", "No custom launch selected.")
+                return None, None
+            key = custom_keys[sel[0]]
+            entry = custom_entries[key]
+            ok = custom_launch_ok(entry)
+            text = describe_custom_launch(entry, ok)
+            if custom_listbox.get(sel[0]) != text:
+                custom_listbox.delete(sel[0])
+                custom_listbox.insert(sel[0], text)
+                custom_listbox.selection_set(sel[0])
+            return key, entry if ok else dict(entry, missing=True)
+
+        def on_delete_custom():
+            key, entry = selected_custom()
+            if not entry:
+                return
+
+            remove_nonsteam_shortcut(entry["shim"])
+            try:
+                if entry["owns_folder"]:
+                    if os.path.exists(entry["folder"]):
+                        shutil.rmtree(entry["folder"])
+                elif os.path.exists(entry["shim"]):
+                    os.remove(entry["shim"])
+            except OSError as e:
+                messagebox.showerror("Error", f"Could not delete {entry['folder']}: {e}")
+                refresh_custom_list()
+                return
+            unregister_custom_launch(key)
+
+            refresh_custom_list()
+            show_status(f"❌ Custom launch '{entry['name']}' deleted. Restart Steam to see it.")
+
+        def on_browse_custom():
+            key, entry = selected_custom()
+            if not entry:
+                return
+            if entry.get("missing"):
+                messagebox.showwarning("Missing", f"The launcher in {entry['folder']} is gone. "
+                                                  "Use Delete Selected to drop the entry.")
+                return
+            open_path(entry["folder"])
+
+        custom_listbox.bind("<<ListboxSelect>>", lambda e: custom_listbox.curselection() and selected_custom())
+
+        btn_frame = tk.Frame(manage_tab)
+        btn_frame.pack(pady=5)
+        tk.Button(btn_frame, text="Browse", command=on_browse_custom).pack(side="left", padx=5)
+        tk.Button(btn_frame, text="Delete Selected", command=on_delete_custom).pack(side="left", padx=5)
+
+        custom_list_ctl["fill"] = fill_custom_list
+        fill_custom_list()
+
+    lazy_tabs[str(manage_tab)] = build_manage_tab
+
+    # --- Status message at bottom ---
+    status_var = tk.StringVar(value="")
+    status_label = tk.Label(root, textvariable=status_var, fg="green")
+    status_label.pack(side="bottom", pady=5)
+
+    def show_status(msg, duration=4000):
+        status_var.set(msg)
+        root.after(duration, lambda: status_var.set(""))
+
+    def warn_restore(report):
+        problems = []
+        if report["corrupt"]:
+            problems.append("These original files could not be restored (backup damaged):\n  "
+                            + "\n  ".join(report["corrupt"]))
+        if report["skipped"]:
+            problems.append("These files were changed by a game update and kept as they are:\n  "
+                            + "\n  ".join(report["skipped"]))
+        elif report["stale_build"]:
+            problems.append("The game was updated since the backup was taken.")
+        if problems:
+            messagebox.showwarning("Restore Vanilla", "\n\n".join(problems)
+                                   + "\n\nUse 'Verify integrity of game files' in Steam to repair.")
+
+    # Restart Steam utility button
+    def restart_steam():
+        try:
+            stop_steam()
+            start_steam()
+        except OSError:
+            show_status("❌ Could not find the steam command.")
+
+    restart_btn = tk.Button(root, text="🔄 Restart Steam", command=restart_steam)
+    restart_btn.pack(side="bottom", pady=2)
+
+    # Write launch options straight into Steam's localconfig.vdf (all users)
+    def push_launch_options(options):
+        if not options or not launch_options_pending(options):
+            return 0
+        restart = steam_running()
+        if restart:
+            if not messagebox.askyesno(
+                    "Steam is running",
+                    "Steam overwrites launch options when it exits.\n"
+                    "Close Steam, update the launch options and start it again?"):
+                return 0
+            if not stop_steam():
+                messagebox.showerror("Error", "Steam did not shut down, launch options were not changed.")
+                return 0
+        try:
+            changed = write_launch_options(options)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not update localconfig.vdf: {e}")
+            changed = 0
+        if restart:
+            start_steam()
+        return changed
+
+    def on_write_launch_options():
+        options = launch_options_from_state(last_state, games)
+        if not options:
+            show_status("ℹ️ No launchers to write.")
+            return
+        changed = push_launch_options(options)
+        show_status(f"✅ Launch options set for {len(options)} game(s) ({changed} entries changed).")
+
+    launch_opts_btn = tk.Button(root, text="📝 Write Launch Options to Steam", command=on_write_launch_options)
+    launch_opts_btn.pack(side="bottom", pady=2)
+
+    # Verify utility button (checks the selected game against its deployment)
+    def on_verify():
+        sel_name = game_var.get()
+        game = next((g for g in games if g["Name"] == sel_name), None)
+        state = last_state.get(sel_name)
+        if not game or not state:
+            show_status("ℹ️ Select a modded game to verify.")
+            return
+        game_dir = os.path.join(os.path.dirname(game["Manifest"]), "common", game["InstallDir"])
+        profile_path = None
+        if state.get("launcher") == "Thunderstore" and (
+                state.get("profile") == VANILLA_PROFILE or state.get("imported")):
+            show_status("ℹ️ No Thunderstore profile to compare this launcher with.")
+            return
+        if state.get("launcher") == "Thunderstore":
+            try:
+                with open(os.path.join(game_dir, "ModLaunch.cmd"), encoding="utf-8") as f:
+                    profile_path = next((line.strip()[len("set PROFILE="):] for line in f
+                                         if line.startswith("set PROFILE=")), None)
+            except OSError:
+                pass
+            if not profile_path or not os.path.isdir(profile_path):
+                messagebox.showerror("Error", "Could not find the Thunderstore profile for this launcher.")
+                return
+        report = verify_deployment(game_dir, profile_path)
+        if report["missing"] or report["modified"] or report["extra"]:
+            messagebox.showwarning("Verify Mods", format_verify_report(report))
+        else:
+            show_status(f"✅ {report['checked']} mod files verified.")
+
+    verify_btn = tk.Button(root, text="🔍 Verify Mods", command=on_verify)
+    verify_btn.pack(side="bottom", pady=2)
+
+    def set_game_names():
+        names = [g["Name"] for g in games]
+        game_index.update(games)
+        for refilter in game_filters:
+            refilter()
+        if game_var.get() not in names and names:
+            combo.current(0)
+
+    # Rescan utility button (drops every cached discovery result)
+    def on_refresh():
+        refresh_discovery()
+        libs[:] = get_library_folders(get_steam_root())
+        games[:] = find_games(libs)
+        set_game_names()
+        watch_known_folders()
+        update_status()
+        refresh_custom_list(verify=True)
+        show_status("✅ Rescanned Steam libraries and mod folders.")
+
+    refresh_btn = tk.Button(root, text="⟳ Rescan", command=on_refresh)
+    refresh_btn.pack(side="bottom", pady=2)
+
+    # Performance window: rolling per-span totals from the trace buffer
+    perf_window = {"top": None}
+
+    def open_perf_panel():
+        if perf_window["top"] is not None and perf_window["top"].winfo_exists():
+            perf_window["top"].lift()
+            return
+        top = tk.Toplevel(root)
+        top.title("Performance")
+        perf_window["top"] = top
+        tree = ttk.Treeview(top, columns=("cat", "count", "total", "mean", "max"), height=15)
+        tree.heading("#0", text="Span")
+        tree.column("#0", width=220)
+        for col, title in (("cat", "Kind"), ("count", "Calls"), ("total", "Total ms"),
+                           ("mean", "Mean ms"), ("max", "Max ms")):
+            tree.heading(col, text=title)
+            tree.column(col, width=80, anchor="e")
+        tree.pack(fill="both", expand=True, padx=5, pady=5)
+        counters_var = tk.StringVar()
+        tk.Label(top, textvariable=counters_var, justify="left", wraplength=600).pack(padx=5)
+
+        def export(chrome):
+            ext = ".json" if chrome else ".jsonl"
+            path = filedialog.asksaveasfilename(parent=top, defaultextension=ext,
+                                                initialfile=f"steam_mod_launcher_trace{ext}")
+            if path:
+                try:
+                    n = export_trace(path)
+                except OSError as e:
+                    messagebox.showerror("Export", f"Could not write trace: {e}", parent=top)
+                    return
+                show_status(f"✅ {n} spans exported to {path}")
+
+        buttons = tk.Frame(top)
+        buttons.pack(pady=5)
+        tk.Button(buttons, text="Export Chrome trace…", command=lambda: export(True)).pack(side="left", padx=5)
+        tk.Button(buttons, text="Export JSON lines…", command=lambda: export(False)).pack(side="left", padx=5)
+        tk.Button(buttons, text="Clear", command=clear_trace).pack(side="left", padx=5)
+
+        def refresh():
+            if not top.winfo_exists():
+                return
+            tree.delete(*tree.get_children())
+            for name, cat, count, total, worst in trace_summary():
+                tree.insert("", "end", text=name, values=(
+                    cat, count, f"{total * 1000:.1f}", f"{total * 1000 / count:.2f}", f"{worst * 1000:.1f}"))
+            counters_var.set("  ".join(f"{k}={v}" for k, v in sorted(_trace_counters.items())))
+            top.after(1000, refresh)
+
+        refresh()
+
+    tk.Button(root, text="⏱ Performance", command=open_perf_panel).pack(side="bottom", pady=2)
+
+    # Watch libraries, Vortex downloads and Thunderstore profiles and apply
+    # only the deltas to the game list / mod list / profile list
+    tracker = ChangeTracker()
+
+    def watch_known_folders():
+        for lib in libs:
+            tracker.watch(lib, "steamapps")
+        try:
+            vortex_base = get_vortex_download_base()
+            if os.path.isdir(vortex_base):
+                for folder in os.listdir(vortex_base):
+                    tracker.watch(os.path.join(vortex_base, folder), "vortex", folder)
+            for base in get_thunderstore_bases():
+                for folder in os.listdir(base):
+                    tracker.watch(os.path.join(base, folder, "profiles"), "profiles", folder)
+        except OSError as e:
+            print(f"[WATCH] Could not watch mod folders: {e}")
+
+    def apply_changes():
+        try:
+            events = tracker.poll()
+        except Exception as e:
+            print(f"[WATCH] Poll failed: {e}")
+            events = []
+
+        games_changed = False
+        for e in events:
+            if e["event"] in ("game_installed", "game_updated"):
+                try:
+                    game = parse_appmanifest(e["path"])
+                except Exception:
+                    continue
+                games[:] = [g for g in games if g["AppId"] != game["AppId"]] + [game]
+                register_games([game])
+                games_changed = True
+            elif e["event"] == "game_removed":
+                appid = e["name"][len("appmanifest_"):-len(".acf")]
+                games[:] = [g for g in games if g["AppId"] != appid]
+                games_changed = True
+        if games_changed:
+            games.sort(key=lambda g: g["Name"].lower())
+            set_game_names()
+
+        game = next((g for g in games if g["Name"] == game_var.get()), None)
+        if game and events:
+            norm_id = normalize_gameid(game["InstallDir"])
+            mods_changed = any(e["kind"] == "vortex" and e["context"] == norm_id for e in events)
+            profiles_changed = any(e["kind"] == "profiles" for e in events)
+            if mods_changed and mode_var.get() == "Vortex":
+                update_status()
+            elif profiles_changed and mode_var.get() == "Thunderstore" and game["Name"] not in last_state:
+                update_mode()
+
+        root.after(2000, apply_changes)
+
+    watch_known_folders()
+    root.after(2000, apply_changes)
+    
+    
+    
+    
+    
+    # ========================
+    # Tab 4: Mod Selection (created later when needed)
+    # ========================
+    mods_tab = tk.Frame(notebook)
+    # ❌ don’t add it yet — only add inside update_status() or on_ok()
+
+
+    tk.Label(mods_tab, text="Select mods to enable:").pack(pady=5)
+
+    # Filter box: words, "type:unity", ">10mb" (see ModSearchIndex)
+    search_frame = tk.Frame(mods_tab)
+    search_frame.pack(fill="x", padx=10)
+    tk.Label(search_frame, text="Filter:").pack(side="left")
+    mod_search_var = tk.StringVar()
+    tk.Entry(search_frame, textvariable=mod_search_var).pack(side="left", fill="x", expand=True, padx=5)
+
+    # Treeview only draws the visible rows, so large download folders stay fast
+    mods_listbox_frame = tk.Frame(mods_tab)
+    mods_listbox_frame.pack(fill="both", expand=True, padx=10)
+    mod_tree = ttk.Treeview(mods_listbox_frame, columns=("on", "name", "type", "size"),
+                            show="headings", selectmode="browse", height=15)
+    for col, title, width, stretch in (("on", "", 30, False), ("name", "Mod", 320, True),
+                                       ("type", "Type", 100, False), ("size", "Size", 80, False)):
+        mod_tree.heading(col, text=title)
+        mod_tree.column(col, width=width, stretch=stretch, anchor="w" if col == "name" else "center")
+    mod_scroll = ttk.Scrollbar(mods_listbox_frame, orient="vertical", command=mod_tree.yview)
+    mod_tree.configure(yscrollcommand=mod_scroll.set)
+    mod_tree.pack(side="left", fill="both", expand=True)
+    mod_scroll.pack(side="right", fill="y")
+    no_mods_label = tk.Label(mods_tab, text="❌ No mods found for this game.")
+
+    mod_vars = {}  # {mod_name: tk.BooleanVar()}
+    mod_rows = {}  # {mod_name: tree item id}, detached rows included
+    mod_entries = {}  # {mod_name: archive index entry}
+    mod_list = {"order": [], "search": None, "filter_job": None}
+    mods_context = {}  # gameid / game_dir of the list currently shown
+
+    # Conflicts between enabled mods + priority editor
+    conflict_var = tk.StringVar(value="")
+    tk.Label(mods_tab, textvariable=conflict_var, fg="orange", justify="left").pack(pady=2)
+
+    def update_conflicts():
+        gameid = mods_context.get("gameid")
+        game_dir = mods_context.get("game_dir")
+        selected = [m for m, v in mod_vars.items() if v.get()]
+        if not gameid or not selected:
+            conflict_var.set("")
+            return
+        priority = get_mod_priority(gameid)
+        plan = resolve_mod_dependencies(get_vortex_downloads(gameid), selected, priority)
+        engine = detect_engine(game_dir) if game_dir else "Unknown"
+        lines = summarize_conflicts(find_mod_conflicts(plan["order"], engine, priority))
+        text = []
+        if lines:
+            more = f"\n…and {len(lines) - 5} more" if len(lines) > 5 else ""
+            text.append("⚠ Conflicting files:\n" + "\n".join(lines[:5]) + more)
+        if plan["missing"]:
+            text.append("⚠ Missing dependencies: " + ", ".join(plan["missing"][:5]))
+        if plan["cycles"]:
+            text.append("⚠ Dependency cycle: " + "; ".join(" → ".join(c) for c in plan["cycles"]))
+        conflict_var.set("\n".join(text))
+
+    def open_priority_dialog():
+        gameid = mods_context.get("gameid")
+        if not gameid:
+            return
+        names = [os.path.basename(m) for m in get_vortex_downloads(gameid)]
+        current = get_mod_priority(gameid)
+        order = [n for n in current if n in names] + sorted(n for n in names if n not in current)
+
+        win = tk.Toplevel(root)
+        win.title("Mod Priority")
+        tk.Label(win, text="Mods higher in the list win file conflicts:").pack(pady=5)
+        prio_list = tk.Listbox(win, width=60, height=15)
+        for n in order:
+            prio_list.insert(tk.END, n)
+        prio_list.pack(padx=10, pady=5)
+
+        def move(delta):
+            sel = prio_list.curselection()
+            if not sel:
+                return
+            i, j = sel[0], sel[0] + delta
+            if j < 0 or j >= prio_list.size():
+                return
+            name = prio_list.get(i)
+            prio_list.delete(i)
+            prio_list.insert(j, name)
+            prio_list.selection_set(j)
+
+        def save():
+            set_mod_priority(gameid, prio_list.get(0, tk.END))
+            win.destroy()
+            # winners may have changed, redeploy the enabled set
+            if mods_context.get("game_dir") and any(v.get() for v in mod_vars.values()):
+                apply_mod_changes()
+            update_conflicts()
+
+        prio_btns = tk.Frame(win)
+        prio_btns.pack(pady=5)
+        tk.Button(prio_btns, text="▲ Up", command=lambda: move(-1)).pack(side="left", padx=5)
+        tk.Button(prio_btns, text="▼ Down", command=lambda: move(1)).pack(side="left", padx=5)
+        tk.Button(prio_btns, text="Save", command=save).pack(side="left", padx=5)
+
+    tk.Button(mods_tab, text="Priority…", command=open_priority_dialog).pack(pady=5)
+
+    # Pending change-set: toggles only mark the list dirty; Apply (or the
+    # auto-apply debounce) deploys the net result once on a worker thread
+    # and writes the state file once when it succeeds.
+    AUTO_APPLY_DELAY_MS = 1500
+    apply_frame = tk.Frame(mods_tab)
+    apply_frame.pack(pady=5)
+    pending_var = tk.StringVar(value="")
+    tk.Label(apply_frame, textvariable=pending_var).pack(side="left", padx=5)
+    apply_btn = tk.Button(apply_frame, text="Apply", state="disabled")
+    apply_btn.pack(side="left", padx=5)
+    auto_apply_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(apply_frame, text="Auto-apply", variable=auto_apply_var,
+                   command=lambda: update_pending()).pack(side="left", padx=5)
+    apply_ctl = {"job": None, "worker": None, "target": None, "events": queue.Queue()}
+
+    def preview_mod_changes():
+        gameid, game_dir = mods_context.get("gameid"), mods_context.get("game_dir")
+        if not game_dir:
+            return
+        try:
+            plan = plan_vortex_deploy(gameid, game_dir, selected_mods())
+        except (ModExtractError, OSError, zipfile.BadZipFile) as e:
+            messagebox.showerror("Preview", f"Could not plan the deploy:\n{e}")
+            return
+        show = messagebox.showinfo if plan["fits"] else messagebox.showwarning
+        show("Deploy preview", format_plan(plan))
+
+    tk.Button(apply_frame, text="Preview", command=preview_mod_changes).pack(side="left", padx=5)
+
+    def selected_mods():
+        return [m for m in mod_list["order"] if mod_vars[m].get()]
+
+    def update_pending(auto=True):
+        if apply_ctl["job"]:
+            root.after_cancel(apply_ctl["job"])
+            apply_ctl["job"] = None
+        if apply_ctl["worker"]:
+            return  # the progress text owns the label while deploying
+        applied = set((last_state.get(game_var.get()) or {}).get("enabled_mods", [])) & set(mod_vars)
+        count = len(set(selected_mods()) ^ applied)
+        if not mods_context.get("game_dir") or not count:
+            pending_var.set("")
+            apply_btn.config(state="disabled")
+            return
+        pending_var.set(f"{count} pending change{'s' if count != 1 else ''}")
+        apply_btn.config(state="normal")
+        if auto and auto_apply_var.get():
+            apply_ctl["job"] = root.after(AUTO_APPLY_DELAY_MS, apply_mod_changes)
+
+    def apply_mod_changes():
+        apply_ctl["job"] = None
+        gameid, game_dir = mods_context.get("gameid"), mods_context.get("game_dir")
+        if apply_ctl["worker"] or not game_dir:
+            return
+        selected = selected_mods()
+        cancel = threading.Event()
+        events = apply_ctl["events"]
+
+        def work():
+            try:
+                deploy_vortex_mods(gameid, game_dir, selected, cancel=cancel,
+                                   progress=lambda done, total, rate: events.put(("progress", done, total, rate)))
+                events.put(("done", None))
+            except Exception as e:
+                # anything uncaught would leave the UI on "Deploying…" for good
+                events.put(("done", e))
+
+        apply_ctl["target"] = (game_var.get(), selected)
+        apply_ctl["worker"] = threading.Thread(target=work, daemon=True)
+        apply_btn.config(text="Cancel", state="normal", command=cancel.set)
+        pending_var.set("Deploying…")
+        apply_ctl["worker"].start()
+        root.after(100, poll_apply)
+
+    def poll_apply():
+        finished = None
+        while finished is None:
+            try:
+                event = apply_ctl["events"].get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == "progress":
+                _, done, total, rate = event
+                pct = 100 * done / total if total else 100
+                pending_var.set(f"Deploying… {pct:.0f}% ({rate / 1024 ** 2:.1f} MB/s)")
+            else:
+                finished = event
+        if finished is None:
+            root.after(100, poll_apply)
+            return
+
+        apply_ctl["worker"] = None
+        apply_btn.config(text="Apply", command=apply_mod_changes)
+        sel_name, selected = apply_ctl["target"]
+        error = finished[1]
+        if isinstance(error, ExtractCancelled):
+            show_status("Deploy cancelled, previous mods kept.")
+        elif error is not None:
+            messagebox.showerror("Error", f"Deploy failed, previous mods kept: {error}")
+        else:
+            last_state[sel_name] = {"launcher": "Vortex", "enabled_mods": selected}
+            save_state(last_state)
+            if game_var.get() == sel_name:
+                version_label.config(
+                    text=f"Current version: Modded (Vortex, {len(selected)} mod{'s' if len(selected) != 1 else ''} enabled)"
+                )
+            show_status(f"✅ Deployed {len(selected)} mod{'s' if len(selected) != 1 else ''}.")
+        # toggles made meanwhile form the next change-set; don't auto-retry failures
+        update_pending(auto=error is None)
+
+    apply_btn.config(command=apply_mod_changes)
+
+    def apply_mod_filter():
+        mod_list["filter_job"] = None
+        search = mod_list["search"]
+        keys = search.query(mod_search_var.get()) if search else set()
+        visible = [mod_rows[n] for n in mod_list["order"] if n in keys]
+        current = list(mod_tree.get_children())
+        if current == visible:
+            return
+        if current:
+            mod_tree.detach(*current)
+        for i, iid in enumerate(visible):
+            mod_tree.move(iid, "", i)
+
+    def schedule_mod_filter(*args):
+        if mod_list["filter_job"]:
+            root.after_cancel(mod_list["filter_job"])
+        mod_list["filter_job"] = root.after(120, apply_mod_filter)
+
+    mod_search_var.trace_add("write", schedule_mod_filter)
+
+    def mod_row_values(mod_name):
+        entry = mod_entries.get(mod_name)
+        checked = "☑" if mod_vars[mod_name].get() else "☐"
+        if not entry:  # unreadable archive
+            return (checked, mod_name, "?", "")
+        return (checked, mod_name, entry.get("mod_type", ""), format_size(entry.get("total_size", 0)))
+
+    def on_mod_click(event, checkbox_only):
+        # single click on the ☐ column, or double click anywhere else
+        iid = mod_tree.identify_row(event.y)
+        if iid and (mod_tree.identify_column(event.x) == "#1") == checkbox_only:
+            toggle_row(iid)
+
+    def on_mod_key(event):
+        for iid in mod_tree.selection():
+            toggle_row(iid)
+
+    def toggle_row(iid):
+        mod_name = mod_tree.set(iid, "name")
+        var = mod_vars.get(mod_name)
+        if var is None:
+            return
+        var.set(not var.get())
+        update_conflicts()
+        update_pending()
+
+    mod_tree.bind("<Button-1>", lambda e: on_mod_click(e, True))
+    mod_tree.bind("<Double-1>", lambda e: on_mod_click(e, False))
+    mod_tree.bind("<space>", on_mod_key)
+
+    def populate_mod_list(gameid, game_dir=None):
+        """
+        Diff the rows against the download folder: rows of mods that are
+        still there keep their widget and check state, only added/removed
+        mods touch the tree. Switching to another game starts over.
+        """
+        if game_dir is None and mods_context.get("gameid") == gameid:
+            game_dir = mods_context.get("game_dir")
+        if (mods_context.get("gameid"), mods_context.get("game_dir")) != (gameid, game_dir):
+            mod_tree.delete(*mod_rows.values())
+            mod_rows.clear()
+            mod_vars.clear()
+            mod_entries.clear()
+        mods_context.clear()
+        mods_context.update(gameid=gameid, game_dir=game_dir)
+        conflict_var.set("")
+
+        mods = get_vortex_downloads(gameid)
+        index = index_mods(mods)
+        by_name = {os.path.basename(m): m for m in mods}
+
+        for gone in [n for n in mod_rows if n not in by_name]:
+            mod_tree.delete(mod_rows.pop(gone))
+            mod_vars.pop(gone, None)
+            mod_entries.pop(gone, None)
+        for mod_name, path in by_name.items():
+            mod_entries[mod_name] = index.get(path) or {}
+            if mod_name in mod_rows:
+                mod_tree.item(mod_rows[mod_name], values=mod_row_values(mod_name))
+                continue
+            var = tk.BooleanVar(value=False)  # start unchecked
+            mod_vars[mod_name] = var
+            mod_rows[mod_name] = mod_tree.insert("", "end", values=mod_row_values(mod_name))
+            # keep the ☑/☐ column in step with the variable (update_status sets it too)
+            var.trace_add("write", lambda *a, n=mod_name: mod_tree.item(
+                mod_rows[n], values=mod_row_values(n)) if n in mod_rows else None)
+
+        mod_list["order"] = sorted(by_name, key=str.lower)
+        mod_list["search"] = ModSearchIndex({
+            n: {"name": e.get("name"), "author": e.get("author"), "version": e.get("version"),
+                "type": e.get("mod_type"), "size": e.get("total_size", 0)}
+            for n, e in mod_entries.items()})
+        apply_mod_filter()
+
+        if not mods:
+            no_mods_label.pack(before=mods_listbox_frame)
+            return False
+        no_mods_label.pack_forget()
+        return True
+
+
+
+
+    # only now that every tab and widget exists (a Vortex game fills the
+    # Mod Selection tab)
+    update_status()
+
+    # --profile covers startup only, not the time spent waiting for clicks
+    root.after_idle(stop_profiling)
+    root.mainloop()
@@ -0,0 +1,238 @@
+"""
+Launch shims and the registry of custom launches.
+"""
+import os
+import json
+
+from .common import format_size, write_json_atomic
+from .discovery import get_library_folders, get_steam_root
+from .mods import PROFILE_ROOT_FILES, snapshot_vanilla
+from .thunderstore import clear_presync_marker, PRESYNC_MARKER
+from .verify import self_command, shim_verify_line
+
+# -----------------------------
+# --- Shim creation helpers ---
+# -----------------------------
+def create_simple_shim(game_dir, mod_cmd):
+    shim_path = os.path.join(game_dir, "ModLaunch.cmd")
+    mod_cmd = mod_cmd.strip().strip('"')
+    if mod_cmd.lower().endswith(".lnk"):
+        launch_line = f'start "" explorer.exe "{mod_cmd}" %*'
+    else:
+        launch_line = f'start "" "{mod_cmd}" %*'
+    shim = f"""@echo off
+setlocal enabledelayedexpansion
+{launch_line}
+exit
+"""
+    with open(shim_path, "w", encoding="utf-8") as f:
+        f.write(shim)
+    return shim_path
+
+def create_shim_with_sync(game_dir, game_exe, profile_path, verify=False):
+    shim_path = os.path.join(game_dir, "ModLaunch.cmd")
+    verify_line = shim_verify_line("%~dp0.", "%PROFILE%") if verify else ""
+    clear_presync_marker(game_dir)
+    shim = f"""@echo off
+setlocal enabledelayedexpansion
+set PROFILE={profile_path}
+
+rem the pre-sync daemon already mirrored the profile and is still running
+if exist "%~dp0{PRESYNC_MARKER}" {self_command()} --presync-check "%~dp0." --ts-profile "%PROFILE%" && goto launch
+
+rem /D: only files newer than the staged copy are copied
+if exist "%PROFILE%\\BepInEx" (
+    xcopy /E /Y /I /D "%PROFILE%\\BepInEx" "%~dp0BepInEx" >nul
+)
+for %%f in (doorstop_config.ini winhttp.dll version.dll) do (
+    if exist "%PROFILE%\\%%f" xcopy /Y /D "%PROFILE%\\%%f" "%~dp0." >nul
+)
+
+:launch
+{verify_line}start "" "{game_exe}" %*
+timeout /t 3 >nul
+exit
+"""
+    with open(shim_path, "w", encoding="utf-8") as f:
+        f.write(shim)
+    return shim_path
+
+def create_custom_shim_with_sync(shim_dir, game_exe, profile_path, game_dir, verify=False):
+    os.makedirs(shim_dir, exist_ok=True)
+    # the shim overwrites the loader files in the real game folder at launch
+    snapshot_vanilla(game_dir, PROFILE_ROOT_FILES)
+    shim_path = os.path.join(shim_dir, "ModLaunch.cmd")
+    verify_line = shim_verify_line("%GAMEDIR%", "%~dp0modded") if verify else ""
+    shim = f"""@echo off
+setlocal enabledelayedexpansion
+set PROFILE={profile_path}
+set GAMEDIR={game_dir}
+
+if exist "%~dp0modded" rmdir /S /Q "%~dp0modded"
+mkdir "%~dp0modded"
+
+if exist "%PROFILE%\\BepInEx" (
+    xcopy /E /Y /I "%PROFILE%\\BepInEx" "%~dp0modded\\BepInEx" >nul
+)
+for %%f in (doorstop_config.ini winhttp.dll version.dll) do (
+    if exist "%PROFILE%\\%%f" copy /Y "%PROFILE%\\%%f" "%~dp0modded\\%%f" >nul
+)
+
+if exist "%GAMEDIR%\\BepInEx" rmdir /S /Q "%GAMEDIR%\\BepInEx"
+for %%f in (doorstop_config.ini winhttp.dll version.dll) do (
+    if exist "%GAMEDIR%\\%%f" del /F /Q "%GAMEDIR%\\%%f"
+)
+
+if exist "%~dp0modded\\BepInEx" (
+    xcopy /E /Y /I "%~dp0modded\\BepInEx" "%GAMEDIR%\\BepInEx" >nul
+)
+for %%f in (doorstop_config.ini winhttp.dll version.dll) do (
+    if exist "%~dp0modded\\%%f" copy /Y "%~dp0modded\\%%f" "%GAMEDIR%\\%%f" >nul
+)
+
+{verify_line}start "" "{game_exe}" %*
+timeout /t 3 >nul
+exit
+"""
+    with open(shim_path, "w", encoding="utf-8") as f:
+        f.write(shim)
+    return shim_path
+
+def is_modded(game):
+    """
+    Detect modded state ONLY if our launcher placed something.
+    Checks for shim + our modded deployment.
+    """
+    game_dir = os.path.join(os.path.dirname(game["Manifest"]), "common", game["InstallDir"])
+
+    # Shim marker
+    shim = os.path.join(game_dir, "ModLaunch.cmd")
+    if os.path.exists(shim):
+        return True
+
+    # Vortex-style folder
+    if os.path.exists(os.path.join(game_dir, "modded")):
+        return True
+
+    # Thunderstore deploy leaves BepInEx directly in game folder
+    bepinex_dir = os.path.join(game_dir, "BepInEx")
+    if os.path.exists(bepinex_dir):
+        return True
+
+    return False
+
+
+# -----------------------------
+# --- Custom launches       ---
+# -----------------------------
+# Every custom launch we create is recorded in CUSTOM_REGISTRY_FILE, so the
+# Manage tab doesn't have to list every library's common folder. Add and
+# delete rewrite the whole file atomically once their disk work succeeded.
+# A missing registry is seeded once from the old "<InstallDir>_customlaunch_
+# <name>" folder scan; entries are only checked against disk when used.
+CUSTOM_REGISTRY_FILE = os.path.join(os.path.expanduser("~"), "steam_mod_launcher_customs.json")
+CUSTOM_REGISTRY_VERSION = 1
+CUSTOM_LAUNCH_TAG = "_customlaunch_"
+
+def _registry_key(folder):
+    return os.path.normcase(os.path.abspath(folder))
+
+def _folder_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            try:
+                total += os.path.getsize(os.path.join(root, f))
+            except OSError:
+                pass
+    return total
+
+def _read_shim_profile(shim):
+    try:
+        with open(shim, encoding="utf-8") as f:
+            return next((line.strip()[len("set PROFILE="):] for line in f
+                         if line.startswith("set PROFILE=")), None)
+    except OSError:
+        return None
+
+def _scan_custom_launches(libs):
+    launches = {}
+    for lib in libs:
+        common_dir = os.path.join(lib, "common")
+        if not os.path.isdir(common_dir):
+            continue
+        for folder in os.listdir(common_dir):
+            if CUSTOM_LAUNCH_TAG not in folder:
+                continue
+            path = os.path.join(common_dir, folder)
+            shim = os.path.join(path, "ModLaunch.cmd")
+            if not os.path.exists(shim):
+                continue
+            base, custom = folder.split(CUSTOM_LAUNCH_TAG, 1)
+            profile = _read_shim_profile(shim)
+            if profile is None:
+                launcher = "User Defined"
+            elif _registry_key(profile) == _registry_key(os.path.join(path, "modded")):
+                launcher = "Vortex"
+            else:
+                launcher = "Thunderstore"
+            launches[_registry_key(path)] = {
+                "name": custom.replace("_", " "), "base": base, "appid": None,
+                "launcher": launcher, "folder": path, "shim": shim, "owns_folder": True,
+                "profile": profile if launcher == "Thunderstore" else None,
+                "mods": [], "size": _folder_size(path),
+            }
+    return launches
+
+def _load_custom_registry(libs=None):
+    try:
+        with open(CUSTOM_REGISTRY_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == CUSTOM_REGISTRY_VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    if libs is None:
+        libs = get_library_folders(get_steam_root())
+    data = {"version": CUSTOM_REGISTRY_VERSION, "launches": _scan_custom_launches(libs)}
+    write_json_atomic(CUSTOM_REGISTRY_FILE, data)
+    print(f"[CUSTOM] Registry seeded with {len(data['launches'])} existing launches")
+    return data
+
+def get_custom_launches(libs=None):
+    """
+    {key: entry} of registered custom launches, by name.
+    """
+    launches = _load_custom_registry(libs)["launches"]
+    return dict(sorted(launches.items(), key=lambda kv: (kv[1]["name"].lower(), kv[1]["base"] or "")))
+
+def register_custom_launch(name, shim, launcher, base=None, appid=None, profile=None,
+                           mods=(), owns_folder=True):
+    folder = os.path.dirname(shim)
+    entry = {
+        "name": name, "base": base, "appid": appid, "launcher": launcher,
+        "folder": folder, "shim": shim, "owns_folder": owns_folder,
+        "profile": profile, "mods": list(mods),
+        "size": _folder_size(folder) if owns_folder else 0,
+    }
+    data = _load_custom_registry()
+    data["launches"][_registry_key(folder)] = entry
+    write_json_atomic(CUSTOM_REGISTRY_FILE, data)
+    return entry
+
+def unregister_custom_launch(key):
+    data = _load_custom_registry()
+    if data["launches"].pop(key, None) is not None:
+        write_json_atomic(CUSTOM_REGISTRY_FILE, data)
+
+def custom_launch_ok(entry):
+    return os.path.isfile(entry["shim"])
+
+def describe_custom_launch(entry, ok=True):
+    text = f"{entry['name']} (for {entry['base']})" if entry["base"] else entry["name"]
+    text += f" — {entry['launcher']}"
+    if entry["mods"]:
+        text += f", {len(entry['mods'])} mods"
+    if entry["size"]:
+        text += f", {format_size(entry['size'])}"
+    return text if ok else f"{text}  ⚠ missing"
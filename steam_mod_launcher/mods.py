@@ -0,0 +1,1561 @@
+"""
+Vortex mods: archive index, conflicts, dependencies, extraction and deployment.
+"""
+import os
+import re
+import json
+import shutil
+import time
+import collections
+import threading
+import queue
+import bisect
+import zlib
+
+from .common import format_size, IS_WINDOWS, last_state, save_state, state_lock, write_json_atomic
+from .tracing import trace_count, traced
+from .discovery import (detect_engine, discovery_cached, get_vortex_download_base,
+                        parse_appmanifest, vortex_gameid)
+
+# -----------------------------
+# --- Vortex Mod helpers    ---
+# -----------------------------
+def normalize_gameid(gameid):
+    """
+    Normalize Steam InstallDir to Vortex folder name.
+    Example: 'Lethal Company' -> 'lethalcompany', 'Skyrim Special Edition' -> 'skyrimse'
+    """
+    folder = vortex_gameid(gameid)
+    return folder.lower() if folder else gameid.lower().replace(" ", "").replace("-", "")
+
+def _vortex_download_dirs(gameid):
+    base = get_vortex_download_base()
+    return [base, os.path.join(base, normalize_gameid(gameid))]
+
+@discovery_cached(watch=_vortex_download_dirs)
+def get_vortex_downloads(gameid):
+    """
+    Find mods for a given game from Vortex downloads.
+    Supports both .zip files and extracted folders.
+    """
+    base = get_vortex_download_base()
+    norm_id = normalize_gameid(gameid)
+    game_dir = os.path.join(base, norm_id)
+
+    if not os.path.exists(game_dir):
+        print(f"[VORTEX] No downloads found for {norm_id} (from {gameid})")
+        return []
+
+    mods = []
+    for f in os.listdir(game_dir):
+        full_path = os.path.join(game_dir, f)
+        if f.lower().endswith(".zip") or os.path.isdir(full_path):
+            mods.append(full_path)
+
+    print(f"[VORTEX] Found {len(mods)} mods for {norm_id}")
+    return mods
+
+
+
+
+def extract_mod(zip_path, target_dir, clean=True, progress=None, cancel=None):
+    """
+    Extract a single zip mod into the target folder.
+    clean=False keeps existing files (frameworks extract into the game root).
+    The old version is only removed once the new one extracted and verified.
+    """
+    import zipfile
+    with zipfile.ZipFile(zip_path, 'r') as zf:
+        members = [(i.filename, i.filename) for i in zf.infolist() if not i.is_dir()]
+        total = sum(i.file_size for i in zf.infolist())
+    staging = target_dir.rstrip("\\/") + STAGING_DIR
+    if os.path.exists(staging):
+        shutil.rmtree(staging)
+    try:
+        staged = stage_members(zip_path, members, staging,
+                               make_progress(total, progress, os.path.basename(zip_path)), cancel)
+        if clean and os.path.exists(target_dir):
+            shutil.rmtree(target_dir)  # clean old version
+        os.makedirs(target_dir, exist_ok=True)
+        commit_staged(staged, target_dir)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    print(f"[DEPLOYED] {os.path.basename(zip_path)} -> {target_dir}")
+
+def deploy_vortex_mods(gameid, game_dir, selected_mods=None, priority=None,
+                       progress=None, cancel=None):
+    mods = get_vortex_downloads(gameid)
+    if not mods:
+        return False
+    if priority is None:
+        priority = get_mod_priority(gameid)
+
+    # dependencies first; selected mods pull in the downloads they depend on
+    # (None deploys everything, an empty selection nothing)
+    plan = resolve_mod_dependencies(mods, selected_mods, priority)
+    for dep in plan["missing"]:
+        print(f"[DEPS] Missing dependency: {dep}")
+    for key, paths in plan["duplicates"].items():
+        print(f"[DEPS] Several versions of {key} downloaded: {', '.join(os.path.basename(p) for p in paths)}")
+    for cycle in plan["cycles"]:
+        print(f"[DEPS] Dependency cycle: {' -> '.join(cycle)}")
+    mods = plan["order"]
+
+    engine = detect_engine(game_dir)
+    print(f"[DEPLOY] Detected engine: {engine}")
+    if engine not in ("Unity", "Unreal"):
+        os.makedirs(os.path.join(game_dir, "modded"), exist_ok=True)
+
+    # report overlaps before anything is written; later mods win
+    for line in summarize_conflicts(find_mod_conflicts(mods, engine, priority)):
+        print(f"[CONFLICT] {line}")
+
+    # only the members the engine actually loads, and only what changed
+    sync_deployment(game_dir, build_deploy_map(mods, engine), progress, cancel)
+    return True
+
+
+# -----------------------------
+# --- Mod archive index     ---
+# -----------------------------
+# What is inside each download, read from the zip central directory only
+# (plus tiny metadata members like manifest.json) - payloads are never
+# inflated. Entries are cached on disk and reused while the archive's size
+# and mtime are unchanged.
+INDEX_FILE = os.path.join(os.path.expanduser("~"), "steam_mod_launcher_index.json")
+INDEX_VERSION = 1
+MAX_METADATA_BYTES = 1024 * 1024
+UNREAL_PAK_EXTS = (".pak", ".utoc", ".ucas")
+
+_mod_index = None  # {abs path: entry}, loaded on first use
+_mod_index_dirty = False
+# the Apply worker and the Tk thread share the index and fingerprint caches
+_cache_lock = threading.RLock()
+
+def _load_mod_index():
+    global _mod_index
+    with _cache_lock:
+        if _mod_index is None:
+            _mod_index = {}
+            try:
+                with open(INDEX_FILE, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_VERSION:
+                    _mod_index = data.get("archives", {})
+            except (OSError, ValueError):
+                pass
+        return _mod_index
+
+def save_mod_index():
+    global _mod_index_dirty
+    if _mod_index is None:
+        return
+    try:
+        with _cache_lock:
+            write_json_atomic(INDEX_FILE, {"version": INDEX_VERSION, "archives": _mod_index})
+            _mod_index_dirty = False
+    except OSError as e:
+        print(f"[WARN] Could not save mod index: {e}")
+
+def parse_package_filename(filename):
+    """
+    Split a Thunderstore-style 'Author-Name-1.2.3[.zip]' into
+    (author, name, version), or None if it doesn't look like one.
+    """
+    stem = os.path.splitext(filename)[0] if filename.lower().endswith(".zip") else filename
+    m = re.match(r"^([^-]+)-(.+)-(\d+\.\d+\.\d+)$", stem)
+    return m.groups() if m else None
+
+def detect_mod_type(members, archive_name=""):
+    """
+    Classify a mod from its member names:
+    UnrealPak, Framework (BepInExPack / doorstop), BepInExPlugin or Unknown.
+    """
+    lower = [m.lower().replace("\\", "/") for m in members]
+    if any(m.endswith(UNREAL_PAK_EXTS) for m in lower):
+        return "UnrealPak"
+    if "bepinexpack" in archive_name.lower() or any(
+            m.endswith(("winhttp.dll", "doorstop_config.ini")) or "bepinex/core/" in m
+            for m in lower):
+        return "Framework"
+    if any(m.endswith(".dll") for m in lower):
+        return "BepInExPlugin"
+    return "Unknown"
+
+def _read_mod_manifest(read_member, members):
+    """
+    Parse the shallowest manifest.json; returns {} if missing or unreadable.
+    """
+    import zipfile
+    manifests = [m for m in members if os.path.basename(m[0].rstrip("/")).lower() == "manifest.json"
+                 and m[1] <= MAX_METADATA_BYTES]
+    if not manifests:
+        return {}
+    name = min(manifests, key=lambda m: m[0].count("/"))[0]
+    try:
+        data = json.loads(read_member(name).decode("utf-8-sig"))
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return {}
+
+@traced("index")
+def _scan_mod(path):
+    """
+    Build a fresh index entry: files [[member, size, crc]], type and manifest info.
+    """
+    import zipfile
+    if os.path.isdir(path):
+        files = []
+        for root, _, names in os.walk(path):
+            for n in names:
+                full = os.path.join(root, n)
+                rel = os.path.relpath(full, path).replace(os.sep, "/")
+                try:
+                    files.append([rel, os.path.getsize(full), None])
+                except OSError:
+                    continue
+
+        def read_member(name):
+            with open(os.path.join(path, *name.split("/")), "rb") as f:
+                return f.read(MAX_METADATA_BYTES)
+        manifest = _read_mod_manifest(read_member, files)
+    else:
+        with zipfile.ZipFile(path) as zf:
+            files = [[i.filename, i.file_size, i.CRC] for i in zf.infolist() if not i.is_dir()]
+            manifest = _read_mod_manifest(zf.read, files)
+
+    parsed = parse_package_filename(os.path.basename(path)) or (None, None, None)
+    icon = next((f[0] for f in files if os.path.basename(f[0]).lower() == "icon.png"), None)
+    deps = manifest.get("dependencies") or []
+    return {
+        "files": files,
+        "total_size": sum(f[1] for f in files),
+        "mod_type": detect_mod_type([f[0] for f in files], os.path.basename(path)),
+        "author": parsed[0],
+        "name": manifest.get("name") or parsed[1] or os.path.splitext(os.path.basename(path))[0],
+        "version": manifest.get("version_number") or parsed[2],
+        "dependencies": [d for d in deps if isinstance(d, str)],
+        "description": manifest.get("description", ""),
+        "icon": icon,
+    }
+
+def index_mod(path, save=True):
+    """
+    Index entry for one mod archive or folder, rescanned only when its
+    size/mtime changed. Returns None if the archive can't be read.
+    """
+    import zipfile
+    global _mod_index_dirty
+    index = _load_mod_index()
+    key = os.path.abspath(path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    with _cache_lock:
+        entry = index.get(key)
+    if entry and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+        return entry
+    try:
+        entry = _scan_mod(path)
+    except (OSError, zipfile.BadZipFile) as e:
+        print(f"[INDEX] Could not read {os.path.basename(path)}: {e}")
+        return None
+    entry["size"] = st.st_size
+    entry["mtime_ns"] = st.st_mtime_ns
+    with _cache_lock:
+        index[key] = entry
+        _mod_index_dirty = True
+    print(f"[INDEX] {os.path.basename(path)}: {entry['mod_type']}, {len(entry['files'])} files")
+    if save:
+        save_mod_index()
+    return entry
+
+def index_mods(paths):
+    """
+    {path: entry} for many mods, writing the on-disk index at most once.
+    Unreadable archives are left out.
+    """
+    result = {}
+    for p in paths:
+        entry = index_mod(p, save=False)
+        if entry is not None:
+            result[p] = entry
+    if _mod_index_dirty:
+        save_mod_index()
+    return result
+
+# --- search ---
+# Filter terms for the Mod Selection list: words match name/author/version/
+# type tokens by prefix, "type:unreal" matches the mod type, ">10mb" /
+# "<500kb" the archive size (plain numbers are MB). All terms must match.
+_SIZE_TERM = re.compile(r"^([<>])=?(\d+(?:\.\d+)?)(b|kb|mb|gb)?$")
+_SIZE_UNITS = {"b": 1, "kb": 1024, "mb": 1024 ** 2, "gb": 1024 ** 3, None: 1024 ** 2}
+
+class ModSearchIndex:
+    """
+    Token -> mods index built once per list refresh. query() reuses the
+    previous result when the new text only extends it (typing narrows).
+    """
+
+    def __init__(self, rows):
+        # rows: {key: {"name", "author", "version", "type", "size"}}
+        self.rows = rows
+        self.tokens = {}
+        for key, row in rows.items():
+            text = " ".join(str(row.get(f) or "") for f in ("name", "author", "version", "type"))
+            for tok in self._split(f"{key} {text}"):
+                self.tokens.setdefault(tok, set()).add(key)
+        self.sorted_tokens = sorted(self.tokens)
+        self.last = (None, set(rows))
+
+    @staticmethod
+    def _split(text):
+        return [t for t in re.split(r"[^0-9a-z]+", text.lower()) if t]
+
+    def _prefixed(self, prefix):
+        hits = set()
+        i = bisect.bisect_left(self.sorted_tokens, prefix)
+        while i < len(self.sorted_tokens) and self.sorted_tokens[i].startswith(prefix):
+            hits |= self.tokens[self.sorted_tokens[i]]
+            i += 1
+        return hits
+
+    def _match_term(self, term, keys):
+        if term.startswith("type:"):
+            want = term[5:]
+            return {k for k in keys if str(self.rows[k].get("type") or "").lower().startswith(want)}
+        m = _SIZE_TERM.match(term)
+        if m:
+            limit = float(m.group(2)) * _SIZE_UNITS[m.group(3)]
+            if m.group(1) == ">":
+                return {k for k in keys if (self.rows[k].get("size") or 0) > limit}
+            return {k for k in keys if (self.rows[k].get("size") or 0) < limit}
+        for part in self._split(term):
+            keys = keys & self._prefixed(part)
+        return keys
+
+    def query(self, text):
+        text = text.strip().lower()
+        terms = text.split()
+        last_text, last_hits = self.last
+        # "<1" -> "<10" widens, so only plain words may narrow the old result
+        narrowing = (last_text and text.startswith(last_text) and terms
+                     and not _SIZE_TERM.match(last_text.split()[-1]))
+        keys = set(last_hits) if narrowing else set(self.rows)
+        for term in terms:
+            keys = self._match_term(term, keys)
+        self.last = (text, keys)
+        return keys
+
+
+# -----------------------------
+# --- Mod conflicts         ---
+# -----------------------------
+# Two mods that deploy the same relative path overwrite each other; the one
+# deployed last wins. The user's priority list (highest first) decides that
+# order instead of os.listdir. Per-game priorities live in the state file
+# under "_mod_priority", keyed by the normalized Vortex game id.
+PRIORITY_KEY = "_mod_priority"
+
+def get_mod_priority(gameid):
+    return list(last_state.get(PRIORITY_KEY, {}).get(normalize_gameid(gameid), []))
+
+def set_mod_priority(gameid, order):
+    last_state.setdefault(PRIORITY_KEY, {})[normalize_gameid(gameid)] = list(order)
+    save_state(last_state)
+
+def is_framework_mod(mod_path, entry=None):
+    return "bepinexpack" in os.path.basename(mod_path).lower() or bool(
+        entry and entry.get("mod_type") == "Framework")
+
+def order_mods(mod_paths, priority=None):
+    """
+    Deploy order: mods without a priority first (by name), then prioritized
+    mods from lowest to highest so the highest priority is written last.
+    """
+    rank = {name: i for i, name in enumerate(priority or [])}
+    unranked = sorted((p for p in mod_paths if os.path.basename(p) not in rank),
+                      key=lambda p: os.path.basename(p).lower())
+    ranked = sorted((p for p in mod_paths if os.path.basename(p) in rank),
+                    key=lambda p: rank[os.path.basename(p)], reverse=True)
+    return unranked + ranked
+
+def find_mod_conflicts(mod_paths, engine, priority=None):
+    """
+    Overlapping deployed paths between mods, from archive listings only.
+    Returns [{"path", "mods" (deploy order), "winner", "identical"}] where
+    identical means every copy has the same CRC (harmless overwrite).
+    Unity plugin DLLs also clash by file name, since BepInEx loads
+    assemblies by name regardless of folder.
+    """
+    ordered = resolve_mod_dependencies(mod_paths, priority=priority)["order"]
+    index = index_mods(ordered)
+    first = {}      # deployed path -> (mod, crc); one dict lookup per file
+    clashes = {}    # deployed path -> [(mod, crc), ...] only for overlaps
+    for p in ordered:
+        entry = index.get(p)
+        if entry is None:
+            continue
+        mod = os.path.basename(p)
+        plugin = engine == "Unity" and not is_framework_mod(p, entry)
+        for member, rel, _, crc in plan_mod_members(engine, p, entry):
+            keys = [rel.lower()]
+            if plugin and rel.lower().endswith(".dll"):
+                keys.append("assembly:" + rel.rsplit("/", 1)[-1].lower())
+            for key in keys:
+                owner = first.get(key)
+                if owner is None:
+                    first[key] = (mod, crc)
+                elif owner[0] != mod:
+                    clashes.setdefault(key, [owner]).append((mod, crc))
+
+    conflicts = []
+    for key in sorted(clashes):
+        owners = clashes[key]
+        crcs = {crc for _, crc in owners}
+        conflicts.append({
+            "path": key,
+            "mods": [m for m, _ in owners],
+            "winner": owners[-1][0],
+            "identical": len(crcs) == 1 and None not in crcs,
+        })
+    return conflicts
+
+def summarize_conflicts(conflicts):
+    """
+    One line per pair of clashing mods: 'A.zip ↔ B.zip: 3 files (B.zip wins)'.
+    """
+    pairs = {}
+    for c in conflicts:
+        if c["identical"]:
+            continue
+        key = tuple(c["mods"])
+        pairs[key] = pairs.get(key, 0) + 1
+    return [f"{' ↔ '.join(mods)}: {n} file{'s' if n != 1 else ''} ({mods[-1]} wins)"
+            for mods, n in sorted(pairs.items())]
+
+
+# -----------------------------
+# --- Mod dependencies      ---
+# -----------------------------
+# Thunderstore packages are identified as Author-Name and list their
+# dependencies as "Author-Name-1.2.3" (minimum version) in manifest.json.
+def version_key(version):
+    return tuple(int(x) for x in re.findall(r"\d+", version or "0"))
+
+def split_dependency(dep):
+    """
+    'Author-Name-1.2.3' -> ('author-name', '1.2.3'); no version -> (key, None).
+    """
+    m = re.match(r"^(.+)-(\d+\.\d+\.\d+)$", dep.strip())
+    if m:
+        return m.group(1).lower(), m.group(2)
+    return dep.strip().lower(), None
+
+def package_key(mod_path, entry):
+    """
+    'author-name' for Thunderstore packages, else the lowercased file stem.
+    """
+    if entry and entry.get("author") and entry.get("name"):
+        return f"{entry['author']}-{entry['name']}".lower()
+    return os.path.splitext(os.path.basename(mod_path))[0].lower()
+
+def _find_cycles(nodes, edges):
+    """
+    Strongly connected components (iterative Tarjan) with more than one
+    node or a self-loop, each as a sorted list.
+    """
+    index, low, on_stack = {}, {}, set()
+    stack, cycles, counter = [], [], [0]
+    for start in nodes:
+        if start in index:
+            continue
+        work = [(start, iter(edges.get(start, ())))]
+        index[start] = low[start] = counter[0]
+        counter[0] += 1
+        stack.append(start)
+        on_stack.add(start)
+        while work:
+            node, it = work[-1]
+            advanced = False
+            for nxt in it:
+                if nxt not in index:
+                    index[nxt] = low[nxt] = counter[0]
+                    counter[0] += 1
+                    stack.append(nxt)
+                    on_stack.add(nxt)
+                    work.append((nxt, iter(edges.get(nxt, ()))))
+                    advanced = True
+                    break
+                if nxt in on_stack:
+                    low[node] = min(low[node], index[nxt])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                low[work[-1][0]] = min(low[work[-1][0]], low[node])
+            if low[node] == index[node]:
+                comp = []
+                while True:
+                    n = stack.pop()
+                    on_stack.discard(n)
+                    comp.append(n)
+                    if n == node:
+                        break
+                if len(comp) > 1 or node in edges.get(node, ()):
+                    cycles.append(sorted(comp))
+    return cycles
+
+def resolve_mod_dependencies(mod_paths, selected=None, priority=None):
+    """
+    Build the dependency graph of the given downloads and return
+    {"order", "missing", "duplicates", "cycles"}:
+      order      - mod paths to deploy, dependencies first (Kahn's algorithm,
+                   O(V+E), ties broken by order_mods so it's deterministic)
+      missing    - dependency strings not satisfied by any download
+      duplicates - {package: [paths]} when several versions are downloaded
+                   (the newest one is used unless only an older one is selected)
+      cycles     - lists of packages that depend on each other
+    selected (file names) limits the deploy to those mods plus the
+    dependencies they pull in; None deploys everything, an empty
+    selection nothing.
+    """
+    index = index_mods(mod_paths)
+    packages = {}  # key -> [path, ...]
+    for p in mod_paths:
+        packages.setdefault(package_key(p, index.get(p)), []).append(p)
+
+    selected = set(selected) if selected is not None else None
+    chosen, duplicates = {}, {}
+    for key, paths in packages.items():
+        paths = sorted(paths, key=lambda p: version_key((index.get(p) or {}).get("version")))
+        if len(paths) > 1:
+            duplicates[key] = paths
+            picked = [p for p in paths if selected and os.path.basename(p) in selected]
+            chosen[key] = picked[-1] if picked else paths[-1]
+        else:
+            chosen[key] = paths[0]
+
+    # walk from the selected mods through their dependencies
+    if selected is None:
+        wanted = list(chosen)
+    else:
+        wanted = [k for k, p in chosen.items()
+                  if any(os.path.basename(x) in selected for x in packages[k])]
+    included, missing = set(), []
+    deps_of = {}
+    todo = list(wanted)
+    while todo:
+        key = todo.pop()
+        if key in included:
+            continue
+        included.add(key)
+        deps_of[key] = []
+        for dep in (index.get(chosen[key]) or {}).get("dependencies", []):
+            dep_key, min_version = split_dependency(dep)
+            if dep_key not in chosen:
+                missing.append(dep)
+                continue
+            have = (index.get(chosen[dep_key]) or {}).get("version")
+            if min_version and have and version_key(have) < version_key(min_version):
+                missing.append(f"{dep} (have {have})")
+            deps_of[key].append(dep_key)
+            todo.append(dep_key)
+
+    # Kahn's algorithm over included packages
+    initial = order_mods([chosen[k] for k in included], priority)
+    key_of = {chosen[k]: k for k in included}
+    nodes = [key_of[p] for p in initial]
+    dependents = {k: [] for k in nodes}
+    indegree = {k: 0 for k in nodes}
+    for k in nodes:
+        for d in deps_of[k]:
+            dependents[d].append(k)
+            indegree[k] += 1
+    queue = collections.deque(k for k in nodes if indegree[k] == 0)
+    order = []
+    while queue:
+        k = queue.popleft()
+        order.append(k)
+        for nxt in dependents[k]:
+            indegree[nxt] -= 1
+            if indegree[nxt] == 0:
+                queue.append(nxt)
+
+    cycles = []
+    if len(order) < len(nodes):
+        placed = set(order)
+        stuck = [k for k in nodes if k not in placed]
+        cycles = _find_cycles(stuck, {k: [d for d in deps_of[k] if d not in placed] for k in stuck})
+        order += stuck  # still deploy them, in priority order
+
+    return {
+        "order": [chosen[k] for k in order],
+        "missing": sorted(set(missing)),
+        "duplicates": duplicates,
+        "cycles": cycles,
+    }
+
+
+# -----------------------------
+# --- Streaming extraction  ---
+# -----------------------------
+# Members are inflated by a reader thread into a small bounded queue and
+# written in chunks by the caller's thread into a staging folder, with the
+# CRC computed on the way. Nothing in the live deployment is touched until
+# every member has been written and verified against the central directory.
+EXTRACT_CHUNK = 1024 * 1024
+EXTRACT_QUEUE_CHUNKS = 8                   # at most 8 MB in flight
+MAX_MOD_UNCOMPRESSED = 16 * 1024 ** 3      # per archive
+MAX_COMPRESSION_RATIO = 250                # per member, zip-bomb guard
+STAGING_DIR = ".sml-staging"
+# device names Windows opens instead of a file, with or without an extension
+WINDOWS_RESERVED_NAMES = {"CON", "PRN", "AUX", "NUL",
+                          *(f"COM{i}" for i in range(1, 10)),
+                          *(f"LPT{i}" for i in range(1, 10))}
+
+class ModExtractError(Exception):
+    pass
+
+class ExtractCancelled(ModExtractError):
+    pass
+
+def safe_relpath(rel):
+    """
+    Validate a '/'-separated target path: no absolute paths, drive letters,
+    '..' or empty parts, no ':' (NTFS alternate data streams) and no Windows
+    device names. Returns it normalized or raises ModExtractError.
+    """
+    parts = rel.replace("\\", "/").split("/")
+    if (not rel or rel.startswith(("/", "\\")) or ":" in rel
+            or any(p in ("", ".", "..") or "\0" in p
+                   or p.split(".")[0].rstrip(" ").upper() in WINDOWS_RESERVED_NAMES
+                   for p in parts)):
+        raise ModExtractError(f"Unsafe path in archive: {rel!r}")
+    return "/".join(parts)
+
+def check_extract_limits(mod_path, infos, max_total=MAX_MOD_UNCOMPRESSED):
+    """
+    infos: [(member, size, compressed size)]. Refuse archives that would
+    inflate beyond max_total or members with an absurd compression ratio.
+    """
+    total = sum(size for _, size, _ in infos)
+    if total > max_total:
+        raise ModExtractError(
+            f"{os.path.basename(mod_path)} would unpack to {total / 1024 ** 3:.1f} GB (limit {max_total / 1024 ** 3:.0f} GB)")
+    for member, size, csize in infos:
+        if size > EXTRACT_CHUNK and csize and size / csize > MAX_COMPRESSION_RATIO:
+            raise ModExtractError(f"{os.path.basename(mod_path)}: {member} looks like a zip bomb")
+    return total
+
+def _inflate_into_queue(mod_path, members, q, stop):
+    import zipfile
+    def put(item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        with zipfile.ZipFile(mod_path) as zf:
+            for member, _ in members:
+                if not put(("start", member)):
+                    return
+                with zf.open(member) as src:
+                    while True:
+                        chunk = src.read(EXTRACT_CHUNK)
+                        if not chunk:
+                            break
+                        if not put(("data", chunk)):
+                            return
+        put(("done", None))
+    except Exception as e:  # BadZipFile incl. zipfile's own CRC check
+        put(("error", e))
+
+@traced("extract")
+def stage_members(mod_path, members, staging_dir, on_bytes=None, cancel=None,
+                  max_total=MAX_MOD_UNCOMPRESSED):
+    """
+    Write (member, relpath) pairs of a zip or folder mod below staging_dir
+    and verify each one's size and CRC. Returns {relpath: staged file}.
+    Raises ModExtractError / ExtractCancelled; partial output is left in
+    staging_dir for the caller to discard.
+    """
+    import zipfile
+    is_dir = os.path.isdir(mod_path)
+    expected = {}
+    if is_dir:
+        infos = []
+        for member, rel in members:
+            size = os.path.getsize(os.path.join(mod_path, *member.split("/")))
+            infos.append((member, size, size))
+            expected[member] = (size, None)
+    else:
+        with zipfile.ZipFile(mod_path) as zf:
+            by_name = {i.filename: i for i in zf.infolist()}
+        infos = [(m, by_name[m].file_size, by_name[m].compress_size) for m, _ in members]
+        expected = {m: (by_name[m].file_size, by_name[m].CRC) for m, _ in members}
+    check_extract_limits(mod_path, infos, max_total)
+
+    targets = {}
+    staging_abs = os.path.abspath(staging_dir)
+    for member, rel in members:
+        rel = safe_relpath(rel)
+        target = os.path.abspath(os.path.join(staging_dir, *rel.split("/")))
+        if not target.startswith(staging_abs + os.sep):
+            raise ModExtractError(f"Unsafe path in archive: {rel!r}")
+        targets[member] = (rel, target)
+
+    staged = {}
+
+    def check(member, written, crc):
+        size, want_crc = expected[member]
+        if written != size or (want_crc is not None and crc != want_crc):
+            raise ModExtractError(f"{os.path.basename(mod_path)}: {member} failed CRC/size check")
+        staged[targets[member][0]] = targets[member][1]
+
+    if is_dir:
+        for member, _ in members:
+            rel, target = targets[member]
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            written = 0
+            with open(os.path.join(mod_path, *member.split("/")), "rb") as src, open(target, "wb") as dst:
+                while True:
+                    if cancel is not None and cancel.is_set():
+                        raise ExtractCancelled("Extraction cancelled")
+                    chunk = src.read(EXTRACT_CHUNK)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    written += len(chunk)
+                    if on_bytes:
+                        on_bytes(len(chunk))
+            check(member, written, None)
+        return staged
+
+    q = queue.Queue(maxsize=EXTRACT_QUEUE_CHUNKS)
+    stop = threading.Event()
+    reader = threading.Thread(target=_inflate_into_queue, args=(mod_path, members, q, stop), daemon=True)
+    reader.start()
+    dst = None
+    member = None
+    written = crc = 0
+    try:
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise ExtractCancelled("Extraction cancelled")
+            kind, payload = q.get()
+            if kind == "data":
+                dst.write(payload)
+                written += len(payload)
+                crc = zlib.crc32(payload, crc)
+                if on_bytes:
+                    on_bytes(len(payload))
+                continue
+            if dst:
+                dst.close()
+                dst = None
+                check(member, written, crc)
+            if kind == "start":
+                member, written, crc = payload, 0, 0
+                target = targets[member][1]
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                dst = open(target, "wb")
+            elif kind == "error":
+                raise ModExtractError(f"{os.path.basename(mod_path)}: {payload}")
+            else:  # done
+                return staged
+    finally:
+        stop.set()
+        if dst:
+            dst.close()
+        reader.join(timeout=5)
+
+def commit_staged(staged, dest_root):
+    """
+    Move verified staged files ({relpath: staged path}) into place.
+    """
+    for rel, src in staged.items():
+        target = os.path.join(dest_root, *rel.split("/"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(src, target)
+
+def make_progress(total, progress=None, label=""):
+    """
+    on_bytes callback that reports (done, total, bytes/sec) to progress,
+    at most a few times per second (prints when no callback is given).
+    """
+    start = time.monotonic()
+    state = {"done": 0, "start": start, "last": start}
+
+    def on_bytes(n):
+        state["done"] += n
+        now = time.monotonic()
+        if now - state["last"] < 0.25 and state["done"] < total:
+            return
+        state["last"] = now
+        rate = state["done"] / max(now - state["start"], 1e-6)
+        if progress:
+            progress(state["done"], total, rate)
+        else:
+            pct = 100 * state["done"] / total if total else 100
+            print(f"[EXTRACT] {label} {pct:.0f}% ({rate / 1024 ** 2:.1f} MB/s)")
+
+    on_bytes.state = state
+    return on_bytes
+
+
+# -----------------------------
+# --- File fingerprints     ---
+# -----------------------------
+# Fast content hashes cached on disk and keyed by (path, size, mtime_ns,
+# inode): a file is only re-read when its stat signature changed. Big files
+# are hashed as 64 MB segments in parallel and the segment digests are
+# hashed again, so a multi-GB asset bundle uses every worker.
+FINGERPRINT_FILE = os.path.join(os.path.expanduser("~"), "steam_mod_launcher_fingerprints.json")
+HASH_CHUNK = 4 * 1024 * 1024
+HASH_SEGMENT = 64 * 1024 * 1024
+
+try:
+    import xxhash  # optional, noticeably faster than blake2
+    FINGERPRINT_ALGO = "xxh3_128"
+
+    def _new_hasher():
+        return xxhash.xxh3_128()
+except ImportError:
+    FINGERPRINT_ALGO = "blake2b-128"
+
+    def _new_hasher():
+        import hashlib
+        return hashlib.blake2b(digest_size=16)
+
+_fingerprints = None  # {abs path: [size, mtime_ns, inode, digest]}
+_fingerprints_dirty = False
+
+def _load_fingerprints():
+    global _fingerprints
+    if _fingerprints is None:  # callers hold _cache_lock
+        _fingerprints = {}
+        try:
+            with open(FINGERPRINT_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("algo") == FINGERPRINT_ALGO:
+                _fingerprints = data.get("files", {})
+        except (OSError, ValueError):
+            pass
+    return _fingerprints
+
+def save_fingerprints():
+    global _fingerprints_dirty
+    if not _fingerprints_dirty:
+        return
+    try:
+        with _cache_lock:
+            write_json_atomic(FINGERPRINT_FILE, {"algo": FINGERPRINT_ALGO, "files": _fingerprints})
+            _fingerprints_dirty = False
+    except OSError as e:
+        print(f"[WARN] Could not save fingerprints: {e}")
+
+def file_signature(st):
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+def _hash_segment(task):
+    path, seg = task
+    h = _new_hasher()
+    with open(path, "rb") as f:
+        f.seek(seg * HASH_SEGMENT)
+        left = HASH_SEGMENT
+        while left > 0:
+            chunk = f.read(min(HASH_CHUNK, left))
+            if not chunk:
+                break
+            h.update(chunk)
+            left -= len(chunk)
+    return task, h.digest()
+
+@traced("hash")
+def fingerprint_files(paths, workers=None):
+    """
+    {path: hex digest} for the given files (None if unreadable). Cached
+    digests are reused while (size, mtime_ns, inode) match; everything
+    else is hashed on a thread pool. The cache is saved once at the end.
+    """
+    import concurrent.futures
+    global _fingerprints_dirty
+    with _cache_lock:
+        cache = _load_fingerprints()
+    result, todo = {}, {}
+    hits = 0
+    for p in paths:
+        key = os.path.abspath(p)
+        try:
+            sig = file_signature(os.stat(p))
+        except OSError:
+            result[p] = None
+            continue
+        with _cache_lock:
+            cached = cache.get(key)
+        if cached and cached[:3] == sig:
+            result[p] = cached[3]
+            hits += 1
+        else:
+            todo[p] = sig
+
+    if todo:
+        tasks = [(p, seg) for p, sig in todo.items()
+                 for seg in range(max(1, -(-sig[0] // HASH_SEGMENT)))]
+        workers = workers or min(8, (os.cpu_count() or 2))
+        digests = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_hash_segment, t) for t in tasks]
+            for fut in concurrent.futures.as_completed(futures):
+                try:
+                    (p, seg), digest = fut.result()
+                    digests.setdefault(p, {})[seg] = digest
+                except OSError:
+                    continue
+        for p, sig in todo.items():
+            segs = digests.get(p, {})
+            count = max(1, -(-sig[0] // HASH_SEGMENT))
+            if len(segs) != count:
+                result[p] = None
+                continue
+            if count == 1:
+                digest = segs[0].hex()
+            else:
+                h = _new_hasher()
+                for i in range(count):
+                    h.update(segs[i])
+                digest = h.hexdigest()
+            with _cache_lock:
+                cache[os.path.abspath(p)] = sig + [digest]
+            result[p] = digest
+        _fingerprints_dirty = True
+        print(f"[HASH] {len(todo)} files hashed, {hits} from cache")
+        save_fingerprints()
+    return result
+
+def file_fingerprint(path):
+    return fingerprint_files([path]).get(path)
+
+
+# -----------------------------
+# --- Vanilla backups       ---
+# -----------------------------
+# Game files we are about to overwrite (a game's own version.dll, root
+# files replaced by a framework pack) are snapshotted into
+# <game_dir>/.sml_vanilla first and put back on revert. index.json records
+# size/mtime/hash of each original plus the Steam buildid at snapshot time.
+# Snapshots are reflinks where the filesystem supports them, hardlinks when
+# the caller only ever replaces the original (os.replace gives it a new
+# inode, so the backup keeps the old data), and plain copies otherwise.
+# Root loader files (PROFILE_ROOT_FILES) that an earlier mod deploy left
+# behind are not originals: they are recorded as "delete" and removed on
+# revert instead of being put back. The appmanifest carries no per-file
+# sizes, so after a Steam update (buildid changed) a file is only put back
+# if it is still the one we deployed, missing or already the original;
+# anything else is Steam's newer copy and is left alone.
+VANILLA_DIR = ".sml_vanilla"
+VANILLA_INDEX = "index.json"
+FICLONE = 0x40049409  # linux/fs.h _IOW(0x94, 9, int)
+DOORSTOP_SIGNATURE = b"doorstop"
+LOADER_SCAN_BYTES = 4 * 1024 * 1024
+
+def clone_file(src, dst, allow_hardlink=False):
+    """
+    Copy src to dst as cheaply as possible; returns "reflink", "hardlink" or "copy".
+    """
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if not IS_WINDOWS:
+        try:
+            import fcntl
+            with open(src, "rb") as s, open(dst, "wb") as d:
+                fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+            shutil.copystat(src, dst)
+            return "reflink"
+        except (OSError, ImportError):
+            try:
+                os.remove(dst)
+            except OSError:
+                pass
+    if allow_hardlink:
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+    return "copy"
+
+def find_appmanifest(game_dir):
+    """
+    The appmanifest_*.acf that installs game_dir, or None.
+    """
+    steamapps = os.path.dirname(os.path.dirname(os.path.normpath(game_dir)))
+    install_dir = os.path.basename(os.path.normpath(game_dir)).lower()
+    try:
+        names = os.listdir(steamapps)
+    except OSError:
+        return None
+    for fname in names:
+        if fname.startswith("appmanifest_") and fname.endswith(".acf"):
+            path = os.path.join(steamapps, fname)
+            try:
+                if parse_appmanifest(path)["InstallDir"].lower() == install_dir:
+                    return path
+            except (OSError, AttributeError):
+                continue
+    return None
+
+def get_build_id(game_dir):
+    path = find_appmanifest(game_dir)
+    if not path:
+        return None
+    with open(path, encoding="utf-8") as f:
+        m = re.search(r'"buildid"\s*"([^"]+)"', f.read())
+    return m.group(1) if m else None
+
+def load_vanilla_index(game_dir):
+    try:
+        with open(os.path.join(game_dir, VANILLA_DIR, VANILLA_INDEX), encoding="utf-8") as f:
+            index = json.load(f)
+        if isinstance(index.get("files"), dict):
+            return index
+    except (OSError, ValueError):
+        pass
+    return {"buildid": None, "files": {}}
+
+def _is_loader_name(rel):
+    return "/" not in rel and rel.lower() in {n.lower() for n in PROFILE_ROOT_FILES}
+
+def _has_doorstop_signature(path):
+    if os.path.basename(path).lower() == "doorstop_config.ini":
+        return True
+    try:
+        with open(path, "rb") as f:
+            return DOORSTOP_SIGNATURE in f.read(LOADER_SCAN_BYTES).lower()
+    except OSError:
+        return False
+
+def is_deployed_loader(game_dir, rel):
+    """
+    True if rel is a root loader file that came from a mod deploy rather
+    than the game: the deploy manifest lists it, a BepInEx folder is
+    present, or it is (or carries the signature of) Unity Doorstop.
+    """
+    if not _is_loader_name(rel):
+        return False
+    if rel.lower() in load_deploy_manifest(game_dir)["files"]:
+        return True
+    if os.path.isdir(os.path.join(game_dir, "BepInEx")):
+        return True
+    return _has_doorstop_signature(os.path.join(game_dir, rel))
+
+@traced("sync")
+def snapshot_vanilla(game_dir, relpaths, replace_safe=False):
+    """
+    Back up the existing game files among relpaths ('/'-separated) that
+    have no snapshot yet. The first snapshot of a file is kept: that's the
+    original. Loader files left by an earlier deploy are only marked for
+    deletion on revert. Returns the number of new index entries.
+    """
+    index = load_vanilla_index(game_dir)
+    backup_root = os.path.join(game_dir, VANILLA_DIR)
+    added = 0
+    for rel in relpaths:
+        key = rel.lower()
+        src = os.path.join(game_dir, *rel.split("/"))
+        if key in index["files"] or not os.path.isfile(src):
+            continue
+        if is_deployed_loader(game_dir, rel):
+            index["files"][key] = {"path": rel, "delete": True}
+            added += 1
+            print(f"[VANILLA] {rel} is from an earlier mod deploy, revert deletes it")
+            continue
+        st = os.stat(src)
+        method = clone_file(src, os.path.join(backup_root, *rel.split("/")), replace_safe)
+        index["files"][key] = {
+            "path": rel,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "hash": file_fingerprint(src),
+            "method": method,
+        }
+        added += 1
+        print(f"[VANILLA] Backed up {rel} ({method})")
+    if added:
+        if index.get("buildid") is None:
+            index["buildid"] = get_build_id(game_dir)
+        os.makedirs(backup_root, exist_ok=True)
+        write_json_atomic(os.path.join(backup_root, VANILLA_INDEX), index)
+    return added
+
+def _still_ours(game_dir, rec, deployed):
+    """
+    True if the game file behind a vanilla record is missing, still what a
+    deploy wrote (deployed: the deploy manifest's files), a Doorstop loader
+    or already the original, i.e. a Steam update didn't replace it.
+    """
+    target = os.path.join(game_dir, *rec["path"].split("/"))
+    try:
+        st = os.stat(target)
+    except FileNotFoundError:
+        return True
+    except OSError:
+        return False
+    sig = [st.st_size, st.st_mtime_ns]
+    ours = deployed.get(rec["path"].lower())
+    if ours and sig == [ours.get("size"), ours.get("mtime_ns")]:
+        return True
+    if _is_loader_name(rec["path"]) and _has_doorstop_signature(target):
+        return True
+    return not rec.get("delete") and sig == [rec["size"], rec["mtime_ns"]]
+
+@traced("sync")
+def restore_vanilla(game_dir, only=None, force=False):
+    """
+    Put every snapshotted original back and delete the files marked
+    "delete"; only (lowercased relpaths) limits this to those files.
+    Returns {"restored", "removed", "corrupt" (relpaths whose backup no
+    longer matches its recorded size/hash), "skipped" (relpaths a Steam
+    update changed since the snapshot, kept unless force), "stale_build"
+    (True if Steam updated the game since the snapshot)}. The backup
+    folder is removed once everything is back.
+    """
+    index = load_vanilla_index(game_dir)
+    backup_root = os.path.join(game_dir, VANILLA_DIR)
+    report = {"restored": [], "removed": [], "corrupt": [], "skipped": [], "stale_build": False}
+    todo = [key for key in index["files"] if only is None or key in only]
+    if not todo:
+        if not index["files"]:
+            shutil.rmtree(backup_root, ignore_errors=True)
+        return report
+
+    build = get_build_id(game_dir)
+    report["stale_build"] = bool(index.get("buildid") and build and build != index["buildid"])
+    deployed = load_deploy_manifest(game_dir)["files"]
+    if report["stale_build"]:
+        print(f"[VANILLA] Game updated since backup (build {index['buildid']} -> {build}); "
+              "files Steam replaced are kept, verify the game files in Steam after reverting")
+
+    for key in todo:
+        rec = index["files"][key]
+        if report["stale_build"] and not force and not _still_ours(game_dir, rec, deployed):
+            report["skipped"].append(rec["path"])
+            continue
+        backup = os.path.join(backup_root, *rec["path"].split("/"))
+        # older snapshots could hold a deployed loader as the "original"
+        if rec.get("delete") or (_is_loader_name(rec["path"]) and _has_doorstop_signature(backup)):
+            try:
+                os.remove(os.path.join(game_dir, *rec["path"].split("/")))
+            except FileNotFoundError:
+                pass
+            del index["files"][key]
+            report["removed"].append(rec["path"])
+            continue
+        try:
+            ok = os.path.getsize(backup) == rec["size"] and file_fingerprint(backup) == rec["hash"]
+        except OSError:
+            ok = False
+        if not ok:
+            report["corrupt"].append(rec["path"])
+            continue
+        target = os.path.join(game_dir, *rec["path"].split("/"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(backup, target)
+        os.utime(target, ns=(rec["mtime_ns"], rec["mtime_ns"]))
+        del index["files"][key]
+        report["restored"].append(rec["path"])
+    damaged = f", {len(report['corrupt'])} backups damaged" if report["corrupt"] else ""
+    removed = f", removed {len(report['removed'])} loader files" if report["removed"] else ""
+    skipped = f", kept {len(report['skipped'])} files Steam updated" if report["skipped"] else ""
+    print(f"[VANILLA] Restored {len(report['restored'])} original files{removed}{skipped}{damaged}")
+
+    if index["files"]:
+        write_json_atomic(os.path.join(backup_root, VANILLA_INDEX), index)
+    else:
+        shutil.rmtree(backup_root, ignore_errors=True)
+    return report
+
+
+# -----------------------------
+# --- Extraction rules      ---
+# -----------------------------
+# Per-engine rules deciding which archive members are deployed and where
+# (relative to the game dir). Readmes, screenshots and Thunderstore
+# metadata are never written.
+#   Unity/BepInEx plugin -> plugins/patchers into BepInEx/<kind>/<mod>/,
+#                           configs into the shared BepInEx/config
+#   Unity framework pack -> game root (wrapper folder like BepInExPack/ stripped)
+#   Unreal               -> .pak/.utoc/.ucas/.sig flattened into Content/Paks/~mods
+#   Unknown              -> everything into modded/<mod>/
+UNREAL_DEPLOY_EXTS = UNREAL_PAK_EXTS + (".sig",)
+METADATA_NAMES = {"manifest.json", "icon.png", "readme.md", "readme.txt", "changelog.md",
+                  "changelog.txt", "license", "license.md", "license.txt"}
+DOC_EXTS = (".md", ".txt", ".pdf", ".url", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp")
+BEPINEX_DIRS = {"bepinex", "plugins", "patchers", "config", "core", "monomod"}
+
+def _is_metadata(parts):
+    name = parts[-1].lower()
+    return name in METADATA_NAMES or (len(parts) == 1 and name.endswith(DOC_EXTS))
+
+def _strip_wrapper(members):
+    """
+    Drop a single top-level folder that wraps all payload files
+    (e.g. 'BepInExPack/...'), ignoring metadata next to it.
+    """
+    heads = {m.split("/", 1)[0] for m in members if "/" in m}
+    loose = [m for m in members if "/" not in m and not _is_metadata([m])]
+    if len(heads) != 1 or loose:
+        return {m: m for m in members}
+    head = heads.pop()
+    if head.lower() in BEPINEX_DIRS:
+        return {m: m for m in members}
+    return {m: (m[len(head) + 1:] if m.startswith(head + "/") else m) for m in members}
+
+def _bepinex_plugin_target(parts, stem):
+    low = [p.lower() for p in parts]
+    if low[0] == "bepinex" and len(parts) > 2:
+        parts, low = parts[1:], low[1:]
+    head = low[0] if len(parts) > 1 else ""
+    if head in ("plugins", "patchers"):
+        return "/".join(["BepInEx", parts[0], stem] + parts[1:])
+    if head == "config":
+        return "/".join(["BepInEx", "config"] + parts[1:])
+    if head == "core":
+        return None  # framework files never come from a plugin
+    if low[-1].endswith(".cfg"):
+        return f"BepInEx/config/{parts[-1]}"
+    return "/".join(["BepInEx", "plugins", stem] + parts)
+
+def plan_mod_members(engine, mod_path, entry):
+    """
+    [(member, relpath, size, crc)] for the members of a mod that should be
+    deployed, relpath being '/'-separated and relative to the game dir.
+    """
+    if not entry:
+        return []
+    stem = os.path.splitext(os.path.basename(mod_path))[0]
+    files = {f[0].replace("\\", "/"): f for f in entry["files"]}
+    paks = [m for m in files if m.lower().endswith(UNREAL_DEPLOY_EXTS)]
+    plan = []
+    for member, rel in _strip_wrapper(list(files)).items():
+        parts = [p for p in rel.split("/") if p]
+        if not parts or _is_metadata(parts):
+            continue
+        if engine == "Unity" and is_framework_mod(mod_path, entry):
+            target = "/".join(parts)
+        elif engine == "Unity":
+            target = _bepinex_plugin_target(parts, stem)
+        elif engine == "Unreal" and paks:
+            target = f"Content/Paks/~mods/{parts[-1]}" if member in paks else None
+        elif engine == "Unreal":
+            target = "/".join(["Content", "Paks", "~mods", stem] + parts)
+        else:
+            target = "/".join(["modded", stem] + parts)
+        if target:
+            _, size, crc = files[member]
+            plan.append((member, target, size, crc))
+    return plan
+
+# --- deployment manifest ---
+# <game dir>/.modlauncher_deploy.json records every file we deployed:
+#   {"files": {lowercased relpath: {"path", "mod", "size", "crc"}},
+#    "archives": {mod file name: [size, mtime_ns]}}
+DEPLOY_MANIFEST = ".modlauncher_deploy.json"
+
+def load_deploy_manifest(game_dir):
+    try:
+        with open(os.path.join(game_dir, DEPLOY_MANIFEST), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return {"files": data.get("files", {}), "archives": data.get("archives", {})}
+    except (OSError, ValueError):
+        return {"files": {}, "archives": {}}
+
+def save_deploy_manifest(game_dir, manifest):
+    write_json_atomic(os.path.join(game_dir, DEPLOY_MANIFEST), manifest)
+
+def _prune_empty_dirs(path, stop):
+    stop = os.path.abspath(stop)
+    path = os.path.abspath(path)
+    while path != stop and path.startswith(stop):
+        try:
+            os.rmdir(path)
+        except OSError:
+            return
+        path = os.path.dirname(path)
+
+def build_deploy_map(ordered_mods, engine):
+    """
+    Final state of the deployment: {lowercased relpath: (relpath, mod_path,
+    member, size, crc)}; later mods overwrite earlier ones.
+    """
+    index = index_mods(ordered_mods)
+    desired = {}
+    for p in ordered_mods:
+        for member, rel, size, crc in plan_mod_members(engine, p, index.get(p)):
+            desired[rel.lower()] = (rel, p, member, size, crc)
+    return desired
+
+def _deploy_changes(game_dir, desired, manifest):
+    """
+    (archive signatures, {mod_path: [(member, relpath)]} to write, bytes to
+    write) for moving game_dir from manifest to the desired deploy map.
+    """
+    old, old_archives = manifest["files"], manifest["archives"]
+    archives = {}
+    for rel, mod_path, member, size, crc in desired.values():
+        mod = os.path.basename(mod_path)
+        if mod not in archives:
+            st = os.stat(mod_path)
+            archives[mod] = [st.st_size, st.st_mtime_ns]
+
+    todo = {}
+    total = 0
+    for key, (rel, mod_path, member, size, crc) in desired.items():
+        mod = os.path.basename(mod_path)
+        rec = old.get(key)
+        target = os.path.join(game_dir, *rel.split("/"))
+        unchanged = (rec and rec["mod"] == mod and old_archives.get(mod) == archives[mod]
+                     and os.path.isfile(target) and os.path.getsize(target) == size)
+        if not unchanged:
+            todo.setdefault(mod_path, []).append((member, rel))
+            total += size
+    return archives, todo, total
+
+@traced("sync")
+def sync_deployment(game_dir, desired, progress=None, cancel=None):
+    """
+    Bring game_dir to the desired deploy map: (re)write only files whose
+    owner or archive changed, delete files of mods that are gone, and record
+    the result in the deployment manifest. A dropped file that replaced a
+    game original gets the original back. New files are staged and verified
+    first, so a failed or cancelled deploy leaves the old one untouched.
+    """
+    manifest = load_deploy_manifest(game_dir)
+    old = manifest["files"]
+    check_plan_fits(plan_deployment(game_dir, desired, manifest), f"Deploying to {os.path.basename(game_dir)}")
+    archives, todo, total = _deploy_changes(game_dir, desired, manifest)
+
+    staging = os.path.join(game_dir, STAGING_DIR)
+    if os.path.exists(staging):
+        shutil.rmtree(staging)
+    on_bytes = make_progress(total, progress, os.path.basename(game_dir))
+    try:
+        staged = {}
+        for mod_path, members in todo.items():
+            staged.update(stage_members(mod_path, members, staging, on_bytes, cancel))
+            print(f"[STAGED] {os.path.basename(mod_path)}: {len(members)} files verified")
+
+        # originals we are about to overwrite, plus loader files that a
+        # revert deletes wholesale (see MOD_LEFTOVERS)
+        snapshot_vanilla(game_dir, [rel for rel in list(staged) + PROFILE_ROOT_FILES
+                                    if rel.lower() not in old], replace_safe=True)
+
+        snapshots = load_vanilla_index(game_dir)["files"]
+        dropped = [rec["path"] for key, rec in old.items() if key not in desired]
+        originals = {rel.lower() for rel in dropped if rel.lower() in snapshots}
+        keep = set()
+        if originals:
+            # a damaged backup can't be put back, its mod file goes anyway;
+            # a file Steam updated meanwhile stays
+            report = restore_vanilla(game_dir, only=originals)
+            keep = {rel.lower() for rel in report["restored"] + report["skipped"]}
+        for rel in dropped:
+            if rel.lower() in keep:
+                continue
+            target = os.path.join(game_dir, *rel.split("/"))
+            try:
+                os.remove(target)
+            except OSError:
+                pass
+            _prune_empty_dirs(os.path.dirname(target), game_dir)
+        commit_staged(staged, game_dir)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    elapsed = time.monotonic() - on_bytes.state["start"]
+    record_throughput("deploy", total, elapsed)
+    trace_count("deploy.files", len(staged))
+    trace_count("deploy.bytes", total)
+    print(f"[DEPLOYED] {len(staged)} files, {total / 1024 ** 2:.1f} MB in {elapsed:.1f}s -> {game_dir}")
+
+    files = {}
+    for key, (rel, mod_path, member, size, crc) in desired.items():
+        rec = {"path": rel, "mod": os.path.basename(mod_path), "size": size, "crc": crc}
+        try:
+            rec["mtime_ns"] = os.stat(os.path.join(game_dir, *rel.split("/"))).st_mtime_ns
+        except OSError:
+            pass
+        files[key] = rec
+    manifest = {"files": files, "archives": archives}
+    if manifest["files"]:
+        save_deploy_manifest(game_dir, manifest)
+    else:
+        try:
+            os.remove(os.path.join(game_dir, DEPLOY_MANIFEST))
+        except OSError:
+            pass
+    return manifest
+
+PROFILE_ROOT_FILES = ["doorstop_config.ini", "winhttp.dll", "version.dll"]
+MOD_LEFTOVERS = [
+    "BepInEx",
+    "doorstop_config.ini",
+    "winhttp.dll",
+    "version.dll",
+    "ModLaunch.cmd",
+    "modded",
+    ".sml_profiles",
+    ".sml_presync.ok",
+]
+
+def remove_mod_leftovers(game_dir, force=False):
+    """
+    Restore vanilla: delete every file the deployment manifest tracks
+    (e.g. paks flattened into ~mods) plus the usual loader leftovers, then
+    put back the originals they replaced. Files with an original are left
+    for restore_vanilla, which checks them after a Steam update (force
+    restores them anyway). Returns restore_vanilla's report.
+    """
+    manifest = load_deploy_manifest(game_dir)
+    originals = {key for key, rec in load_vanilla_index(game_dir)["files"].items()
+                 if not rec.get("delete")}
+
+    def remove(rel):
+        target = os.path.join(game_dir, *rel.split("/"))
+        try:
+            os.remove(target)
+        except OSError:
+            return
+        _prune_empty_dirs(os.path.dirname(target), game_dir)
+
+    for key, rec in manifest["files"].items():
+        if key not in originals:
+            remove(rec["path"])
+
+    for item in MOD_LEFTOVERS:
+        path = os.path.join(game_dir, item)
+        if item.lower() not in originals and os.path.exists(path):
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+
+    report = restore_vanilla(game_dir, force=force)
+    # mod files whose original could not be put back still go
+    for rel in report["corrupt"]:
+        if rel.lower() in manifest["files"] or is_deployed_loader(game_dir, rel):
+            remove(rel)
+    try:
+        os.remove(os.path.join(game_dir, DEPLOY_MANIFEST))
+    except FileNotFoundError:
+        pass
+    return report
+
+
+# -----------------------------
+# --- Deploy planner        ---
+# -----------------------------
+# Dry run of a deploy or profile sync: what would be added, replaced and
+# deleted, how many bytes get written, whether they fit and how long it
+# should take. Sizes come from the archive index (central directories) or
+# the profile tree, never from extracting anything. Measured throughput is
+# kept per kind ("deploy", "copy") under "_perf" in the state file.
+PERF_KEY = "_perf"
+DEFAULT_THROUGHPUT = 50 * 1024 ** 2  # bytes/s until something was measured
+FREE_SPACE_MARGIN = 64 * 1024 ** 2
+MIN_MEASURED_BYTES = 8 * 1024 ** 2   # smaller runs are dominated by overhead
+
+class NotEnoughSpace(ModExtractError):
+    pass
+
+def record_throughput(kind, nbytes, seconds):
+    if nbytes < MIN_MEASURED_BYTES or seconds <= 0:
+        return
+    rate = nbytes / seconds
+    with state_lock:
+        perf = last_state.setdefault(PERF_KEY, {})
+        old = perf.get(kind)
+        perf[kind] = rate if not old else 0.7 * old + 0.3 * rate
+    # worker threads leave the write to the GUI's next save_state
+    if threading.current_thread() is threading.main_thread():
+        save_state(last_state)
+
+def estimate_seconds(kind, nbytes):
+    rate = last_state.get(PERF_KEY, {}).get(kind) or DEFAULT_THROUGHPUT
+    return nbytes / rate
+
+def _plan_result(game_dir, add, replace, delete, write_bytes, free_bytes, kind):
+    try:
+        free = shutil.disk_usage(game_dir if os.path.isdir(game_dir) else os.path.dirname(game_dir)).free
+    except OSError:
+        free = None
+    # everything is staged next to the game before old files go away; a
+    # plan that only deletes needs no room at all (that's how a full disk
+    # gets freed)
+    required = write_bytes + FREE_SPACE_MARGIN if write_bytes else 0
+    return {
+        "add": sorted(add),
+        "replace": sorted(replace),
+        "delete": sorted(delete),
+        "bytes": write_bytes,
+        "freed": free_bytes,
+        "required": required,
+        "free": free,
+        "fits": free is None or free >= required,
+        "eta": estimate_seconds(kind, write_bytes),
+    }
+
+def plan_deployment(game_dir, desired, manifest=None):
+    """
+    Plan for sync_deployment(game_dir, desired) without touching anything.
+    """
+    manifest = manifest or load_deploy_manifest(game_dir)
+    _, todo, total = _deploy_changes(game_dir, desired, manifest)
+    add, replace = [], []
+    for members in todo.values():
+        for member, rel in members:
+            target = os.path.join(game_dir, *rel.split("/"))
+            (replace if os.path.exists(target) else add).append(rel)
+    delete = [rec["path"] for key, rec in manifest["files"].items() if key not in desired]
+    freed = sum(manifest["files"][k].get("size", 0) for k in manifest["files"] if k not in desired)
+    return _plan_result(game_dir, add, replace, delete, total, freed, "deploy")
+
+def plan_vortex_deploy(gameid, game_dir, selected_mods=None, priority=None):
+    """
+    The plan deploy_vortex_mods would carry out for this selection.
+    """
+    mods = get_vortex_downloads(gameid)
+    if priority is None:
+        priority = get_mod_priority(gameid)
+    order = resolve_mod_dependencies(mods, selected_mods, priority)["order"] if mods else []
+    return plan_deployment(game_dir, build_deploy_map(order, detect_engine(game_dir)))
+
+def check_plan_fits(plan, what):
+    if not plan["fits"]:
+        raise NotEnoughSpace(
+            f"{what} needs {format_size(plan['required'])} free, only {format_size(plan['free'])} available")
+
+def format_plan(plan, limit=10):
+    lines = [
+        f"Add {len(plan['add'])}, replace {len(plan['replace'])}, delete {len(plan['delete'])} files",
+        f"Writes {format_size(plan['bytes'])}, frees {format_size(plan['freed'])}",
+    ]
+    if plan["free"] is not None:
+        lines.append(f"Free space: {format_size(plan['free'])} (needs {format_size(plan['required'])})"
+                     + ("" if plan["fits"] else "  ✗ does not fit"))
+    lines.append(f"Estimated time: {plan['eta']:.1f}s")
+    for kind in ("add", "replace", "delete"):
+        items = plan[kind]
+        if items:
+            lines.append(f"{kind.capitalize()}:")
+            lines += [f"  {p}" for p in items[:limit]]
+            if len(items) > limit:
+                lines.append(f"  …and {len(items) - limit} more")
+    return "\n".join(lines)
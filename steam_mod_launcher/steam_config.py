@@ -0,0 +1,405 @@
+"""
+Editing Steam's own files: shortcuts.vdf and per-game launch options.
+"""
+import os
+import re
+import struct
+import subprocess
+import time
+
+from .common import IS_WINDOWS
+from .tracing import traced
+from .discovery import get_steam_root
+
+# -----------------------------
+# --- Shortcuts.vdf helpers ---
+# -----------------------------
+@traced("vdf")
+def parse_shortcuts(path):
+    shortcuts = []
+    if not os.path.exists(path):
+        return shortcuts
+    with open(path, "rb") as f:
+        data = f.read()
+
+    i = 0
+    while i < len(data):
+        if data[i] == 0x08:
+            break
+        if data[i] != 0x00:
+            i += 1
+            continue
+        i += 1
+        while data[i] != 0x00:
+            i += 1
+        i += 1
+        entry = {}
+        while i < len(data):
+            t = data[i]
+            i += 1
+            if t == 0x08:
+                break
+            key = b""
+            while data[i] != 0x00:
+                key += bytes([data[i]])
+                i += 1
+            i += 1
+            key = key.decode("utf-8")
+            if t == 0x01:
+                val = b""
+                while data[i] != 0x00:
+                    val += bytes([data[i]])
+                    i += 1
+                i += 1
+                entry[key] = val.decode("utf-8")
+            elif t == 0x02:
+                val = struct.unpack("<I", data[i:i+4])[0]
+                i += 4
+                entry[key] = val
+        shortcuts.append(entry)
+    return shortcuts
+
+@traced("vdf")
+def write_shortcuts(path, shortcuts):
+    buf = b"\x00shortcuts\x00"
+    for idx, sc in enumerate(shortcuts):
+        buf += b"\x00" + str(idx).encode("utf-8") + b"\x00"
+        for k, v in sc.items():
+            if isinstance(v, int):
+                buf += b"\x02" + k.encode("utf-8") + b"\x00"
+                buf += struct.pack("<I", v)
+            else:
+                buf += b"\x01" + k.encode("utf-8") + b"\x00"
+                buf += v.encode("utf-8") + b"\x00"
+        buf += b"\x08"
+    buf += b"\x08\x08"
+    with open(path, "wb") as f:
+        f.write(buf)
+
+def add_nonsteam_shortcut(name, exe, startdir, launch_opts=""):
+    steam_root = get_steam_root()
+    userdata = os.path.join(steam_root, "userdata")
+    exe_norm = exe.strip('"').lower()
+    for sid in os.listdir(userdata):
+        cfg = os.path.join(userdata, sid, "config")
+        os.makedirs(cfg, exist_ok=True)
+        shortcuts_path = os.path.join(cfg, "shortcuts.vdf")
+        shortcuts = parse_shortcuts(shortcuts_path)
+
+        if any(sc.get("exe", "").strip('"').lower() == exe_norm for sc in shortcuts):
+            continue
+
+        shortcuts.append({
+            "appid": 0,
+            "AppName": name,
+            "exe": f"\"{exe}\"",
+            "StartDir": f"\"{startdir}\"",
+            "LaunchOptions": launch_opts,
+            "icon": "",
+            "ShortcutPath": "",
+            "IsHidden": 0,
+            "AllowOverlay": 1,
+            "OpenVR": 0,
+            "Devkit": 0,
+            "DevkitGameID": "",
+            "LastPlayTime": 0,
+            "tags": ""
+        })
+        write_shortcuts(shortcuts_path, shortcuts)
+
+def remove_nonsteam_shortcut(exe_path):
+    steam_root = get_steam_root()
+    userdata = os.path.join(steam_root, "userdata")
+    target = os.path.normpath(os.path.abspath(exe_path.strip('"'))).lower()
+
+    for sid in os.listdir(userdata):
+        cfg = os.path.join(userdata, sid, "config")
+        shortcuts_path = os.path.join(cfg, "shortcuts.vdf")
+        if not os.path.exists(shortcuts_path):
+            continue
+
+        shortcuts = parse_shortcuts(shortcuts_path)
+        new_shortcuts = []
+        changed = False
+
+        for sc in shortcuts:
+            sc_exe = sc.get("exe", "").strip('"')
+            sc_exe_norm = os.path.normpath(os.path.abspath(sc_exe)).lower()
+            if sc_exe_norm == target:
+                changed = True
+                continue
+            new_shortcuts.append(sc)
+
+        if changed:
+            write_shortcuts(shortcuts_path, new_shortcuts)
+
+
+
+# -----------------------------
+# --- Launch options        ---
+# -----------------------------
+# Steam keeps per-user launch options in userdata/<id>/config/localconfig.vdf
+# under UserLocalConfigStore/Software/Valve/Steam/apps/<appid>. The files
+# are large, so they are streamed line by line: only the LaunchOptions line
+# of the targeted app blocks is replaced/inserted/dropped, everything else
+# is written back byte for byte. Steam rewrites the file on exit, so it
+# must not be running while we edit it.
+# A user's own options are kept around ours: our shim takes the place of
+# their %command% (or their options follow it as game arguments), and a
+# revert strips just our part again.
+LOCALCONFIG_APPS_PATH = ["userlocalconfigstore", "software", "valve", "steam", "apps"]
+_VDF_TOKEN = re.compile(r'"((?:[^"\\]|\\.)*)"|([{}])|//.*')
+
+def vdf_escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+def vdf_unescape(value):
+    return re.sub(r'\\(.)', lambda m: {"n": "\n", "t": "\t"}.get(m.group(1), m.group(1)), value)
+
+def launch_option_for(shim_path):
+    return f"\"{shim_path}\" %command%"
+
+def is_our_launch_option(value):
+    return "modlaunch.cmd" in value.lower()
+
+_OUR_LAUNCH_OPTION = re.compile(r'"[^"]*modlaunch\.cmd" %command%', re.IGNORECASE)
+
+def strip_launch_option(value):
+    """
+    The user's own part of a launch option, without our shim.
+    """
+    m = _OUR_LAUNCH_OPTION.search(value)
+    if not m:
+        return value
+    prefix, suffix = value[:m.start()], value[m.end():]
+    if not prefix.strip():
+        return suffix.strip()
+    return f"{prefix}%command%{suffix}"
+
+def merge_launch_option(ours, old):
+    """
+    ours placed into the user's existing option old (ours or theirs).
+    """
+    theirs = strip_launch_option(old or "").strip()
+    if not theirs:
+        return ours
+    if "%command%" in theirs:
+        return theirs.replace("%command%", ours, 1)
+    return f"{ours} {theirs}"
+
+def get_localconfig_paths():
+    userdata = os.path.join(get_steam_root(), "userdata")
+    try:
+        users = [u for u in os.listdir(userdata) if u.isdigit() and u != "0"]
+    except OSError:
+        return []
+    paths = [os.path.join(userdata, u, "config", "localconfig.vdf") for u in users]
+    return [p for p in paths if os.path.isfile(p)]
+
+def _vdf_logical_lines(f):
+    """
+    Yield physical lines joined so that no quoted string spans a yield.
+    """
+    buf = ""
+    for line in f:
+        buf += line
+        if len(re.findall(r'(?<!\\)(?:\\\\)*"', buf)) % 2 == 0:
+            yield buf
+            buf = ""
+    if buf:
+        yield buf
+
+def _vdf_walk(f):
+    """
+    Yield (line, tokens, stack, key) per logical line, where stack/key
+    describe the position *before* the line: the open block keys and a
+    pending key that still waits for its value or block.
+    """
+    stack, key = [], None
+    for line in _vdf_logical_lines(f):
+        # braces as 1-tuples so a quoted "}" is never mistaken for one
+        tokens = [m.group(1) if m.group(1) is not None else (m.group(2),)
+                  for m in _VDF_TOKEN.finditer(line) if m.group(0)[:2] != "//"]
+        yield line, tokens, list(stack), key
+        for tok in tokens:
+            if tok == ("{",):
+                stack.append(key or "")
+                key = None
+            elif tok == ("}",):
+                if stack:
+                    stack.pop()
+                key = None
+            elif key is None:
+                key = tok
+            else:
+                key = None  # key/value pair complete
+
+def _localconfig_app(stack):
+    """
+    The appid whose block `stack` is directly inside, else None.
+    """
+    if len(stack) == len(LOCALCONFIG_APPS_PATH) + 1 and \
+            [k.lower() for k in stack[:-1]] == LOCALCONFIG_APPS_PATH:
+        return stack[-1]
+    return None
+
+def _launch_option_pair(tokens, key):
+    if key is None and len(tokens) == 2 and all(isinstance(t, str) for t in tokens) \
+            and tokens[0].lower() == "launchoptions":
+        return vdf_unescape(tokens[1])
+    return None
+
+@traced("vdf")
+def read_launch_options(path):
+    """
+    {appid: launch options} from one localconfig.vdf.
+    """
+    found = {}
+    with open(path, encoding="utf-8", errors="surrogateescape", newline="") as f:
+        for line, tokens, stack, key in _vdf_walk(f):
+            app = _localconfig_app(stack)
+            value = _launch_option_pair(tokens, key) if app else None
+            if value is not None:
+                found[app] = value
+    return found
+
+@traced("vdf")
+def edit_localconfig(path, options):
+    """
+    options: {appid: launch option string, or None to remove ours}.
+    An option is merged with what the user already has there, and None
+    strips only our shim from it, so a user's own options survive a write
+    and a revert. Returns the number of apps changed.
+    """
+    pending = {str(k): v for k, v in options.items()}
+    handled = set()
+    changed = 0
+    tmp = path + ".tmp"
+    with open(path, encoding="utf-8", errors="surrogateescape", newline="") as src, \
+         open(tmp, "w", encoding="utf-8", errors="surrogateescape", newline="") as out:
+        newline = "\n"
+        for line, tokens, stack, key in _vdf_walk(src):
+            if line.endswith("\r\n"):
+                newline = "\r\n"
+            indent = line[:len(line) - len(line.lstrip("\t "))]
+            in_apps = [k.lower() for k in stack] == LOCALCONFIG_APPS_PATH
+            app = _localconfig_app(stack)
+
+            # an existing "LaunchOptions" "..." pair of a targeted app
+            old = _launch_option_pair(tokens, key) if app in pending else None
+            if old is not None:
+                value = pending[app]
+                handled.add(app)
+                if value is None:
+                    if is_our_launch_option(old):
+                        changed += 1
+                        theirs = strip_launch_option(old)
+                        if theirs:
+                            out.write(f'{indent}"LaunchOptions"\t\t"{vdf_escape(theirs)}"{newline}')
+                        continue
+                elif old != merge_launch_option(value, old):
+                    value = merge_launch_option(value, old)
+                    out.write(f'{indent}"LaunchOptions"\t\t"{vdf_escape(value)}"{newline}')
+                    changed += 1
+                    continue
+
+            if tokens == [("}",)]:
+                if app in pending and app not in handled:
+                    handled.add(app)
+                    if pending[app] is not None:
+                        out.write(f'{indent}\t"LaunchOptions"\t\t"{vdf_escape(pending[app])}"{newline}')
+                        changed += 1
+                elif in_apps:
+                    for appid, value in pending.items():
+                        if appid not in handled and value is not None:
+                            handled.add(appid)
+                            out.write(f'{indent}\t"{appid}"{newline}{indent}\t{{{newline}'
+                                      f'{indent}\t\t"LaunchOptions"\t\t"{vdf_escape(value)}"{newline}'
+                                      f'{indent}\t}}{newline}')
+                            changed += 1
+            out.write(line)
+
+    if changed:
+        os.replace(tmp, path)
+    else:
+        os.remove(tmp)
+    return changed
+
+def write_launch_options(options):
+    """
+    Apply {appid: option or None} to every Steam user's localconfig.vdf.
+    Returns the number of (user, app) entries changed.
+    """
+    total = 0
+    for path in get_localconfig_paths():
+        changed = edit_localconfig(path, options)
+        if changed:
+            print(f"[LAUNCHOPT] {changed} app(s) updated in {path}")
+        total += changed
+    return total
+
+def launch_options_pending(options):
+    """
+    True if write_launch_options(options) would change anything.
+    """
+    for path in get_localconfig_paths():
+        current = read_launch_options(path)
+        for appid, value in options.items():
+            old = current.get(str(appid))
+            if value is None and old is not None and is_our_launch_option(old):
+                return True
+            if value is not None and old != merge_launch_option(value, old):
+                return True
+    return False
+
+def launch_options_from_state(state, games):
+    """
+    {appid: option} for every launcher in state that has a ModLaunch.cmd.
+    """
+    by_name = {g["Name"]: g for g in games}
+    options = {}
+    for name, entry in state.items():
+        if name.startswith("_") or name not in by_name:
+            continue
+        game = by_name[name]
+        game_dir = os.path.join(os.path.dirname(game["Manifest"]), "common", game["InstallDir"])
+        shim_path = os.path.join(game_dir, "ModLaunch.cmd")
+        if os.path.exists(shim_path):
+            options[game["AppId"]] = launch_option_for(shim_path)
+    return options
+
+def steam_running():
+    try:
+        if IS_WINDOWS:
+            out = subprocess.run(["tasklist", "/FI", "IMAGENAME eq steam.exe", "/NH"],
+                                 capture_output=True, text=True).stdout
+            return "steam.exe" in out.lower()
+        return subprocess.run(["pgrep", "-x", "steam"], capture_output=True).returncode == 0
+    except OSError:
+        return False
+
+def stop_steam(timeout=20):
+    """
+    Ask Steam to exit and wait until it has (so it cannot overwrite our edits).
+    """
+    if not steam_running():
+        return True
+    try:
+        subprocess.call(["steam" if not IS_WINDOWS else os.path.join(get_steam_root(), "steam.exe"),
+                         "-shutdown"])
+    except OSError:
+        pass
+    deadline = time.time() + timeout
+    while steam_running() and time.time() < deadline:
+        time.sleep(0.5)
+    if steam_running() and IS_WINDOWS:
+        os.system("taskkill /IM steam.exe /F")
+    return not steam_running()
+
+def start_steam():
+    if IS_WINDOWS:
+        steam_exe = os.path.join(get_steam_root(), "steam.exe")
+        if os.path.exists(steam_exe):
+            os.startfile(steam_exe)
+    else:
+        subprocess.Popen(["steam"])
@@ -0,0 +1,570 @@
+"""
+Thunderstore / r2modman profiles: staging, switching and import.
+"""
+import os
+import re
+import json
+import shutil
+import time
+
+from .common import write_json_atomic
+from .tracing import trace_count, traced
+from .discovery import discovery_cached, get_thunderstore_bases, thunderstore_community
+from .mods import (build_deploy_map, check_plan_fits, commit_staged, fingerprint_files,
+                   FINGERPRINT_ALGO, get_vortex_downloads, index_mods, make_progress,
+                   ModExtractError, package_key, _plan_result,
+                   PROFILE_ROOT_FILES, _prune_empty_dirs, record_throughput,
+                   resolve_mod_dependencies, snapshot_vanilla, stage_members, version_key,
+                   WINDOWS_RESERVED_NAMES)
+
+# -----------------------------
+# --- Thunderstore helpers  ---
+# -----------------------------
+@discovery_cached(ttl=30)
+def get_thunderstore_profiles_any(game_name_guess=None):
+    profiles = []
+    community = thunderstore_community(game_name_guess) if game_name_guess else None
+    if game_name_guess and not community:
+        return profiles
+    for base in get_thunderstore_bases():
+        for game_folder in [community] if community else os.listdir(base):
+            game_path = os.path.join(base, game_folder, "profiles")
+            if not os.path.exists(game_path):
+                continue
+
+            for p in os.listdir(game_path):
+                full = os.path.join(game_path, p)
+                if os.path.isdir(full):
+                    print(f"[TS PROFILE] {full}")  # 👈 debug
+                    profiles.append(full)
+    return profiles
+
+
+# -----------------------------
+# --- Staged profiles       ---
+# -----------------------------
+# Every Thunderstore profile used for a game is kept as a ready deployment
+# in <game_dir>/.sml_profiles/<name>. The live loader set (BepInEx plus the
+# doorstop files) belongs to the active profile; switching renames the live
+# set into its slot and the target's set into the game folder, which is a
+# handful of same-volume renames instead of a full recopy.
+PROFILE_STAGE_DIR = ".sml_profiles"
+PROFILE_ACTIVE_FILE = "active.json"
+VANILLA_PROFILE = "vanilla"
+PROFILE_ITEMS = ["BepInEx"] + PROFILE_ROOT_FILES
+# loader payload that is mirrored exactly; config/cache are left alone since
+# BepInEx rewrites them while the game runs
+PROFILE_MIRROR_DIRS = ["BepInEx/core", "BepInEx/plugins", "BepInEx/patchers"]
+
+def _list_profile_files(profile_path):
+    """
+    {lowercased relpath: relpath} of what a Thunderstore sync copies.
+    """
+    files = {}
+    for name in PROFILE_ROOT_FILES:
+        if os.path.isfile(os.path.join(profile_path, name)):
+            files[name.lower()] = name
+    for root, _, names in os.walk(os.path.join(profile_path, "BepInEx")):
+        for n in names:
+            rel = os.path.relpath(os.path.join(root, n), profile_path).replace(os.sep, "/")
+            files[rel.lower()] = rel
+    return files
+
+# set by the pre-sync daemon (watch.py) while a game folder is in step with
+# its profile; the launch shim then skips its own copy. The marker names the
+# profile and how long it stays valid, and the daemon touches it on every
+# poll: a marker left behind by a killed daemon or a reboot expires.
+PRESYNC_MARKER = ".sml_presync.ok"
+PRESYNC_MIN_TTL = 10  # seconds
+
+def clear_presync_marker(game_dir):
+    try:
+        os.remove(os.path.join(game_dir, PRESYNC_MARKER))
+    except FileNotFoundError:
+        pass
+
+def write_presync_marker(game_dir, profile_path, interval):
+    ttl = max(PRESYNC_MIN_TTL, 3 * interval)
+    with open(os.path.join(game_dir, PRESYNC_MARKER), "w", encoding="utf-8") as f:
+        f.write(f"{profile_path}\n{time.time():.0f}\n{ttl:.0f}\n")
+
+def touch_presync_marker(game_dir):
+    try:
+        os.utime(os.path.join(game_dir, PRESYNC_MARKER))
+    except FileNotFoundError:
+        pass
+
+def presync_marker_valid(game_dir, profile_path):
+    """
+    True if the daemon mirrored profile_path into game_dir and is still
+    keeping it in step.
+    """
+    marker = os.path.join(game_dir, PRESYNC_MARKER)
+    try:
+        age = time.time() - os.path.getmtime(marker)
+        with open(marker, encoding="utf-8") as f:
+            synced, _, ttl = f.read().splitlines()[:3]
+        ttl = float(ttl)
+    except (OSError, ValueError):
+        return False
+    same = os.path.normcase(os.path.abspath(synced)) == os.path.normcase(os.path.abspath(profile_path))
+    return same and age <= ttl
+
+# profile names become folder names in .sml_profiles and may come from an
+# .r2z or a downloaded profile code
+_UNSAFE_NAME_CHARS = r'[\\/:*?"<>|\x00-\x1f]'
+
+def check_profile_name(name):
+    """
+    Raise ValueError unless name is a single safe folder name: no path
+    separators, no leading dot (so not '.' or '..'), no trailing dot or
+    space and no Windows device name.
+    """
+    if (not name or re.search(_UNSAFE_NAME_CHARS, name) or name.startswith(".")
+            or name != name.rstrip(" .")
+            or name.split(".")[0].rstrip(" ").upper() in WINDOWS_RESERVED_NAMES):
+        raise ValueError(f"Unsafe profile name: {name!r}")
+    return name
+
+def profile_slug(name):
+    """
+    Reduce an untrusted profile name to one that passes check_profile_name.
+    """
+    slug = re.sub(_UNSAFE_NAME_CHARS + "+", "_", name).strip(" .")
+    if slug.split(".")[0].rstrip(" ").upper() in WINDOWS_RESERVED_NAMES:
+        slug = "_" + slug
+    return slug or "imported"
+
+def _stage_slot(game_dir, name, prefix=""):
+    return os.path.join(game_dir, PROFILE_STAGE_DIR, prefix + check_profile_name(name))
+
+def get_active_profile(game_dir):
+    try:
+        with open(os.path.join(game_dir, PROFILE_STAGE_DIR, PROFILE_ACTIVE_FILE), encoding="utf-8") as f:
+            return json.load(f).get("name")
+    except (OSError, ValueError):
+        return None
+
+def mark_active_profile(game_dir, name):
+    check_profile_name(name)
+    os.makedirs(os.path.join(game_dir, PROFILE_STAGE_DIR), exist_ok=True)
+    write_json_atomic(os.path.join(game_dir, PROFILE_STAGE_DIR, PROFILE_ACTIVE_FILE), {"name": name})
+
+def list_staged_profiles(game_dir):
+    base = os.path.join(game_dir, PROFILE_STAGE_DIR)
+    names = {VANILLA_PROFILE}
+    if os.path.isdir(base):
+        names.update(n for n in os.listdir(base)
+                     if not n.startswith(".") and os.path.isdir(os.path.join(base, n)))
+    active = get_active_profile(game_dir)
+    if active:
+        names.add(active)
+    return sorted(names, key=lambda n: (n != VANILLA_PROFILE, n.lower()))
+
+def _profile_changes(profile_path, dest):
+    """
+    Yield (relpath, source stat, dest stat or None) for files of the
+    profile that are missing in dest or newer there (same rule as xcopy /D).
+    """
+    for rel in _list_profile_files(profile_path).values():
+        sst = os.stat(os.path.join(profile_path, *rel.split("/")))
+        try:
+            dst_st = os.stat(os.path.join(dest, *rel.split("/")))
+        except FileNotFoundError:
+            dst_st = None
+        if dst_st and dst_st.st_size == sst.st_size and dst_st.st_mtime >= sst.st_mtime - 2:
+            continue
+        yield rel, sst, dst_st
+
+def _profile_stale(profile_path, dest):
+    """
+    Payload files in dest that the profile no longer has.
+    """
+    wanted = set(_list_profile_files(profile_path))
+    stale = [name for name in PROFILE_ROOT_FILES
+             if name.lower() not in wanted and os.path.isfile(os.path.join(dest, name))]
+    for root_rel in PROFILE_MIRROR_DIRS:
+        for dirpath, _, names in os.walk(os.path.join(dest, *root_rel.split("/"))):
+            for n in names:
+                rel = os.path.relpath(os.path.join(dirpath, n), dest).replace(os.sep, "/")
+                if rel.lower() not in wanted:
+                    stale.append(rel)
+    return stale
+
+def plan_profile_sync(profile_path, dest):
+    """
+    The plan mirror_profile(profile_path, dest) would carry out.
+    """
+    add, replace, delete = [], [], []
+    total = freed = 0
+    for rel, sst, dst_st in _profile_changes(profile_path, dest):
+        (replace if dst_st else add).append(rel)
+        total += sst.st_size
+    for rel in _profile_stale(profile_path, dest):
+        delete.append(rel)
+        try:
+            freed += os.path.getsize(os.path.join(dest, *rel.split("/")))
+        except OSError:
+            pass
+    return _plan_result(dest, add, replace, delete, total, freed, "copy")
+
+@traced("sync")
+def mirror_profile(profile_path, dest):
+    """
+    Delta-copy a profile's loader set into dest (a staging slot or the live
+    game folder): only new or newer files are copied, payload files the
+    profile no longer has are removed. Returns the number of files copied.
+    """
+    check_plan_fits(plan_profile_sync(profile_path, dest), f"Syncing {os.path.basename(profile_path)}")
+    start = time.monotonic()
+    copied = 0
+    written = 0
+    for rel, sst, _ in _profile_changes(profile_path, dest):
+        src = os.path.join(profile_path, *rel.split("/"))
+        dst = os.path.join(dest, *rel.split("/"))
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        shutil.copy2(src, dst)
+        copied += 1
+        written += sst.st_size
+    record_throughput("copy", written, time.monotonic() - start)
+    trace_count("profile_copy.files", copied)
+    trace_count("profile_copy.bytes", written)
+
+    for rel in _profile_stale(profile_path, dest):
+        target = os.path.join(dest, *rel.split("/"))
+        os.remove(target)
+        _prune_empty_dirs(os.path.dirname(target), dest)
+    return copied
+
+def _swap_items(moves):
+    """
+    Apply (src, dst) renames in order; undo the ones already done if one fails.
+    """
+    done = []
+    try:
+        for src, dst in moves:
+            os.replace(src, dst)
+            done.append((src, dst))
+    except OSError:
+        for src, dst in reversed(done):
+            os.replace(dst, src)
+        raise
+
+@traced("sync")
+def switch_profile(game_dir, name, profile_path=None):
+    """
+    Make `name` the live profile of game_dir. profile_path (the Thunderstore
+    profile folder) refreshes the staged copy first; "vanilla" has none.
+    The first switch for a game records the current loader set as vanilla.
+    """
+    check_profile_name(name)
+    start = time.perf_counter()
+    clear_presync_marker(game_dir)
+    active = get_active_profile(game_dir) or VANILLA_PROFILE
+    if name == active:
+        if profile_path:
+            copied = mirror_profile(profile_path, game_dir)
+            print(f"[PROFILE] {name} already live, {copied} files refreshed")
+        return
+
+    target = _stage_slot(game_dir, name)
+    os.makedirs(target, exist_ok=True)
+    if profile_path:
+        copied = mirror_profile(profile_path, target)
+        print(f"[PROFILE] Staged {name}: {copied} files updated")
+
+    park = _stage_slot(game_dir, active)
+    os.makedirs(park, exist_ok=True)
+    if active == VANILLA_PROFILE:
+        # the parked vanilla slot is deleted on revert, keep the originals safe
+        snapshot_vanilla(game_dir, PROFILE_ROOT_FILES, replace_safe=True)
+    moves = []
+    for item in PROFILE_ITEMS:
+        live = os.path.join(game_dir, item)
+        if os.path.lexists(live):
+            parked = os.path.join(park, item)
+            if os.path.isdir(parked) and not os.path.islink(parked):
+                shutil.rmtree(parked)  # leftover from an interrupted swap
+            moves.append((live, parked))
+    moves += [(os.path.join(target, item), os.path.join(game_dir, item))
+              for item in PROFILE_ITEMS if os.path.lexists(os.path.join(target, item))]
+    _swap_items(moves)
+
+    mark_active_profile(game_dir, name)
+    print(f"[PROFILE] {active} -> {name} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+# -----------------------------
+# --- Profile import        ---
+# -----------------------------
+# r2modman/Thunderstore Mod Manager export a profile as a .r2z zip holding
+# export.r2x (YAML: profileName + mods with name/version/enabled) and the
+# profile's config files; a "profile code" is the same zip uploaded to
+# Thunderstore. Importing builds a staged profile (see Staged profiles)
+# from package archives that are already on this machine, so no mod
+# manager is needed on the target PC.
+#
+# The package store is content-addressed: every zip is kept as
+# <PACKAGE_STORE>/<digest>/<Author-Name-1.2.3.zip>, the digest being its
+# file fingerprint (store.json notes the algorithm). Zips dropped into the
+# store root are filed on the next import; a stored zip whose content no
+# longer matches its digest is reported and not used.
+PACKAGE_STORE = os.path.join(os.path.expanduser("~"), "steam_mod_launcher_packages")
+PACKAGE_STORE_INDEX = "store.json"
+PROFILE_CODE_URL = "https://thunderstore.io/api/experimental/legacyprofile/get/{code}/"
+R2X_NAME = "export.r2x"
+
+def _yaml_scalar(text):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+        return text[1:-1]
+    low = text.lower()
+    if low in ("true", "false"):
+        return low == "true"
+    if low in ("null", "~", ""):
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        return text
+
+def parse_simple_yaml(text):
+    """
+    Block-style YAML subset used by export.r2x: nested maps, "- " lists and
+    plain/quoted scalars. No flow style, anchors or multi-line strings.
+    """
+    lines = []
+    for raw in text.splitlines():
+        stripped = raw.split(" #")[0].rstrip() if not raw.lstrip().startswith(("'", '"')) else raw.rstrip()
+        if stripped.strip() and not stripped.lstrip().startswith("#"):
+            lines.append((len(stripped) - len(stripped.lstrip(" ")), stripped.strip()))
+
+    def block(i, indent):
+        if i < len(lines) and lines[i][1].startswith("- "):
+            items = []
+            while i < len(lines) and lines[i][0] == indent and lines[i][1].startswith("- "):
+                # "- key: value" opens a map whose keys sit two columns further in
+                lines[i] = (indent + 2, lines[i][1][2:])
+                if ":" in lines[i][1] and not lines[i][1].startswith(("'", '"')):
+                    value, i = block(i, indent + 2)
+                else:
+                    value, i = _yaml_scalar(lines[i][1]), i + 1
+                items.append(value)
+            return items, i
+        mapping = {}
+        while i < len(lines) and lines[i][0] == indent and not lines[i][1].startswith("- "):
+            key, _, rest = lines[i][1].partition(":")
+            i += 1
+            if rest.strip():
+                mapping[_yaml_scalar(key)] = _yaml_scalar(rest)
+            elif i < len(lines) and (lines[i][0] > indent or lines[i][1].startswith("- ")):
+                mapping[_yaml_scalar(key)], i = block(i, lines[i][0])
+            else:
+                mapping[_yaml_scalar(key)] = None
+        return mapping, i
+
+    return block(0, lines[0][0])[0] if lines else {}
+
+def read_r2z(r2z_path):
+    """
+    (profile name, [(package 'Author-Name', version or None)], config members).
+    Disabled mods are left out; the name is reduced to a safe folder name.
+    """
+    import zipfile
+    with zipfile.ZipFile(r2z_path) as zf:
+        names = zf.namelist()
+        r2x = next((n for n in names if n.lower() == R2X_NAME), None)
+        if not r2x:
+            raise ModExtractError(f"{os.path.basename(r2z_path)} has no {R2X_NAME}")
+        doc = parse_simple_yaml(zf.read(r2x).decode("utf-8-sig"))
+    mods = []
+    for mod in doc.get("mods") or []:
+        if not isinstance(mod, dict) or not mod.get("name") or mod.get("enabled") is False:
+            continue
+        v = mod.get("version")
+        if isinstance(v, dict):
+            v = f"{v.get('major', 0)}.{v.get('minor', 0)}.{v.get('patch', 0)}"
+        mods.append((mod["name"], str(v) if v else None))
+    configs = [n for n in names if n != r2x and not n.endswith("/")]
+    name = profile_slug(str(doc.get("profileName") or os.path.splitext(os.path.basename(r2z_path))[0]))
+    return name, mods, configs
+
+def fetch_profile_code(code, dest_dir):
+    """
+    Download a Thunderstore profile code into dest_dir; returns the .r2z path.
+    """
+    import base64
+    import urllib.request
+    code = code.strip()
+    if not re.fullmatch(r"[0-9a-fA-F-]{8,64}", code):
+        raise ValueError(f"Not a profile code: {code!r}")
+    with urllib.request.urlopen(PROFILE_CODE_URL.format(code=code), timeout=30) as resp:
+        body = resp.read().decode("ascii", errors="replace")
+    payload = body.split("\n", 1)[1] if body.startswith("#r2modman") else body
+    path = os.path.join(dest_dir, f"{code}.r2z")
+    with open(path, "wb") as f:
+        f.write(base64.b64decode(payload))
+    return path
+
+def _stored_zips(store):
+    zips = []
+    for digest in os.listdir(store):
+        folder = os.path.join(store, digest)
+        if not digest.startswith(".") and os.path.isdir(folder):
+            zips += [os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(".zip")]
+    return zips
+
+def file_package_store(store=None):
+    """
+    Move zips dropped into the store root to <digest>/<name>; a zip already
+    stored is dropped. Everything is re-filed when the fingerprint algorithm
+    changed. Returns the number of zips filed.
+    """
+    store = store or PACKAGE_STORE
+    if not os.path.isdir(store):
+        return 0
+    index_path = os.path.join(store, PACKAGE_STORE_INDEX)
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            algo = json.load(f).get("algo")
+    except (OSError, ValueError):
+        algo = None
+    todo = [os.path.join(store, f) for f in os.listdir(store) if f.lower().endswith(".zip")]
+    if algo != FINGERPRINT_ALGO:
+        todo += _stored_zips(store)
+    filed = 0
+    for path, digest in fingerprint_files(todo).items():
+        if digest is None:
+            continue
+        dest = os.path.join(store, digest, os.path.basename(path))
+        if path == dest:
+            continue
+        if os.path.exists(dest):
+            os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            os.replace(path, dest)
+            filed += 1
+        _prune_empty_dirs(os.path.dirname(path), store)
+    if filed:
+        print(f"[STORE] Filed {filed} packages into {store}")
+    if algo != FINGERPRINT_ALGO:
+        write_json_atomic(index_path, {"algo": FINGERPRINT_ALGO})
+    return filed
+
+def stored_packages(store=None):
+    """
+    Zips in the package store whose content still matches their digest.
+    """
+    store = store or PACKAGE_STORE
+    if not os.path.isdir(store):
+        return []
+    file_package_store(store)
+    good = []
+    for path, digest in fingerprint_files(_stored_zips(store)).items():
+        if digest == os.path.basename(os.path.dirname(path)):
+            good.append(path)
+        else:
+            print(f"[STORE] {os.path.relpath(path, store)} doesn't match its hash, skipped")
+    return good
+
+def find_packages(wanted, gameid=None, package_dirs=()):
+    """
+    Match [(Author-Name, version)] against package archives on disk (the
+    package store, extra dirs, Vortex downloads for gameid). Returns
+    ({package: archive path}, missing, substituted) where substituted lists
+    packages found only in another version (the newest one is used).
+    """
+    candidates = stored_packages()
+    for d in package_dirs:
+        if os.path.isdir(d):
+            candidates += [os.path.join(d, f) for f in os.listdir(d) if f.lower().endswith(".zip")]
+    if gameid:
+        candidates += [p for p in get_vortex_downloads(gameid) if p.lower().endswith(".zip")]
+    index = index_mods(candidates)
+    by_key = {}
+    for p, entry in index.items():
+        by_key.setdefault(package_key(p, entry), []).append((entry.get("version"), p))
+
+    found, missing, substituted = {}, [], []
+    for package, version in wanted:
+        versions = by_key.get(package.lower())
+        if not versions:
+            missing.append(f"{package}-{version}" if version else package)
+            continue
+        exact = next((p for v, p in versions if v == version), None)
+        if exact:
+            found[package] = exact
+        else:
+            found[package] = max(versions, key=lambda vp: version_key(vp[0]))[1]
+            substituted.append(f"{package}-{version}")
+    return found, missing, substituted
+
+def import_r2z(r2z_path, game_dir, gameid=None, package_dirs=(), name=None,
+               progress=None, cancel=None):
+    """
+    Build a staged profile from a .r2z export and make it the live profile
+    of game_dir. Returns {"name", "files", "missing", "substituted"}.
+    An unsafe name override raises ValueError.
+    """
+    profile_name, mods, configs = read_r2z(r2z_path)
+    name = check_profile_name(name or profile_name)
+    if name.lower() == VANILLA_PROFILE:
+        raise ValueError(f"'{name}' is reserved for the original game files")
+    found, missing, substituted = find_packages(mods, gameid, package_dirs)
+    order = resolve_mod_dependencies(list(found.values()))["order"]
+    desired = build_deploy_map(order, "Unity")
+
+    build = _stage_slot(game_dir, name, prefix=".import-")
+    if os.path.exists(build):
+        shutil.rmtree(build)
+    staging = build + ".sml-staging"
+    total = sum(v[3] for v in desired.values())
+    on_bytes = make_progress(total, progress, name)
+    try:
+        by_mod = {}
+        for rel, mod_path, member, size, crc in desired.values():
+            by_mod.setdefault(mod_path, []).append((member, rel))
+        staged = {}
+        for mod_path, members in by_mod.items():
+            staged.update(stage_members(mod_path, members, staging, on_bytes, cancel))
+        # the profile's own configs win over the packages' defaults
+        staged.update(stage_members(r2z_path, [(m, m) for m in configs], staging, None, cancel))
+        commit_staged(staged, build)
+
+        if get_active_profile(game_dir) == name:
+            mirror_profile(build, game_dir)
+        else:
+            slot = _stage_slot(game_dir, name)
+            if os.path.exists(slot):
+                shutil.rmtree(slot)
+            os.replace(build, slot)
+            switch_profile(game_dir, name)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+        shutil.rmtree(build, ignore_errors=True)
+
+    print(f"[IMPORT] {name}: {len(found)} packages, {len(staged)} files"
+          f"{f', missing {len(missing)}' if missing else ''}")
+    return {"name": name, "files": len(staged), "missing": missing, "substituted": substituted}
+
+def import_profile_source(source, game_dir, gameid=None, package_dirs=(), name=None):
+    """
+    import_r2z for either a .r2z path or a Thunderstore profile code.
+    """
+    if os.path.isfile(source):
+        return import_r2z(source, game_dir, gameid, package_dirs, name)
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        return import_r2z(fetch_profile_code(source, tmp), game_dir, gameid, package_dirs, name)
+
+def format_import_report(result):
+    lines = [f"Imported '{result['name']}' ({result['files']} files)."]
+    if result["missing"]:
+        lines.append("Not found locally (add them to the package store):")
+        lines += [f"  {p}" for p in result["missing"]]
+        lines.append(f"Package store: {PACKAGE_STORE}")
+    if result["substituted"]:
+        lines.append("Used another version of:")
+        lines += [f"  {p}" for p in result["substituted"]]
+    return "\n".join(lines)
@@ -0,0 +1,192 @@
+"""
+Timed trace spans and the --profile mode.
+"""
+import os
+import json
+import time
+import functools
+import collections
+import threading
+import atexit
+
+from .common import format_size, STATE_FILE
+
+# -----------------------------
+# --- Tracing               ---
+# -----------------------------
+# Timed spans for the hot paths (discovery, manifests, engine/exe lookup,
+# extraction, sync, VDF I/O). The newest TRACE_CAPACITY spans are kept in
+# memory for the Performance window; export_trace() writes them as JSON
+# lines or as a Chrome trace (chrome://tracing, ui.perfetto.dev). With
+# SML_TRACE set the trace is written on exit: a path ending in .json gets
+# the Chrome format, any other path JSON lines, "1" the default file.
+TRACE_ENV = "SML_TRACE"
+TRACE_FILE = os.path.join(os.path.dirname(STATE_FILE), "steam_mod_launcher_trace.json")
+TRACE_CAPACITY = 5000
+
+_trace_spans = collections.deque(maxlen=TRACE_CAPACITY)
+_trace_counters = collections.Counter()
+_trace_origin = time.perf_counter()
+
+class trace_span:
+    """
+    with trace_span("sync", "deploy", files=3) as span: ... span.add(bytes=n)
+    records how long the block took plus its counters, also when it raises.
+    """
+
+    def __init__(self, name, cat="app", **args):
+        self.name, self.cat, self.args = name, cat, args
+
+    def add(self, **counters):
+        for key, n in counters.items():
+            self.args[key] = self.args.get(key, 0) + n
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        _trace_spans.append({
+            "name": self.name, "cat": self.cat,
+            "ts": (self.start - _trace_origin) * 1e6, "dur": (end - self.start) * 1e6,
+            "tid": threading.get_ident(), "args": self.args,
+        })
+        return False
+
+def traced(cat, name=None):
+    """
+    Decorator form of trace_span, named after the function.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with trace_span(name or func.__name__, cat):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def trace_count(name, n=1):
+    _trace_counters[name] += n
+
+def trace_summary():
+    """
+    [(name, cat, count, total s, max s)] over the buffered spans, slowest total first.
+    """
+    agg = {}
+    for span in list(_trace_spans):
+        row = agg.setdefault((span["name"], span["cat"]), [0, 0.0, 0.0])
+        row[0] += 1
+        row[1] += span["dur"] / 1e6
+        row[2] = max(row[2], span["dur"] / 1e6)
+    return sorted(((n, c, *row) for (n, c), row in agg.items()), key=lambda r: -r[3])
+
+def clear_trace():
+    _trace_spans.clear()
+    _trace_counters.clear()
+
+def export_trace(path):
+    spans = list(_trace_spans)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        if path.lower().endswith(".json"):
+            pid = os.getpid()
+            events = [dict(span, ph="X", pid=pid) for span in spans]
+            events += [{"name": name, "ph": "C", "ts": 0, "pid": pid, "args": {"value": n}}
+                       for name, n in _trace_counters.items()]
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        else:
+            for span in spans:
+                f.write(json.dumps(span) + "\n")
+            if _trace_counters:
+                f.write(json.dumps({"counters": dict(_trace_counters)}) + "\n")
+    os.replace(tmp, path)
+    return len(spans)
+
+def _export_trace_at_exit():
+    target = os.environ.get(TRACE_ENV)
+    if not target:
+        return
+    path = TRACE_FILE if target == "1" else target
+    try:
+        print(f"[TRACE] {export_trace(path)} spans -> {path}")
+    except OSError as e:
+        print(f"[WARN] Could not write trace: {e}")
+
+atexit.register(_export_trace_at_exit)
+
+
+# -----------------------------
+# --- Profiling             ---
+# -----------------------------
+# --profile (or SML_PROFILE=1) runs one operation, or the GUI until its
+# first idle moment, under cProfile and tracemalloc. Next to the state file
+# it leaves <name>.prof (raw stats for snakeviz/pstats) and <name>.txt:
+# wall time, peak memory, top allocation sites and the hottest functions.
+PROFILE_ENV = "SML_PROFILE"
+PROFILE_DIR = os.path.dirname(STATE_FILE)
+
+_profile_session = None
+
+def profiling_requested():
+    return os.environ.get(PROFILE_ENV, "") not in ("", "0")
+
+def profiling_active():
+    return _profile_session is not None
+
+def start_profiling(label):
+    global _profile_session
+    import cProfile
+    import tracemalloc
+    if _profile_session is not None:
+        return
+    tracemalloc.start()
+    profiler = cProfile.Profile()
+    _profile_session = {"label": label, "profiler": profiler, "start": time.perf_counter(),
+                        "baseline": tracemalloc.take_snapshot()}
+    profiler.enable()
+
+def stop_profiling(top=30):
+    """
+    Finish the running session and write its files; returns the report path.
+    """
+    global _profile_session
+    session, _profile_session = _profile_session, None
+    if session is None:
+        return None
+    profiler = session["profiler"]
+    profiler.disable()
+    import tracemalloc
+    wall = time.perf_counter() - session["start"]
+    _, peak = tracemalloc.get_traced_memory()
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__),
+              tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+    growth = tracemalloc.take_snapshot().filter_traces(ignore).compare_to(
+        session["baseline"].filter_traces(ignore), "lineno")
+    tracemalloc.stop()
+    # only now, so the report doesn't show its own imports
+    import io
+    import pstats
+
+    base = os.path.join(PROFILE_DIR, f"steam_mod_launcher_profile_{session['label']}_"
+                                     f"{time.strftime('%Y%m%d-%H%M%S')}")
+    profiler.dump_stats(base + ".prof")
+    out = io.StringIO()
+    out.write(f"Operation: {session['label']}\n")
+    out.write(f"Wall time: {wall:.3f}s\n")
+    out.write(f"Peak traced memory: {format_size(peak)}\n\n")
+    out.write("Top allocation sites (growth during the run):\n")
+    for stat in growth[:15]:
+        frame = stat.traceback[0]
+        out.write(f"  {format_size(stat.size_diff):>10}  {stat.count_diff:>7} blocks  "
+                  f"{frame.filename}:{frame.lineno}\n")
+    out.write("\n")
+    stats = pstats.Stats(profiler, stream=out)
+    stats.sort_stats("cumulative").print_stats(top)
+    stats.sort_stats("tottime").print_stats(top)
+    with open(base + ".txt", "w", encoding="utf-8") as f:
+        f.write(out.getvalue())
+    print(f"[PROFILE] {session['label']}: {wall:.2f}s, peak {format_size(peak)} -> {base}.txt")
+    return base + ".txt"
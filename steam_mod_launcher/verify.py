@@ -0,0 +1,132 @@
+"""
+Checking a deployment against what we put there.
+"""
+import os
+import sys
+import zlib
+
+from .tracing import traced
+from .mods import fingerprint_files, HASH_CHUNK, load_deploy_manifest
+from .thunderstore import _list_profile_files
+
+# -----------------------------
+# --- Deployment verify     ---
+# -----------------------------
+# Checks a deployment against what we put there. Cheap stat checks come
+# first; only files whose size matches but mtime doesn't ("suspects") are
+# read, in parallel.
+VERIFY_EXTRA_ROOTS = ["BepInEx/plugins", "BepInEx/patchers", "Content/Paks/~mods", "modded"]
+
+def _crc_file(path):
+    crc = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(HASH_CHUNK)
+            if not chunk:
+                return crc
+            crc = zlib.crc32(chunk, crc)
+
+def _extra_files(game_dir, known, roots):
+    extra = []
+    for root_rel in roots:
+        root = os.path.join(game_dir, *root_rel.split("/"))
+        for dirpath, _, names in os.walk(root):
+            for n in names:
+                rel = os.path.relpath(os.path.join(dirpath, n), game_dir).replace(os.sep, "/")
+                if rel.lower() not in known:
+                    extra.append(rel)
+    return sorted(extra)
+
+@traced("verify")
+def verify_deployment(game_dir, profile_path=None, workers=None):
+    """
+    Compare game_dir with its deployment manifest, or with a Thunderstore
+    profile when profile_path is given. Returns
+    {"missing", "modified", "extra" (relpath lists), "checked", "hashed"}.
+    """
+    import concurrent.futures
+    missing, modified, suspects = [], [], []
+    if profile_path:
+        expected = _list_profile_files(profile_path)
+        for key, rel in expected.items():
+            target = os.path.join(game_dir, *rel.split("/"))
+            try:
+                st = os.stat(target)
+                src = os.stat(os.path.join(profile_path, *rel.split("/")))
+            except FileNotFoundError:
+                missing.append(rel)
+                continue
+            if st.st_size != src.st_size:
+                modified.append(rel)
+            elif abs(st.st_mtime - src.st_mtime) > 2:  # FAT/xcopy granularity
+                suspects.append(rel)
+        # config is rewritten by BepInEx at runtime, so only payload roots count as extra
+        extra = _extra_files(game_dir, expected, ["BepInEx/plugins", "BepInEx/patchers"])
+        pairs = [(os.path.join(game_dir, *r.split("/")), os.path.join(profile_path, *r.split("/")))
+                 for r in suspects]
+        digests = fingerprint_files([p for pair in pairs for p in pair], workers)
+        modified += [r for r, (a, b) in zip(suspects, pairs) if digests.get(a) != digests.get(b)]
+    else:
+        manifest = load_deploy_manifest(game_dir)
+        expected = manifest["files"]
+        for key, rec in expected.items():
+            target = os.path.join(game_dir, *rec["path"].split("/"))
+            try:
+                st = os.stat(target)
+            except FileNotFoundError:
+                missing.append(rec["path"])
+                continue
+            if st.st_size != rec["size"]:
+                modified.append(rec["path"])
+            elif rec.get("mtime_ns") != st.st_mtime_ns:
+                suspects.append(rec)
+        extra = _extra_files(game_dir, expected, VERIFY_EXTRA_ROOTS)
+        with_crc = [r for r in suspects if r.get("crc") is not None]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers or min(8, os.cpu_count() or 2)) as pool:
+            crcs = list(pool.map(lambda r: _crc_file(os.path.join(game_dir, *r["path"].split("/"))), with_crc))
+        modified += [r["path"] for r, crc in zip(with_crc, crcs) if crc != r["crc"]]
+        # folder mods have no CRC; a changed mtime is all we can go on
+        modified += [r["path"] for r in suspects if r.get("crc") is None]
+
+    return {
+        "missing": sorted(missing),
+        "modified": sorted(modified),
+        "extra": extra,
+        "checked": len(expected),
+        "hashed": len(suspects),
+    }
+
+def format_verify_report(report, limit=20):
+    lines = [f"Checked {report['checked']} files ({report['hashed']} re-hashed)."]
+    for kind in ("missing", "modified", "extra"):
+        items = report[kind]
+        if items:
+            lines.append(f"{kind.capitalize()} ({len(items)}):")
+            lines += [f"  {p}" for p in items[:limit]]
+            if len(items) > limit:
+                lines.append(f"  …and {len(items) - limit} more")
+    if not (report["missing"] or report["modified"] or report["extra"]):
+        lines.append("All mod files match the deployment.")
+    return "\n".join(lines)
+
+# the script shims call back into; the package lives next to it
+ENTRY_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "Setup-SteamModLauncher.py")
+
+def self_command():
+    """
+    Command line that re-runs this tool (used from launch shims).
+    """
+    if getattr(sys, "frozen", False):
+        return f'"{sys.executable}"'
+    python = sys.executable
+    # pythonw has no console, the shim wants the report visible
+    console = os.path.join(os.path.dirname(python), "python.exe")
+    if os.path.basename(python).lower() == "pythonw.exe" and os.path.exists(console):
+        python = console
+    return f'"{python}" "{ENTRY_SCRIPT}"'
+
+def shim_verify_line(target, profile=None):
+    against = f' --ts-profile "{profile}"' if profile else ""
+    return (f'{self_command()} --verify "{target}"{against} --quiet || '
+            f'(echo Some mod files are missing or changed, see above. & pause)\n')
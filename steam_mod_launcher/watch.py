@@ -0,0 +1,400 @@
+"""
+Change tracking and the pre-sync daemon.
+"""
+import os
+import struct
+import threading
+
+from .common import IS_WINDOWS, load_state, STATE_FILE
+from .discovery import (find_games, get_library_folders, get_steam_root, _path_mtimes,
+                        refresh_discovery)
+from .mods import ModExtractError
+from .thunderstore import (clear_presync_marker, get_thunderstore_profiles_any, mirror_profile,
+                           PRESYNC_MARKER, touch_presync_marker, VANILLA_PROFILE,
+                           write_presync_marker)
+
+# -----------------------------
+# --- Change tracking       ---
+# -----------------------------
+# Watched folders are snapshotted once ({entry: signature}); afterwards only
+# folders whose mtime changed (or that the OS notified us about) are
+# re-listed, and the difference comes back as small delta events:
+#   steamapps  -> game_installed / game_removed / game_updated
+#   vortex     -> mod_added / mod_removed / mod_changed
+#   profiles   -> profile_added / profile_removed / profile_changed
+WATCH_EVENTS = {
+    "steamapps": ("game_installed", "game_removed", "game_updated"),
+    "vortex": ("mod_added", "mod_removed", "mod_changed"),
+    "profiles": ("profile_added", "profile_removed", "profile_changed"),
+}
+
+# Subfolders of a Thunderstore profile whose mtime changes when r2modman
+# installs, updates or removes a mod.
+PROFILE_PROBE_DIRS = [
+    (),
+    ("BepInEx",),
+    ("BepInEx", "plugins"),
+    ("BepInEx", "config"),
+]
+
+def _watch_entry_relevant(kind, name, is_dir):
+    if kind == "steamapps":
+        return name.startswith("appmanifest_") and name.endswith(".acf")
+    if kind == "vortex":
+        return is_dir or name.lower().endswith(".zip")
+    if kind == "profiles":
+        return is_dir
+    return True
+
+def snapshot_dir(path, kind):
+    """
+    {entry name: signature} for the relevant direct children of path.
+    Profiles are signed by the mtimes of their PROFILE_PROBE_DIRS.
+    """
+    snap = {}
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return snap
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+            if not _watch_entry_relevant(kind, entry.name, is_dir):
+                continue
+            if kind == "profiles":
+                snap[entry.name] = _path_mtimes(
+                    [os.path.join(entry.path, *sub) for sub in PROFILE_PROBE_DIRS])
+            else:
+                st = entry.stat()
+                snap[entry.name] = (is_dir, st.st_size, st.st_mtime_ns)
+        except OSError:
+            continue
+    return snap
+
+def diff_snapshots(old, new):
+    """
+    Return (added, removed, changed) entry names, each sorted.
+    """
+    added = sorted(n for n in new if n not in old)
+    removed = sorted(n for n in old if n not in new)
+    changed = sorted(n for n in new if n in old and new[n] != old[n])
+    return added, removed, changed
+
+def _probe_paths(path, kind, snap):
+    if kind != "profiles":
+        return [path]
+    probes = [path]
+    for name in snap:
+        probes += [os.path.join(path, name, *sub) for sub in PROFILE_PROBE_DIRS]
+    return probes
+
+
+class InotifyBackend:
+    """
+    Linux inotify via ctypes. changed() returns the set of watched dirs
+    that saw activity since the last call, or None after a queue overflow.
+    A dir that is deleted or moved away is forgotten, so add() watches it
+    again once it is recreated.
+    """
+    MASK = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200 | 0x400 | 0x800
+    IN_DELETE_SELF = 0x400
+    IN_MOVE_SELF = 0x800
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.wds = {}    # wd -> path
+        self.paths = {}  # path -> wd
+
+    def __contains__(self, path):
+        return path in self.paths
+
+    def add(self, path):
+        if path in self.paths:
+            return True
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd < 0:
+            return False
+        self.wds[wd] = path
+        self.paths[path] = wd
+        return True
+
+    def remove(self, path):
+        wd = self.paths.pop(path, None)
+        if wd is not None:
+            self.wds.pop(wd, None)
+            self.libc.inotify_rm_watch(self.fd, wd)
+
+    def changed(self):
+        dirty = set()
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not buf:
+                break
+            i = 0
+            while i + 16 <= len(buf):
+                wd, mask, _cookie, length = struct.unpack_from("iIII", buf, i)
+                i += 16 + length
+                if mask & self.IN_Q_OVERFLOW:
+                    return None
+                path = self.wds.get(wd)
+                if path is None:
+                    continue
+                dirty.add(path)
+                if mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF | self.IN_IGNORED):
+                    if self.paths.get(path) == wd:
+                        del self.paths[path]
+                    if mask & self.IN_IGNORED:
+                        del self.wds[wd]
+                    elif mask & self.IN_MOVE_SELF:
+                        # still watching the dir at its new place; the kernel
+                        # answers with IN_IGNORED, which drops the wd
+                        self.libc.inotify_rm_watch(self.fd, wd)
+        return dirty
+
+
+class WindowsChangeBackend:
+    """
+    Windows directory change notifications (FindFirstChangeNotification,
+    the handle-based sibling of ReadDirectoryChangesW), checked without
+    blocking.
+    """
+    FLAGS = 0x1 | 0x2 | 0x8 | 0x10  # file name, dir name, size, last write
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+        k32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        k32.FindFirstChangeNotificationW.argtypes = [wintypes.LPCWSTR, wintypes.BOOL, wintypes.DWORD]
+        k32.FindFirstChangeNotificationW.restype = wintypes.HANDLE
+        k32.FindNextChangeNotification.argtypes = [wintypes.HANDLE]
+        k32.FindCloseChangeNotification.argtypes = [wintypes.HANDLE]
+        k32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+        k32.WaitForSingleObject.restype = wintypes.DWORD
+        self.k32 = k32
+        self.invalid = ctypes.c_void_p(-1).value
+        self.handles = {}  # path -> handle
+
+    def __contains__(self, path):
+        return path in self.handles
+
+    def add(self, path):
+        if path in self.handles:
+            return True
+        h = self.k32.FindFirstChangeNotificationW(path, False, self.FLAGS)
+        if not h or h == self.invalid:
+            return False
+        self.handles[path] = h
+        return True
+
+    def remove(self, path):
+        h = self.handles.pop(path, None)
+        if h:
+            self.k32.FindCloseChangeNotification(h)
+
+    def changed(self):
+        dirty = set()
+        for path, h in self.handles.items():
+            if self.k32.WaitForSingleObject(h, 0) == 0:  # WAIT_OBJECT_0
+                dirty.add(path)
+                self.k32.FindNextChangeNotification(h)
+        return dirty
+
+
+def make_watch_backend():
+    """
+    Best native backend for this OS, or None to fall back to mtime polling.
+    SML_WATCH_BACKEND=poll forces polling.
+    """
+    if os.getenv("SML_WATCH_BACKEND", "").lower() == "poll":
+        return None
+    try:
+        if IS_WINDOWS:
+            return WindowsChangeBackend()
+        if hasattr(os, "O_CLOEXEC") and os.path.exists("/proc/sys/fs/inotify"):
+            return InotifyBackend()
+    except Exception as e:
+        print(f"[WATCH] Native change notifications unavailable ({e}), polling instead")
+    return None
+
+
+class ChangeTracker:
+    """
+    Keeps mtime snapshots of watched folders and reports only the deltas.
+    Call poll() periodically (the GUI does it from root.after).
+    """
+
+    def __init__(self, backend="auto"):
+        self.backend = make_watch_backend() if backend == "auto" else backend
+        self.watches = {}  # path -> {"kind", "context", "snapshot", "probes": {path: mtime}}
+
+    def watch(self, path, kind, context=None):
+        if path in self.watches or not os.path.isdir(path):
+            return
+        snap = snapshot_dir(path, kind)
+        probes = _probe_paths(path, kind, snap)
+        self.watches[path] = {
+            "kind": kind,
+            "context": context,
+            "snapshot": snap,
+            "probes": dict(zip(probes, _path_mtimes(probes))),
+        }
+        self._subscribe(probes)
+
+    def unwatch(self, path):
+        w = self.watches.pop(path, None)
+        if w and self.backend:
+            for p in w["probes"]:
+                self.backend.remove(p)
+
+    def _subscribe(self, probes):
+        if self.backend:
+            for p in probes:
+                if os.path.isdir(p):
+                    self.backend.add(p)
+
+    def poll(self):
+        """
+        Re-list only changed folders; return a list of delta events
+        ({"event", "kind", "path", "name", "context"}).
+        """
+        dirty = self.backend.changed() if self.backend else None
+        events = []
+        for path, w in list(self.watches.items()):
+            probes = list(w["probes"])
+            if dirty is not None and not any(p in dirty for p in probes):
+                # probes the backend lost (deleted, or never existed) are polled,
+                # so a recreated folder is picked up and subscribed again
+                lost = [p for p in probes if p not in self.backend]
+                if not lost or _path_mtimes(lost) == tuple(w["probes"][p] for p in lost):
+                    continue
+            # polling: an unchanged folder mtime means nothing was added/removed
+            if dirty is None and dict(zip(probes, _path_mtimes(probes))) == w["probes"]:
+                continue
+            new_snap = snapshot_dir(path, w["kind"])
+            added, removed, changed = diff_snapshots(w["snapshot"], new_snap)
+            w["snapshot"] = new_snap
+            new_probes = _probe_paths(path, w["kind"], new_snap)
+            w["probes"] = dict(zip(new_probes, _path_mtimes(new_probes)))
+            self._subscribe(new_probes)
+            names = WATCH_EVENTS.get(w["kind"], ("added", "removed", "changed"))
+            for event, group in zip(names, (added, removed, changed)):
+                for name in group:
+                    events.append({
+                        "event": event,
+                        "kind": w["kind"],
+                        "path": os.path.join(path, name),
+                        "name": name,
+                        "context": w["context"],
+                    })
+        if events:
+            kinds = {e["kind"] for e in events}
+            if "steamapps" in kinds:
+                refresh_discovery("find_games")
+            if "profiles" in kinds:
+                refresh_discovery("get_thunderstore_profiles_any")
+            for e in events:
+                print(f"[WATCH] {e['event']}: {e['path']}")
+        return events
+
+
+# -----------------------------
+# --- Pre-sync daemon       ---
+# -----------------------------
+# Optional background process (--presync-daemon) that keeps the game folder
+# of every Thunderstore launcher in step with its profile. While a game is
+# in sync it carries PRESYNC_MARKER, and the launch shim skips its own copy.
+# The marker is dropped before every sync and when the daemon exits, and
+# touched on every poll; one the daemon stopped touching (it was killed, the
+# machine rebooted) expires, so a shim never trusts a folder nobody watches.
+def presync_game(game_dir, profile_path, interval=2.0):
+    clear_presync_marker(game_dir)
+    copied = mirror_profile(profile_path, game_dir)
+    write_presync_marker(game_dir, profile_path, interval)
+    return copied
+
+def presync_targets(state):
+    """
+    {profile path: [game dirs]} for the Thunderstore launchers in state.
+    """
+    games = {g["Name"]: g for g in find_games(get_library_folders(get_steam_root()))}
+    targets = {}
+    for name, entry in state.items():
+        if name.startswith("_") or not isinstance(entry, dict):
+            continue
+        if entry.get("launcher") != "Thunderstore" or entry.get("profile") in (None, VANILLA_PROFILE):
+            continue
+        game = games.get(name)
+        if not game:
+            continue
+        profile_path = next((p for p in get_thunderstore_profiles_any(game["InstallDir"])
+                             if os.path.basename(p) == entry["profile"]), None)
+        if profile_path:
+            game_dir = os.path.join(os.path.dirname(game["Manifest"]), "common", game["InstallDir"])
+            targets.setdefault(profile_path, []).append(game_dir)
+    return targets
+
+def presync_daemon(interval=2.0, stop=None):
+    """
+    Watch the tracked profiles until stop (a threading.Event) is set or the
+    process is interrupted.
+    """
+    stop = stop or threading.Event()
+    tracker = ChangeTracker()
+    targets, state_mtime = {}, None
+
+    def sync(profile_path, game_dirs):
+        for game_dir in game_dirs:
+            try:
+                copied = presync_game(game_dir, profile_path, interval)
+                print(f"[PRESYNC] {os.path.basename(profile_path)} -> {game_dir} ({copied} files)")
+            except (ModExtractError, OSError) as e:
+                clear_presync_marker(game_dir)
+                print(f"[PRESYNC] Failed for {game_dir}: {e}")
+
+    try:
+        while True:
+            # pick up launchers created, switched or reverted in the GUI
+            mtime = _path_mtimes([STATE_FILE])[0]
+            if mtime != state_mtime:
+                state_mtime = mtime
+                refresh_discovery("get_thunderstore_profiles_any")
+                new_targets = presync_targets(load_state())
+                for profile_path, game_dirs in targets.items():
+                    for game_dir in set(game_dirs) - set(new_targets.get(profile_path, [])):
+                        clear_presync_marker(game_dir)
+                for profile_path, game_dirs in new_targets.items():
+                    # new targets, and shims rewritten by the GUI (which drops the marker)
+                    if game_dirs != targets.get(profile_path) or not all(
+                            os.path.exists(os.path.join(d, PRESYNC_MARKER)) for d in game_dirs):
+                        sync(profile_path, game_dirs)
+                    tracker.watch(os.path.dirname(profile_path), "profiles")
+                targets = new_targets
+
+            for e in tracker.poll():
+                if e["path"] in targets:
+                    sync(e["path"], targets[e["path"]])
+
+            # heartbeat: markers of folders still in step stay valid
+            for game_dirs in targets.values():
+                for game_dir in game_dirs:
+                    touch_presync_marker(game_dir)
+
+            if stop.wait(interval):
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for game_dirs in targets.values():
+            for game_dir in game_dirs:
+                clear_presync_marker(game_dir)
+        print("[PRESYNC] Stopped, markers cleared")
@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from steam_mod_launcher.discovery import (detect_engine, discovery_cached, find_game_exe,
+                                          refresh_discovery)
+
+
+def touch(path, data=b"MZ"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+class DiscoveryCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.game_dir = os.path.join(self.dir, "Game")
+        touch(os.path.join(self.game_dir, "Binaries", "Win64", "Launcher.exe"))
+        os.makedirs(os.path.join(self.game_dir, "Content"))
+        refresh_discovery()
+
+    def tearDown(self):
+        refresh_discovery()
+        shutil.rmtree(self.dir)
+
+    def wait_for_new_mtime(self):
+        # coarse filesystem timestamps could hide a change made right away
+        time.sleep(0.02)
+
+    def test_unchanged_tree_is_not_walked_again(self):
+        find_game_exe(self.game_dir)
+        with mock.patch("os.walk", wraps=os.walk) as walk:
+            find_game_exe(self.game_dir)
+            detect_engine(self.game_dir)
+            detect_engine(self.game_dir)
+        self.assertEqual(walk.call_count, 1)
+
+    def test_nested_exe_invalidates_find_game_exe(self):
+        self.assertTrue(find_game_exe(self.game_dir).endswith("Launcher.exe"))
+        self.wait_for_new_mtime()
+        touch(os.path.join(self.game_dir, "Binaries", "Win64", "Game.exe"))
+        self.assertTrue(find_game_exe(self.game_dir).endswith("Game.exe"))
+
+    def test_nested_paks_folder_invalidates_detect_engine(self):
+        self.assertEqual(detect_engine(self.game_dir), "Unknown")
+        self.wait_for_new_mtime()
+        os.makedirs(os.path.join(self.game_dir, "Content", "Paks"))
+        self.assertEqual(detect_engine(self.game_dir), "Unreal")
+
+    def test_scan_overlapping_a_refresh_is_not_stored(self):
+        scans, started, release = [], threading.Event(), threading.Event()
+
+        @discovery_cached()
+        def slow_scan():
+            scans.append(len(scans))
+            if len(scans) == 1:
+                started.set()
+                release.wait(5)
+            return len(scans)
+
+        worker = threading.Thread(target=slow_scan)
+        worker.start()
+        started.wait(5)
+        refresh_discovery()
+        release.set()
+        worker.join(5)
+        self.assertEqual(slow_scan(), 2)
+        self.assertEqual(slow_scan(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from steam_mod_launcher.steam_config import edit_localconfig, read_launch_options
+
+SHIM = r"C:\Games\Lethal Company\ModLaunch.cmd"
+OURS = f'"{SHIM}" %command%'
+
+
+def localconfig(apps):
+    lines = ['"UserLocalConfigStore"', "{", '\t"Software"', "\t{", '\t\t"Valve"', "\t\t{",
+             '\t\t\t"Steam"', "\t\t\t{", '\t\t\t\t"apps"', "\t\t\t\t{"]
+    for appid, option in apps.items():
+        lines += [f'\t\t\t\t\t"{appid}"', "\t\t\t\t\t{"]
+        if option is not None:
+            escaped = option.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'\t\t\t\t\t\t"LaunchOptions"\t\t"{escaped}"')
+        lines.append("\t\t\t\t\t}")
+    lines += ["\t\t\t\t}", "\t\t\t}", "\t\t}", "\t}", "}", ""]
+    return "\n".join(lines)
+
+
+class LaunchOptionsTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "localconfig.vdf")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def roundtrip(self, original):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(localconfig({"1966720": original}))
+        edit_localconfig(self.path, {"1966720": OURS})
+        written = read_launch_options(self.path).get("1966720")
+        edit_localconfig(self.path, {"1966720": None})
+        return written, read_launch_options(self.path).get("1966720")
+
+    def test_write_then_clear_keeps_user_arguments(self):
+        written, cleared = self.roundtrip('-foo "x"')
+        self.assertEqual(written, f'{OURS} -foo "x"')
+        self.assertEqual(cleared, '-foo "x"')
+
+    def test_write_then_clear_keeps_user_command_wrapper(self):
+        written, cleared = self.roundtrip("PROTON_LOG=1 %command% -novid")
+        self.assertEqual(written, f"PROTON_LOG=1 {OURS} -novid")
+        self.assertEqual(cleared, "PROTON_LOG=1 %command% -novid")
+
+    def test_write_then_clear_without_user_options(self):
+        written, cleared = self.roundtrip(None)
+        self.assertEqual(written, OURS)
+        self.assertIsNone(cleared)
+
+    def test_rewrite_replaces_only_our_shim(self):
+        self.roundtrip('-foo "x"')
+        other = '"D:\\Other\\ModLaunch.cmd" %command%'
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(localconfig({"1966720": f'{OURS} -foo "x"'}))
+        edit_localconfig(self.path, {"1966720": other})
+        self.assertEqual(read_launch_options(self.path)["1966720"], f'{other} -foo "x"')
+
+
+if __name__ == "__main__":
+    unittest.main()
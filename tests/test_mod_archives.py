@@ -0,0 +1,103 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+from steam_mod_launcher import mods
+from steam_mod_launcher.mods import (ModExtractError, resolve_mod_dependencies, safe_relpath,
+                                     stage_members)
+
+
+class SafeRelpathTest(unittest.TestCase):
+    def test_accepts_and_normalizes_plain_paths(self):
+        self.assertEqual(safe_relpath("BepInEx/plugins/a.dll"), "BepInEx/plugins/a.dll")
+        self.assertEqual(safe_relpath("BepInEx\\config\\a.cfg"), "BepInEx/config/a.cfg")
+        # only the exact device names are reserved
+        for rel in ["CONFIG/a.cfg", "console.dll", "BepInEx/plugins/nullable.dll", "COM10.txt"]:
+            self.assertEqual(safe_relpath(rel), rel)
+
+    def test_rejects_traversal_and_absolute_paths(self):
+        for rel in ["", "../a", "a/../../b", "/etc/passwd", "\\\\server\\share", "a//b", "./a", "a\0b"]:
+            with self.assertRaises(ModExtractError, msg=rel):
+                safe_relpath(rel)
+
+    def test_rejects_drive_letters_and_alternate_data_streams(self):
+        for rel in ["C:/Windows/a.dll", "c:a.dll", "plugins/a.dll:hidden", "a.dll::$DATA"]:
+            with self.assertRaises(ModExtractError, msg=rel):
+                safe_relpath(rel)
+
+    def test_rejects_windows_device_names(self):
+        for rel in ["CON", "nul", "BepInEx/AUX", "plugins/NUL.txt", "com1.dll", "LPT9 .log", "prn/a.cfg"]:
+            with self.assertRaises(ModExtractError, msg=rel):
+                safe_relpath(rel)
+
+    def test_extraction_refuses_unsafe_member_before_writing(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        archive = os.path.join(tmp, "evil.zip")
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("ok.dll", b"fine")
+            zf.writestr("ok.dll:stream", b"hidden")
+        staging = os.path.join(tmp, "staging")
+        with self.assertRaises(ModExtractError):
+            stage_members(archive, [("ok.dll", "ok.dll"), ("ok.dll:stream", "ok.dll:stream")], staging)
+        self.assertFalse(os.path.exists(staging))
+
+
+def write_package(folder, name, version, dependencies=()):
+    path = os.path.join(folder, f"Author-{name}-{version}.zip")
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("manifest.json", json.dumps({
+            "name": name,
+            "version_number": version,
+            "dependencies": [f"Author-{d}" for d in dependencies],
+        }))
+        zf.writestr(f"plugins/{name}.dll", name.encode())
+    return path
+
+
+class DependencyOrderTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        patcher = mock.patch.object(mods, "INDEX_FILE", os.path.join(self.dir, "index.json"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def names(self, paths):
+        return [os.path.basename(p) for p in paths]
+
+    def test_dependencies_come_first(self):
+        app = write_package(self.dir, "App", "1.0.0", ["Lib-1.0.0"])
+        lib = write_package(self.dir, "Lib", "1.0.0", ["Core-1.0.0"])
+        core = write_package(self.dir, "Core", "1.0.0")
+        plan = resolve_mod_dependencies([app, lib, core])
+        self.assertEqual(self.names(plan["order"]),
+                         ["Author-Core-1.0.0.zip", "Author-Lib-1.0.0.zip", "Author-App-1.0.0.zip"])
+        self.assertEqual(plan["missing"], [])
+        self.assertEqual(plan["cycles"], [])
+
+    def test_selection_pulls_in_dependencies_only(self):
+        app = write_package(self.dir, "App", "1.0.0", ["Lib-1.0.0"])
+        lib = write_package(self.dir, "Lib", "1.0.0")
+        other = write_package(self.dir, "Other", "1.0.0")
+        plan = resolve_mod_dependencies([app, lib, other], ["Author-App-1.0.0.zip"])
+        self.assertEqual(self.names(plan["order"]), ["Author-Lib-1.0.0.zip", "Author-App-1.0.0.zip"])
+        self.assertEqual(resolve_mod_dependencies([app, lib, other], [])["order"], [])
+
+    def test_cycles_and_missing_dependencies_are_reported(self):
+        a = write_package(self.dir, "A", "1.0.0", ["B-1.0.0", "Gone-2.0.0"])
+        b = write_package(self.dir, "B", "1.0.0", ["A-1.0.0"])
+        plan = resolve_mod_dependencies([a, b])
+        self.assertEqual(plan["cycles"], [["author-a", "author-b"]])
+        self.assertEqual(plan["missing"], ["Author-Gone-2.0.0"])
+        self.assertEqual(sorted(self.names(plan["order"])), ["Author-A-1.0.0.zip", "Author-B-1.0.0.zip"])
+
+
+if __name__ == "__main__":
+    unittest.main()
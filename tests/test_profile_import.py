@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+from steam_mod_launcher import common, mods, thunderstore
+from steam_mod_launcher.thunderstore import (check_profile_name, get_active_profile, import_r2z,
+                                             PROFILE_STAGE_DIR, stored_packages, switch_profile)
+
+PLUGIN_R2X = """profileName: Team
+mods:
+  - name: Author-Plugin
+    version:
+      major: 1
+      minor: 0
+      patch: 0
+    enabled: true
+"""
+
+
+def write_r2z(path, profile_name, r2x=None):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("export.r2x", r2x or f"profileName: {profile_name}\nmods: []\n")
+        zf.writestr("BepInEx/config/test.cfg", "[General]\n")
+
+
+def write_package(path):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("manifest.json", '{"name": "Plugin", "version_number": "1.0.0", "dependencies": []}')
+        zf.writestr("plugins/Plugin.dll", b"plugin")
+
+
+class ProfileImportTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        # the game sits deep enough for '../../..' from its slot folder to
+        # land on folders that must survive
+        self.game_dir = os.path.join(self.dir, "library", "common", "Game")
+        os.makedirs(self.game_dir)
+        with open(os.path.join(self.game_dir, "Game.exe"), "wb") as f:
+            f.write(b"MZ")
+        self.r2z = os.path.join(self.dir, "export.r2z")
+        for target, value in [(mods, "INDEX_FILE"), (mods, "FINGERPRINT_FILE"), (common, "STATE_FILE")]:
+            patcher = mock.patch.object(target, value, os.path.join(self.dir, value.lower() + ".json"))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.store = os.path.join(self.dir, "store")
+        patcher = mock.patch.object(thunderstore, "PACKAGE_STORE", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_traversing_profile_name_stays_in_the_game_folder(self):
+        write_r2z(self.r2z, "../../..")
+        result = import_r2z(self.r2z, self.game_dir)
+        self.assertEqual(check_profile_name(result["name"]), result["name"])
+        self.assertEqual(get_active_profile(self.game_dir), result["name"])
+        self.assertTrue(os.path.isfile(os.path.join(self.game_dir, "BepInEx", "config", "test.cfg")))
+        self.assertTrue(os.path.isfile(os.path.join(self.game_dir, "Game.exe")))
+        self.assertEqual(os.listdir(os.path.join(self.dir, "library")), ["common"])
+
+    def test_device_and_hidden_names_are_made_safe(self):
+        for raw in ["CON", "nul.txt", ".hidden", "a\\b", "x:stream", ". .", ""]:
+            write_r2z(self.r2z, repr(raw))
+            name = thunderstore.read_r2z(self.r2z)[0]
+            self.assertEqual(check_profile_name(name), name, raw)
+
+    def test_unsafe_name_override_is_rejected(self):
+        write_r2z(self.r2z, "Team")
+        for name in ["..", "../evil", "sub/dir", ".import-x", "COM1", "vanilla"]:
+            with self.assertRaises(ValueError):
+                import_r2z(self.r2z, self.game_dir, name=name)
+        self.assertFalse(os.path.exists(os.path.join(self.game_dir, PROFILE_STAGE_DIR)))
+
+    def test_switch_profile_rejects_unsafe_names(self):
+        for name in ["..", "../..", "a/b", "AUX"]:
+            with self.assertRaises(ValueError):
+                switch_profile(self.game_dir, name)
+        self.assertFalse(os.path.exists(os.path.join(self.game_dir, PROFILE_STAGE_DIR)))
+
+    def test_package_store_is_content_addressed(self):
+        os.makedirs(self.store)
+        write_package(os.path.join(self.store, "Author-Plugin-1.0.0.zip"))
+        write_r2z(self.r2z, None, PLUGIN_R2X)
+        result = import_r2z(self.r2z, self.game_dir)
+        self.assertEqual(result["missing"], [])
+        [stored] = stored_packages()
+        digest = mods.file_fingerprint(stored)
+        self.assertEqual(stored, os.path.join(self.store, digest, "Author-Plugin-1.0.0.zip"))
+        self.assertTrue(any("Plugin.dll" in names for _, _, names in
+                            os.walk(os.path.join(self.game_dir, "BepInEx", "plugins"))))
+
+    def test_damaged_stored_package_is_not_used(self):
+        os.makedirs(self.store)
+        write_package(os.path.join(self.store, "Author-Plugin-1.0.0.zip"))
+        [stored] = stored_packages()
+        with open(stored, "ab") as f:
+            f.write(b"bitrot")
+        write_r2z(self.r2z, None, PLUGIN_R2X)
+        result = import_r2z(self.r2z, self.game_dir)
+        self.assertEqual(result["missing"], ["Author-Plugin-1.0.0"])
+        self.assertTrue(os.path.exists(stored))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+from steam_mod_launcher import common, mods
+from steam_mod_launcher.mods import (build_deploy_map, load_vanilla_index, remove_mod_leftovers,
+                                     sync_deployment)
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def write_appmanifest(steamapps, buildid):
+    write(os.path.join(steamapps, "appmanifest_480.acf"),
+          f'"AppState"\n{{\n\t"appid"\t\t"480"\n\t"name"\t\t"Game"\n'
+          f'\t"installdir"\t\t"Game"\n\t"buildid"\t\t"{buildid}"\n}}\n'.encode())
+
+
+class VanillaSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        for target, value in [(mods, "INDEX_FILE"), (mods, "FINGERPRINT_FILE"), (common, "STATE_FILE")]:
+            patcher = mock.patch.object(target, value, os.path.join(self.dir, value.lower() + ".json"))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.steamapps = os.path.join(self.dir, "steamapps")
+        self.game_dir = os.path.join(self.steamapps, "common", "Game")
+        write_appmanifest(self.steamapps, "100")
+        write(os.path.join(self.game_dir, "Game.exe"), b"MZ game")
+        write(os.path.join(self.game_dir, "UnityPlayer.dll"), b"original player")
+        self.pack = os.path.join(self.dir, "Author-Pack-1.0.0.zip")
+        with zipfile.ZipFile(self.pack, "w") as zf:
+            zf.writestr("manifest.json", '{"name": "Pack", "version_number": "1.0.0"}')
+            zf.writestr("BepInExPack/winhttp.dll", b"doorstop loader")
+            zf.writestr("BepInExPack/doorstop_config.ini", "[General]\n")
+            zf.writestr("BepInExPack/BepInEx/core/BepInEx.dll", b"core")
+            zf.writestr("BepInExPack/UnityPlayer.dll", b"patched player")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def deploy(self, *archives):
+        return sync_deployment(self.game_dir, build_deploy_map(list(archives), "Unity"))
+
+    def test_deploy_backs_up_overwritten_original(self):
+        self.deploy(self.pack)
+        self.assertEqual(read(os.path.join(self.game_dir, "UnityPlayer.dll")), b"patched player")
+        self.assertIn("unityplayer.dll", load_vanilla_index(self.game_dir)["files"])
+
+    def test_deselect_restores_overwritten_original(self):
+        self.deploy(self.pack)
+        self.deploy()
+        self.assertEqual(read(os.path.join(self.game_dir, "UnityPlayer.dll")), b"original player")
+        self.assertFalse(os.path.exists(os.path.join(self.game_dir, "winhttp.dll")))
+        self.assertFalse(os.path.exists(os.path.join(self.game_dir, "BepInEx")))
+        self.assertNotIn("unityplayer.dll", load_vanilla_index(self.game_dir)["files"])
+
+    def test_redeploy_after_deselect_keeps_the_original_backed_up(self):
+        self.deploy(self.pack)
+        self.deploy()
+        self.deploy(self.pack)
+        report = remove_mod_leftovers(self.game_dir)
+        self.assertEqual(report["restored"], ["UnityPlayer.dll"])
+        self.assertEqual(read(os.path.join(self.game_dir, "UnityPlayer.dll")), b"original player")
+        self.assertEqual(sorted(os.listdir(self.game_dir)), ["Game.exe", "UnityPlayer.dll"])
+
+    def test_stale_build_keeps_files_steam_replaced(self):
+        self.deploy(self.pack)
+        write_appmanifest(self.steamapps, "200")
+        write(os.path.join(self.game_dir, "UnityPlayer.dll"), b"player from the update")
+        report = remove_mod_leftovers(self.game_dir)
+        self.assertTrue(report["stale_build"])
+        self.assertEqual(report["skipped"], ["UnityPlayer.dll"])
+        self.assertEqual(read(os.path.join(self.game_dir, "UnityPlayer.dll")), b"player from the update")
+        self.assertFalse(os.path.exists(os.path.join(self.game_dir, "winhttp.dll")))
+        self.assertIn("unityplayer.dll", load_vanilla_index(self.game_dir)["files"])
+
+    def test_stale_build_restores_files_still_deployed(self):
+        self.deploy(self.pack)
+        write_appmanifest(self.steamapps, "200")
+        report = remove_mod_leftovers(self.game_dir)
+        self.assertTrue(report["stale_build"])
+        self.assertEqual(report["skipped"], [])
+        self.assertEqual(read(os.path.join(self.game_dir, "UnityPlayer.dll")), b"original player")
+
+    def test_stale_build_force_restores_anyway(self):
+        self.deploy(self.pack)
+        write_appmanifest(self.steamapps, "200")
+        write(os.path.join(self.game_dir, "UnityPlayer.dll"), b"player from the update")
+        report = remove_mod_leftovers(self.game_dir, force=True)
+        self.assertEqual(report["restored"], ["UnityPlayer.dll"])
+        self.assertEqual(read(os.path.join(self.game_dir, "UnityPlayer.dll")), b"original player")
+        self.assertFalse(os.path.exists(os.path.join(self.game_dir, ".sml_vanilla")))
+
+    def test_stale_build_deselect_keeps_files_steam_replaced(self):
+        self.deploy(self.pack)
+        write_appmanifest(self.steamapps, "200")
+        write(os.path.join(self.game_dir, "UnityPlayer.dll"), b"player from the update")
+        self.deploy()
+        self.assertEqual(read(os.path.join(self.game_dir, "UnityPlayer.dll")), b"player from the update")
+
+
+if __name__ == "__main__":
+    unittest.main()